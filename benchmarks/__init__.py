@@ -0,0 +1,9 @@
+"""
+Benchmark suite for data-degradation-detector.
+
+Run the hot paths of the univariate, multivariate and report modules on synthetic data
+and compare two result files to flag regressions:
+
+    python -m benchmarks.run --scale small --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
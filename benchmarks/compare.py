@@ -0,0 +1,86 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.1
+
+Exits with status 1 when any case got slower or used more memory than the threshold allows.
+"""
+
+import argparse
+import json
+import sys
+
+def _key(result: dict) -> tuple:
+    return (result["case"], result["rows"], result["columns"], result["batches"])
+
+def load_results(path: str) -> dict[tuple, dict]:
+    """
+    Loads a result file written by benchmarks.run, keyed by (case, rows, columns, batches).
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    return {_key(result): result for result in data["results"]}
+
+def compare_results(baseline: dict[tuple, dict], current: dict[tuple, dict], threshold: float = 0.1, memory_threshold: float = None) -> list[dict]:
+    """
+    Returns one entry per case present in both files with the relative change of time and peak RSS.
+    A case is a regression when its time grew more than `threshold` or its peak RSS more than `memory_threshold`.
+    """
+    if memory_threshold is None:
+        memory_threshold = threshold
+
+    comparison = []
+    for key in sorted(baseline.keys() & current.keys()):
+        old, new = baseline[key], current[key]
+        if "error" in old or "error" in new:
+            comparison.append({"key": key, "error": new.get("error", old.get("error")), "regression": "error" in new})
+            continue
+
+        time_change = new["seconds"] / old["seconds"] - 1 if old["seconds"] else 0.0
+        memory_change = None
+        if old.get("peak_rss_mb") and new.get("peak_rss_mb"):
+            memory_change = new["peak_rss_mb"] / old["peak_rss_mb"] - 1
+
+        comparison.append({
+            "key": key,
+            "old_seconds": old["seconds"],
+            "new_seconds": new["seconds"],
+            "time_change": time_change,
+            "old_peak_rss_mb": old.get("peak_rss_mb"),
+            "new_peak_rss_mb": new.get("peak_rss_mb"),
+            "memory_change": memory_change,
+            "regression": time_change > threshold or (memory_change is not None and memory_change > memory_threshold),
+        })
+
+    return comparison
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", help="Result file used as the reference.")
+    parser.add_argument("current", help="Result file to check for regressions.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative increase of time (0.1 = 10%%).")
+    parser.add_argument("--memory-threshold", type=float, help="Allowed relative increase of peak RSS, defaults to --threshold.")
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    args = parser.parse_args(argv)
+
+    comparison = compare_results(load_results(args.baseline), load_results(args.current), args.threshold, args.memory_threshold)
+
+    if args.json:
+        print(json.dumps([{**entry, "key": list(entry["key"])} for entry in comparison], indent=4))
+    else:
+        for entry in comparison:
+            case, rows, columns, batches = entry["key"]
+            label = f"{case:<24} rows={rows:<9} columns={columns:<5} batches={batches:<3}"
+            flag = "REGRESSION" if entry["regression"] else "ok"
+            if "error" in entry:
+                print(f"{label} {flag} error: {entry['error']}")
+                continue
+            memory = "n/a" if entry["memory_change"] is None else f"{entry['memory_change']:+.1%}"
+            print(f"{label} time {entry['old_seconds']:.3f}s -> {entry['new_seconds']:.3f}s ({entry['time_change']:+.1%}) "
+                  f"rss {memory} {flag}")
+
+    return 1 if any(entry["regression"] for entry in comparison) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
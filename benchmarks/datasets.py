@@ -0,0 +1,35 @@
+"""
+Synthetic data generators for the benchmarks.
+"""
+
+import numpy as np
+import pandas as pd
+
+def make_dataset(rows: int, columns: int, clusters: int = 4, seed: int = 42, dtype=np.float64) -> pd.DataFrame:
+    """
+    Returns a DataFrame of gaussian blobs with `clusters` centers in `columns` dimensions.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-10, 10, size=(clusters, columns))
+    scales = rng.uniform(0.5, 2.0, size=(clusters, columns))
+    labels = rng.integers(0, clusters, size=rows)
+
+    data = rng.standard_normal(size=(rows, columns), dtype=np.float64)
+    data *= scales[labels]
+    data += centers[labels]
+
+    return pd.DataFrame(data.astype(dtype, copy=False), columns=[f"feature_{i}" for i in range(columns)])
+
+def make_batches(df: pd.DataFrame, batches: int, drift: float = 0.5, seed: int = 42) -> list[pd.DataFrame]:
+    """
+    Splits the DataFrame into `batches` batches with an increasing shift in mean and scale.
+    """
+    rng = np.random.default_rng(seed)
+    result = []
+    for i, idx in enumerate(np.array_split(np.arange(len(df)), batches)):
+        batch = df.iloc[idx].reset_index(drop=True)
+        shift = drift * i / max(batches - 1, 1)
+        noise = rng.standard_normal(size=batch.shape) * shift
+        result.append(batch * (1 + shift) + noise)
+
+    return result
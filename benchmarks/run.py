@@ -0,0 +1,252 @@
+"""
+Runs the benchmark cases and writes the results as JSON.
+
+Every (case, rows, columns, batches) combination runs in its own Python process so that
+the peak RSS reported belongs to that combination only.
+
+    python -m benchmarks.run --scale medium --output results.json
+    python -m benchmarks.run --cases descriptors_all_columns --rows 10000 100000 --columns 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+SCALES = {
+    "small": {"rows": [10_000], "columns": [10], "batches": [5]},
+    "medium": {"rows": [10_000, 100_000, 1_000_000], "columns": [10, 100], "batches": [5]},
+    "large": {"rows": [1_000_000, 10_000_000], "columns": [10, 100, 1000], "batches": [5, 20]},
+}
+
+# Largest number of rows and columns each case is run with, the quadratic or
+# pure Python paths would otherwise take hours at the largest scales
+CASE_LIMITS = {
+    "descriptors_all_columns": {"rows": None, "columns": None},
+    "generate_distribution": {"rows": 1_000_000, "columns": None},
+    "calculate_radius": {"rows": 1_000_000, "columns": None},
+    "silhouette_score": {"rows": 50_000, "columns": None},
+    "get_best_clusters": {"rows": 20_000, "columns": 100},
+    "coreset_best_clusters": {"rows": None, "columns": 100},
+    "create_report": {"rows": 100_000, "columns": 20},
+    "pickle_batches": {"rows": None, "columns": None},
+    "share_batches": {"rows": None, "columns": None},
+}
+
+# Cases that depend on the number of batches
+BATCH_CASES = {"create_report", "pickle_batches", "share_batches"}
+
+def _peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process in MB, or None when unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _batch_sum(df) -> float:
+    return float(df.iloc[:, 0].sum())
+
+def _shared_batch_sum(frame) -> float:
+    df = frame.to_pandas()
+    total = _batch_sum(df)
+    del df
+    frame.close()
+    return total
+
+def _setup_case(case: str, rows: int, columns: int, batches: int):
+    """
+    Builds the inputs of a case and returns the function to time.
+    """
+    import numpy as np
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score
+    from data_degradation_detector import univariate as uv
+    from data_degradation_detector import multivariate as mv
+    from data_degradation_detector import report
+    from .datasets import make_dataset, make_batches
+
+    df = make_dataset(rows, columns)
+
+    if case == "descriptors_all_columns":
+        return lambda: uv.get_distribution_descriptors_all_columns(df)
+
+    if case == "generate_distribution":
+        column = df.iloc[:, 0]
+        return lambda: uv._generate_distribution(column)
+
+    if case == "calculate_radius":
+        kmeans = KMeans(n_clusters=4, random_state=42, n_init=1).fit(df)
+        return lambda: mv._calculate_radius(df, kmeans)
+
+    if case == "silhouette_score":
+        labels = KMeans(n_clusters=4, random_state=42, n_init=1).fit(df).labels_
+        return lambda: silhouette_score(df, labels)
+
+    if case == "get_best_clusters":
+        return lambda: mv.get_best_clusters(df, plot=False)
+
+    if case == "coreset_best_clusters":
+        return lambda: mv.get_best_clusters(df, plot=False, coreset_size=5000)
+
+    if case == "create_report":
+        import matplotlib
+        matplotlib.use("Agg")
+        original_clusters = mv.get_cluster_defined_number(df, 4, plot=False)
+        degraded = make_batches(df, batches)
+        metrics = {"rmse": 1.0}
+        output = tempfile.mkdtemp(prefix="ddd_bench_")
+        return lambda: report.create_report(df, original_clusters, degraded, metrics, output,
+                                            new_metrics=[metrics] * batches, plot_sample_size=1000)
+
+    if case in ("pickle_batches", "share_batches"):
+        # Only the transport of the batches to the workers of compare --workers is timed, the work itself is negligible
+        from concurrent.futures import ProcessPoolExecutor
+        from data_degradation_detector.shared import SharedFrame
+        degraded = make_batches(df, batches)
+        executor = ProcessPoolExecutor(max_workers=2)
+        list(executor.map(abs, range(2)))
+
+        if case == "pickle_batches":
+            return lambda: list(executor.map(_batch_sum, degraded))
+
+        def share():
+            frames = [SharedFrame(batch) for batch in degraded]
+            try:
+                return list(executor.map(_shared_batch_sum, frames))
+            finally:
+                for frame in frames:
+                    frame.unlink()
+
+        return share
+
+    raise ValueError(f"Unknown benchmark case '{case}'.")
+
+def run_single(case: str, rows: int, columns: int, batches: int, repeat: int = 1) -> dict:
+    """
+    Runs one case in the current process and returns its timings and memory usage.
+    """
+    func = _setup_case(case, rows, columns, batches)
+    setup_rss = _peak_rss_mb()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "case": case,
+        "rows": rows,
+        "columns": columns,
+        "batches": batches,
+        "seconds": min(times),
+        "all_seconds": times,
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def _run_isolated(case: str, rows: int, columns: int, batches: int, repeat: int) -> dict:
+    """
+    Runs one case in a fresh interpreter and returns its result, or the error it raised.
+    """
+    command = [sys.executable, "-m", "benchmarks.run", "--single", case,
+               "--rows", str(rows), "--columns", str(columns), "--batches", str(batches),
+               "--repeat", str(repeat)]
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=cwd)
+
+    if completed.returncode != 0:
+        return {"case": case, "rows": rows, "columns": columns, "batches": batches,
+                "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "unknown error"}
+
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def _combinations(cases, rows_list, columns_list, batches_list, max_cells):
+    """
+    Yields every (case, rows, columns, batches) combination allowed by the case limits.
+    """
+    for case in cases:
+        limits = CASE_LIMITS[case]
+        for rows in rows_list:
+            for columns in columns_list:
+                if limits["rows"] is not None and rows > limits["rows"]:
+                    continue
+                if limits["columns"] is not None and columns > limits["columns"]:
+                    continue
+                if max_cells is not None and rows * columns > max_cells:
+                    continue
+                for batches in (batches_list if case in BATCH_CASES else batches_list[:1]):
+                    yield case, rows, columns, batches
+
+def get_metadata() -> dict:
+    """
+    Returns the environment the benchmarks ran in.
+    """
+    import numpy
+    import pandas
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+        "scikit-learn": sklearn.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Run the data-degradation-detector benchmarks.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Predefined grid of rows, columns and batches.")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASE_LIMITS), default=sorted(CASE_LIMITS), help="Cases to run.")
+    parser.add_argument("--rows", nargs="+", type=int, help="Override the number of rows of the scale.")
+    parser.add_argument("--columns", nargs="+", type=int, help="Override the number of columns of the scale.")
+    parser.add_argument("--batches", nargs="+", type=int, help="Override the number of degraded batches of the scale.")
+    parser.add_argument("--repeat", type=int, default=1, help="Times each case is timed, the fastest run is reported.")
+    parser.add_argument("--max-cells", type=int, default=200_000_000, help="Skip combinations with more rows x columns than this.")
+    parser.add_argument("--output", help="File to write the results to, printed to stdout when omitted.")
+    parser.add_argument("--single", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single:
+        result = run_single(args.single, args.rows[0], args.columns[0], args.batches[0], args.repeat)
+        print(json.dumps(result))
+        return 0
+
+    scale = SCALES[args.scale]
+    rows_list = args.rows or scale["rows"]
+    columns_list = args.columns or scale["columns"]
+    batches_list = args.batches or scale["batches"]
+
+    results = []
+    for case, rows, columns, batches in _combinations(args.cases, rows_list, columns_list, batches_list, args.max_cells):
+        result = _run_isolated(case, rows, columns, batches, args.repeat)
+        results.append(result)
+        if "error" in result:
+            print(f"{case:<24} rows={rows:<9} columns={columns:<5} batches={batches:<3} ERROR {result['error']}", file=sys.stderr)
+        else:
+            print(f"{case:<24} rows={rows:<9} columns={columns:<5} batches={batches:<3} "
+                  f"{result['seconds']:.3f}s peak_rss={result['peak_rss_mb']:.0f}MB", file=sys.stderr)
+
+    output = {"metadata": get_metadata(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=4)
+    else:
+        print(json.dumps(output, indent=4))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Measures the throughput of parallel KMeans fits against the number of worker processes, with the native
+threads of every worker left to sklearn (as many as cores) and limited by the concurrency module.
+
+Every fit is one cluster count of the k-sweep of get_best_clusters, fitted and scored on the same data.
+
+    python -m benchmarks.scaling --rows 50000 --columns 20 --fits 36 --output scaling.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+def _workers_list(cpu_count: int) -> list[int]:
+    """
+    Returns the powers of two up to the number of cores, and the number of cores.
+    """
+    workers = [1]
+    while workers[-1] * 2 < cpu_count:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cpu_count:
+        workers.append(cpu_count)
+    return workers
+
+def run_scaling(rows: int, columns: int, fits: int, workers_list: list[int] = None) -> list[dict]:
+    """
+    Runs `fits` fits across every number of workers, unlimited and limited, and returns their throughput.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from data_degradation_detector import concurrency
+    from data_degradation_detector import multivariate as mv
+    from .datasets import make_dataset
+
+    values = mv._as_array(make_dataset(rows, columns))
+    options = {"fit_sample_size": None, "silhouette_sample_size": mv.SILHOUETTE_SAMPLE_SIZE, "seed": 42}
+    cluster_counts = [2 + i % 9 for i in range(fits)]
+
+    results = []
+    for workers in workers_list or _workers_list(concurrency.get_cpu_count()):
+        for threads in ["unlimited", "limited"]:
+            if threads == "unlimited":
+                executor = ProcessPoolExecutor(max_workers=workers, initializer=mv._initialize_sweep_worker, initargs=(values, options))
+            else:
+                executor = concurrency.process_pool(workers, initializer=mv._initialize_sweep_worker, initargs=(values, options))
+            with executor:
+                # The workers are started before the timing
+                list(executor.map(abs, range(workers)))
+                start = time.perf_counter()
+                list(executor.map(mv._sweep_score, cluster_counts))
+                seconds = time.perf_counter() - start
+
+            results.append({
+                "workers": workers,
+                "threads": threads,
+                "threads_per_worker": concurrency.get_threads_per_worker(workers) if threads == "limited" else None,
+                "seconds": seconds,
+                "fits_per_second": fits / seconds,
+            })
+            print(f"workers={workers:<4} {threads:<9} {seconds:8.3f}s {fits / seconds:8.2f} fits/s", file=sys.stderr)
+
+    return results
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Measure the throughput of parallel clustering against the number of workers.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Rows of the synthetic dataset.")
+    parser.add_argument("--columns", type=int, default=20, help="Columns of the synthetic dataset.")
+    parser.add_argument("--fits", type=int, default=36, help="KMeans fits run at every number of workers.")
+    parser.add_argument("--workers", nargs="+", type=int, help="Numbers of workers, powers of two up to the number of cores by default.")
+    parser.add_argument("--output", help="File to write the results to, printed to stdout when omitted.")
+    args = parser.parse_args(argv)
+
+    from .run import get_metadata
+    output = {"metadata": get_metadata(), "results": run_scaling(args.rows, args.columns, args.fits, args.workers)}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=4)
+    else:
+        print(json.dumps(output, indent=4))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import base64
+import html
+import io
+import json
+import logging
+import os
+import queue
+import threading
+import zipfile
+from contextlib import contextmanager
+import matplotlib.pyplot as plt
+import pandas as pd
+
+OUTPUT_FORMATS = ["files", "jsonl", "html"]
+
+_logger = logging.getLogger(__name__)
+
+class ArtifactWriter:
+    """
+    A class to write the artifacts of a report under a directory from a background thread, so the computations never
+    wait on the filesystem. With the "files" format every artifact is written to its own file, as before; with "jsonl"
+    the JSON results and tables are appended to a single report.jsonl and the figures to a single figures.zip; with
+    "html" the figures are appended to a single self-contained report.html instead.
+    Artifacts must not be modified once written, they are serialized by the background thread.
+    """
+
+    def __init__(self, path: str, output_format: str = "files", max_pending: int = 64):
+        """
+        Starts the background thread of the ArtifactWriter; at most `max_pending` artifacts wait in memory to be written.
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        self.path = path
+        self.output_format = output_format
+        self.written = 0
+        self._root = os.path.abspath(path)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._results = None
+        self._figures = None
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the ArtifactWriter.
+        """
+        return f"ArtifactWriter(path={self.path}, output_format={self.output_format}, written={self.written})"
+
+    def handles(self, file_name: str) -> bool:
+        """
+        Returns whether a file belongs to the directory of the writer.
+        """
+        return os.path.commonpath([self._root, os.path.abspath(file_name)]) == self._root
+
+    def write_json(self, file_name: str, data):
+        """
+        Queues JSON data to write under `file_name`.
+        """
+        self._put("json", file_name, data)
+
+    def write_figure(self, file_name: str, png: bytes):
+        """
+        Queues a figure rendered to PNG to write under `file_name`.
+        """
+        self._put("figure", file_name, png)
+
+    def write_table(self, file_name: str, table: pd.DataFrame):
+        """
+        Queues a table to write under `file_name`, as CSV or Parquet after its extension, or as records in report.jsonl.
+        """
+        self._put("table", file_name, table)
+
+    def close(self):
+        """
+        Waits for every queued artifact to be written, closes the archives and raises the first error of the background thread.
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, kind: str, file_name: str, data):
+        if self._error is not None:
+            raise self._error
+        if not self._thread.is_alive():
+            raise ValueError("The ArtifactWriter is closed.")
+        self._queue.put((kind, os.path.relpath(os.path.abspath(file_name), self._root), data))
+
+    def _run(self):
+        """
+        Writes the queued artifacts until the end of the queue, keeping the first error and dropping the artifacts after it.
+        """
+        try:
+            while (item := self._queue.get()) is not None:
+                self._write(*item)
+                self.written += 1
+        except Exception as error:
+            self._error = error
+            while self._queue.get() is not None:
+                pass
+        finally:
+            self._close_archives()
+
+    def _write(self, kind: str, name: str, data):
+        if self.output_format == "files":
+            file_name = os.path.join(self.path, name)
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+            if kind == "json":
+                with open(file_name, 'w') as f:
+                    json.dump(data, f, indent=4)
+            elif kind == "figure":
+                with open(file_name, 'wb') as f:
+                    f.write(data)
+            else:
+                _write_table_file(file_name, data)
+            return
+
+        if kind == "figure":
+            self._write_figure(name, data)
+            return
+
+        if self._results is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._results = open(os.path.join(self.path, "report.jsonl"), 'w')
+        if kind == "table":
+            data = json.loads(data.to_json(orient="records"))
+        self._results.write(json.dumps({"name": name, "data": data}) + "\n")
+
+    def _write_figure(self, name: str, png: bytes):
+        """
+        Appends a figure to figures.zip, or to report.html, opened with its first figure.
+        """
+        if self._figures is None:
+            os.makedirs(self.path, exist_ok=True)
+            if self.output_format == "jsonl":
+                # PNG is already compressed
+                self._figures = zipfile.ZipFile(os.path.join(self.path, "figures.zip"), 'w', compression=zipfile.ZIP_STORED)
+            else:
+                self._figures = open(os.path.join(self.path, "report.html"), 'w')
+                self._figures.write("<!DOCTYPE html>\n<html>\n<head><meta charset=\"utf-8\"><title>Data degradation report</title></head>\n<body>\n")
+
+        if self.output_format == "jsonl":
+            self._figures.writestr(name, png)
+        else:
+            self._figures.write(f"<figure><img src=\"data:image/png;base64,{base64.b64encode(png).decode('ascii')}\">"
+                                f"<figcaption>{html.escape(name)}</figcaption></figure>\n")
+
+    def _close_archives(self):
+        if self._results is not None:
+            self._results.close()
+        if self._figures is not None:
+            if self.output_format == "html":
+                self._figures.write("</body>\n</html>\n")
+            self._figures.close()
+
+def _write_table_file(file_name: str, table: pd.DataFrame):
+    if file_name.endswith(".parquet"):
+        table.to_parquet(file_name, index=False)
+    else:
+        table.to_csv(file_name, index=False)
+
+_writer = None
+
+def get_writer() -> ArtifactWriter:
+    """
+    Returns the active ArtifactWriter, or None.
+    """
+    return _writer
+
+@contextmanager
+def writing(writer: ArtifactWriter):
+    """
+    Activates the writer for the artifacts saved in the block, and waits for all of them to be written at its end.
+    When the block raises, its error is raised and an error of the writer is only logged.
+    """
+    global _writer
+    previous = _writer
+    _writer = writer
+    try:
+        yield writer
+    except BaseException:
+        _writer = previous
+        try:
+            writer.close()
+        except Exception:
+            _logger.exception("The artifacts could not be written after the report failed.")
+        raise
+    _writer = previous
+    writer.close()
+
+def _active_writer(file_name: str) -> ArtifactWriter:
+    writer = _writer
+    return writer if writer is not None and writer.handles(file_name) else None
+
+def save_json(file_name: str, data):
+    """
+    Saves JSON data through the active writer when the file is under its directory, and to the file otherwise.
+    """
+    writer = _active_writer(file_name)
+    if writer is not None:
+        writer.write_json(file_name, data)
+        return
+
+    os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+    with open(file_name, 'w') as f:
+        json.dump(data, f, indent=4)
+
+def save_figure(file_name: str):
+    """
+    Saves and closes the current figure, rendered to PNG here and written through the active writer
+    when the file is under its directory, and to the file otherwise.
+    """
+    writer = _active_writer(file_name)
+    if writer is not None:
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format="png")
+        plt.close()
+        writer.write_figure(file_name, buffer.getvalue())
+        return
+
+    os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+    plt.savefig(file_name)
+    plt.close()
+
+def save_table(file_name: str, table: pd.DataFrame):
+    """
+    Saves a table as CSV or Parquet, after the extension of the file, through the active writer when the file is under its directory.
+    """
+    writer = _active_writer(file_name)
+    if writer is not None:
+        writer.write_table(file_name, table)
+        return
+
+    os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+    _write_table_file(file_name, table)
+
+def read_results(path: str) -> dict:
+    """
+    Reads the JSON results and tables appended to `{path}/report.jsonl`, keyed by their file name in the "files" format.
+    """
+    results = dict()
+    with open(f"{path}/report.jsonl", 'r') as f:
+        for line in f:
+            record = json.loads(line)
+            results[record["name"]] = record["data"]
+
+    return results
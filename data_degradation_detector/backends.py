@@ -0,0 +1,376 @@
+import numpy as np
+import pandas as pd
+from .distinct import HyperLogLog
+from .histograms import Histogram, bin_counts, get_edges
+from .sampling import DEFAULT_SEED, sample_indices
+
+STATISTICS = ["count", "mean", "std", "min_val", "max_val", "q1", "q2", "q3"]
+QUALITY_STATISTICS = ["null_count", "inf_count", "zero_count"]
+
+def backend_of(df) -> str:
+    """
+    Returns "polars" for a Polars DataFrame, "arrow" for an Arrow table and "pandas" otherwise,
+    without importing Polars or pyarrow.
+    """
+    module = type(df).__module__
+    if module.startswith("polars") and type(df).__name__ == "DataFrame":
+        return "polars"
+    if module.startswith("pyarrow") and type(df).__name__ == "Table":
+        return "arrow"
+    return "pandas"
+
+def is_native(df) -> bool:
+    """
+    Returns whether the statistics of df are computed by Polars or Arrow instead of pandas.
+    """
+    return backend_of(df) != "pandas"
+
+def read_table(path: str, backend: str = "pandas"):
+    """
+    Read a CSV or Parquet file into a pandas DataFrame, a Polars DataFrame ("polars") or an Arrow table ("arrow").
+    """
+    parquet = path.endswith(".parquet")
+    if backend == "pandas":
+        return pd.read_parquet(path) if parquet else pd.read_csv(path)
+    if backend == "polars":
+        import polars as pl
+        return pl.read_parquet(path) if parquet else pl.read_csv(path)
+    if backend == "arrow":
+        if parquet:
+            import pyarrow.parquet as pq
+            return pq.read_table(path)
+        import pyarrow.csv as csv
+        return csv.read_csv(path)
+
+    raise ValueError(f"Unknown backend: {backend}")
+
+def column_names(df) -> list[str]:
+    """
+    Returns the names of the columns of a DataFrame or table of any backend.
+    """
+    return list(df.column_names) if backend_of(df) == "arrow" else list(df.columns)
+
+def select_columns(df, columns: list[str]):
+    """
+    Returns the given columns of a DataFrame or table of any backend, in that order.
+    """
+    if backend_of(df) == "pandas":
+        return df[columns]
+    return df.select(columns)
+
+def drop_columns(df, columns: list[str]):
+    """
+    Returns a DataFrame or table of any backend without the given columns, ignoring those it does not have.
+    """
+    return select_columns(df, [column for column in column_names(df) if column not in columns])
+
+def is_categorical(df, column: str) -> bool:
+    """
+    Returns whether a column of a Polars DataFrame or Arrow table is described by a frequency table.
+    Like the pandas columns, booleans and every non-numeric column are categorical.
+    """
+    if backend_of(df) == "polars":
+        return not df.schema[column].is_numeric()
+
+    import pyarrow as pa
+    dtype = df.schema.field(column).type
+    return not (pa.types.is_integer(dtype) or pa.types.is_floating(dtype))
+
+def _polars_values(df, column: str):
+    """
+    Returns the Polars expression of a column with its NaNs and infinities as missing values, as the descriptors treat them.
+    """
+    import polars as pl
+
+    expression = pl.col(column)
+    return pl.when(expression.is_finite()).then(expression) if df.schema[column].is_float() else expression
+
+def _arrow_values(df, column: str):
+    """
+    Returns the finite values of a column of an Arrow table, without its nulls, NaNs and infinities.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.drop_null(df.column(column))
+    if pa.types.is_floating(values.type):
+        values = pc.filter(values, pc.is_finite(values))
+    return values
+
+def _float(value) -> float:
+    """
+    Returns a statistic as a float, NaN when the backend returned a missing value.
+    """
+    return float('nan') if value is None else float(value)
+
+def numeric_statistics(df, columns: list[str]) -> dict[str, dict]:
+    """
+    Returns the count, mean, standard deviation, minimum, maximum and linear quartiles of the finite values
+    of every numeric column, with its number of missing values, infinities and zeros, computed by the aggregations
+    of the backend. Polars evaluates every statistic of every column in one multi-threaded query, Arrow runs its
+    compute kernels column by column.
+    """
+    statistics = dict()
+    if backend_of(df) == "polars":
+        import polars as pl
+
+        expressions = []
+        for i, column in enumerate(columns):
+            values = _polars_values(df, column)
+            is_float = df.schema[column].is_float()
+            expressions += [
+                values.count().alias(f"{i}_count"),
+                values.mean().alias(f"{i}_mean"),
+                values.std(ddof=1).alias(f"{i}_std"),
+                values.min().alias(f"{i}_min_val"),
+                values.max().alias(f"{i}_max_val"),
+                values.quantile(0.25, interpolation="linear").alias(f"{i}_q1"),
+                values.quantile(0.5, interpolation="linear").alias(f"{i}_q2"),
+                values.quantile(0.75, interpolation="linear").alias(f"{i}_q3"),
+                (pl.col(column).null_count() + (pl.col(column).is_nan().sum() if is_float else 0)).alias(f"{i}_null_count"),
+                (pl.col(column).is_infinite().sum() if is_float else pl.lit(0)).alias(f"{i}_inf_count"),
+                (values == 0).sum().alias(f"{i}_zero_count")
+            ]
+        row = df.select(expressions).row(0, named=True) if expressions else {}
+        for i, column in enumerate(columns):
+            statistics[column] = {stat: row[f"{i}_{stat}"] for stat in STATISTICS + QUALITY_STATISTICS}
+    else:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        for column in columns:
+            values = _arrow_values(df, column)
+            extremes = pc.min_max(values)
+            quartiles = pc.quantile(values, q=[0.25, 0.5, 0.75], interpolation="linear").to_pylist()
+            raw = df.column(column)
+            is_float = pa.types.is_floating(raw.type)
+            statistics[column] = {
+                "count": pc.count(values).as_py(),
+                "mean": pc.mean(values).as_py(),
+                "std": pc.stddev(values, ddof=1).as_py(),
+                "min_val": extremes["min"].as_py(),
+                "max_val": extremes["max"].as_py(),
+                "q1": quartiles[0],
+                "q2": quartiles[1],
+                "q3": quartiles[2],
+                "null_count": raw.null_count + ((pc.sum(pc.is_nan(raw)).as_py() or 0) if is_float else 0),
+                "inf_count": (pc.sum(pc.is_inf(raw)).as_py() or 0) if is_float else 0,
+                "zero_count": pc.sum(pc.equal(values, 0)).as_py() or 0
+            }
+
+    for column_statistics in statistics.values():
+        for stat in ["mean", "std", "q1", "q2", "q3"]:
+            column_statistics[stat] = _float(column_statistics[stat])
+        for stat in ["min_val", "max_val"]:
+            if column_statistics[stat] is None:
+                column_statistics[stat] = float('nan')
+
+    return statistics
+
+def category_counts(df, column: str) -> pd.Series:
+    """
+    Returns the counts of the non-missing categories of a column, as the small pandas Series the frequency tables are built from.
+    """
+    if backend_of(df) == "polars":
+        import polars as pl
+
+        counts = df.lazy().filter(pl.col(column).is_not_null()).group_by(column).len().collect()
+        return pd.Series(counts["len"].to_list(), index=counts[column].to_list(), dtype=np.int64)
+
+    import pyarrow as pa
+
+    values = df.column(column)
+    if pa.types.is_dictionary(values.type):
+        values = values.cast(values.type.value_type)
+    counts = values.value_counts().flatten()
+    categories, counts = counts[0].to_pylist(), counts[1].to_pylist()
+    return pd.Series({category: count for category, count in zip(categories, counts) if category is not None}, dtype=np.int64)
+
+def describe(df, max_categories: int = 50) -> dict:
+    """
+    Returns the DistributionDescriptors of the numeric columns and the CategoricalDescriptors of the other
+    columns of a Polars DataFrame or Arrow table, without converting it to pandas.
+    """
+    from . import univariate as uv
+
+    columns = column_names(df)
+    numeric = [column for column in columns if not is_categorical(df, column)]
+    statistics = numeric_statistics(df, numeric)
+
+    descriptors = dict()
+    for column in columns:
+        if column in statistics:
+            descriptors[column] = uv.DistributionDescriptors(json_data={
+                **{stat: value for stat, value in statistics[column].items() if stat != "count"},
+                "count": len(df),
+                "distinct_count": HyperLogLog().update(numeric_values(df, column)).estimate()
+            })
+        else:
+            descriptors[column] = uv.CategoricalDescriptors(json_data=uv.get_frequency_table(category_counts(df, column), max_categories))
+
+    return descriptors
+
+def _bin_counts(df, column: str, edges: np.ndarray) -> np.ndarray:
+    """
+    Returns the counts of bin_counts for a column of a Polars DataFrame or Arrow table.
+    Polars bins the column itself, Arrow chunks are binned as NumPy views, one at a time.
+    """
+    if backend_of(df) == "arrow":
+        counts = np.zeros(len(edges) + 1, dtype=np.int64)
+        for chunk in _arrow_values(df, column).chunks:
+            counts += bin_counts(chunk.to_numpy(zero_copy_only=False), edges)
+        return counts
+
+    import polars as pl
+
+    values = pl.col(column)
+    # Same positions as np.searchsorted(edges, values, side='right'), the maximum of the original values in the last bin
+    positions = pl.when(values == edges[-1]).then(len(edges) - 1).otherwise(pl.lit(pl.Series(edges)).search_sorted(values, side="right"))
+    bins = (df.lazy().select(_polars_values(df, column).alias(column)).drop_nulls()
+            .select(positions.alias("bin")).group_by("bin").len().collect())
+
+    counts = np.zeros(len(edges) + 1, dtype=np.int64)
+    counts[bins["bin"].to_numpy()] = bins["len"].to_numpy()
+    return counts
+
+def _extremes(df, columns: list[str]) -> dict[str, np.ndarray]:
+    """
+    Returns the minimum and maximum of the non-missing values of every column, or an empty array for a column without values.
+    """
+    if backend_of(df) == "polars":
+        row = df.select([
+            expression for i, column in enumerate(columns)
+            for expression in (_polars_values(df, column).min().alias(f"{i}_min"), _polars_values(df, column).max().alias(f"{i}_max"))
+        ]).row(0, named=True) if columns else {}
+        extremes = {column: (row[f"{i}_min"], row[f"{i}_max"]) for i, column in enumerate(columns)}
+    else:
+        import pyarrow.compute as pc
+
+        extremes = dict()
+        for column in columns:
+            result = pc.min_max(_arrow_values(df, column))
+            extremes[column] = (result["min"].as_py(), result["max"].as_py())
+
+    return {column: np.array([] if low is None else [low, high], dtype=float) for column, (low, high) in extremes.items()}
+
+def histograms(df, bins: int = 20, edges: dict[str, np.ndarray] = None) -> dict[str, Histogram]:
+    """
+    Returns the Histograms of the numeric columns of a Polars DataFrame or Arrow table, over the given
+    edges of every column or `bins` equal-width bins between its minimum and maximum.
+    """
+    if edges is None:
+        numeric = [column for column in column_names(df) if not is_categorical(df, column)]
+        edges = {column: get_edges(extremes, bins) for column, extremes in _extremes(df, numeric).items()}
+
+    result = dict()
+    for column, column_edges in edges.items():
+        histogram = Histogram(json_data={"edges": column_edges, "counts": _bin_counts(df, column, np.asarray(column_edges, dtype=float))})
+        result[column] = histogram
+
+    return result
+
+def numeric_values(df, column: str) -> np.ndarray:
+    """
+    Returns the non-missing values of a numeric column of a DataFrame or table of any backend as a NumPy array.
+    """
+    backend = backend_of(df)
+    if backend == "pandas":
+        from . import univariate as uv
+        return uv._numeric_values(df[column])
+    if backend == "polars":
+        return df.select(_polars_values(df, column)).to_series().drop_nulls().to_numpy()
+    return _arrow_values(df, column).to_numpy()
+
+def finite_values(df, column: str) -> tuple[np.ndarray, int, int]:
+    """
+    Returns the finite values of a numeric column of a DataFrame or table of any backend as a NumPy array,
+    along with its number of missing values and of infinities.
+    """
+    backend = backend_of(df)
+    if backend == "pandas":
+        from . import univariate as uv
+        return uv._finite_values(df[column])
+
+    values = numeric_values(df, column)
+    if backend == "polars":
+        series = df.get_column(column)
+        if not series.dtype.is_float():
+            return values, series.null_count(), 0
+        inf_count = int(series.is_infinite().sum())
+    else:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        series = df.column(column)
+        if not pa.types.is_floating(series.type):
+            return values, series.null_count, 0
+        inf_count = pc.sum(pc.is_inf(series)).as_py() or 0
+
+    return values, len(series) - len(values) - inf_count, inf_count
+
+def _is_boolean(df, column: str) -> bool:
+    """
+    Returns whether a column of a Polars DataFrame or Arrow table holds booleans.
+    """
+    if backend_of(df) == "polars":
+        import polars as pl
+        return df.schema[column] == pl.Boolean
+
+    import pyarrow as pa
+    return pa.types.is_boolean(df.schema.field(column).type)
+
+def numeric_frame(df, columns: list[str] = None) -> pd.DataFrame:
+    """
+    Returns the numeric columns (or the given ones) of a Polars DataFrame or Arrow table as a pandas DataFrame
+    over a single float64 array, with missing values as NaN, which the clustering uses without another copy.
+    """
+    if columns is None:
+        columns = [column for column in column_names(df) if not is_categorical(df, column)]
+    if backend_of(df) == "polars":
+        import polars as pl
+        values = df.select([pl.col(column).cast(pl.Float64) for column in columns]).to_numpy()
+    else:
+        import pyarrow as pa
+        values = np.empty((df.num_rows, len(columns)), order='F')
+        for i, column in enumerate(columns):
+            values[:, i] = df.column(column).cast(pa.float64()).to_numpy()
+
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+def correlation(df) -> pd.DataFrame:
+    """
+    Returns the Pearson correlation matrix of the numeric and boolean columns of a Polars DataFrame or Arrow table,
+    over the rows where both columns have a value, as pandas computes it. Polars computes every pair in one query,
+    Arrow has no correlation kernel, so its columns go through numeric_frame.
+    """
+    columns = [column for column in column_names(df) if not is_categorical(df, column) or _is_boolean(df, column)]
+    if backend_of(df) == "arrow":
+        return numeric_frame(df, columns).corr()
+
+    import polars as pl
+
+    values = [_polars_values(df, column).cast(pl.Float64) for column in columns]
+    pairs = [(i, j) for i in range(len(columns)) for j in range(i, len(columns))]
+    row = df.select([pl.corr(values[i], values[j]).alias(f"{i}_{j}") for i, j in pairs]).row(0) if pairs else ()
+
+    corr = np.full((len(columns), len(columns)), np.nan)
+    for (i, j), value in zip(pairs, row):
+        corr[i, j] = corr[j, i] = _float(value)
+
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+def to_pandas(df, sample_size: int = None, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """
+    Returns a uniform sample of `sample_size` rows (all of them when None) of a DataFrame or table of any backend
+    as a pandas DataFrame, for the plots, which draw the rows themselves.
+    """
+    backend = backend_of(df)
+    indices = sample_indices(len(df), sample_size, seed) if sample_size is not None else None
+    if backend == "pandas":
+        return df if indices is None else df.iloc[indices]
+    if backend == "arrow":
+        return (df if indices is None else df.take(indices)).to_pandas()
+
+    if indices is not None:
+        df = df[indices]
+    return pd.DataFrame({column: df[column].to_numpy() for column in df.columns})
@@ -0,0 +1,205 @@
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+from .concurrency import get_cpu_count, get_threads_per_worker, limit_threads
+
+def load_manifest(path: str) -> list[dict]:
+    """
+    Load the jobs of a manifest file.
+
+    The manifest is a JSON list of jobs, or an object with a "jobs" list. Every job has:
+    name (str): Unique name of the job, used for its output directory.
+    dataset (str): CSV or Parquet file with the original data, including the target.
+    target (str): Name of the target column.
+    batches (list[str]): CSV or Parquet files with the degraded batches.
+    baseline (str, optional): Directory of the initial report, created from the dataset when it has no kmeans_clusters.json.
+    base_metrics (dict, optional): Metrics of the model on the original data.
+    new_metrics (list[dict], optional): Metrics of the model on every batch, one per batch, which need base_metrics or a baseline.
+    number_of_output_classes (int, optional): Fixed number of clusters of the baseline.
+    drop_columns (list[str], optional): Columns to leave out of the analysis, such as ids.
+    """
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+
+    jobs = manifest["jobs"] if isinstance(manifest, dict) else manifest
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Every job of the manifest must have a unique name.")
+
+    for job in jobs:
+        new_metrics = job.get("new_metrics")
+        if not new_metrics:
+            continue
+        if not job.get("base_metrics") and "baseline" not in job:
+            raise ValueError(f"Job '{job['name']}' has new_metrics but no base_metrics to compare them with.")
+        if len(new_metrics) != len(job["batches"]):
+            raise ValueError(f"Job '{job['name']}' must have one entry of new_metrics per batch.")
+
+    return jobs
+
+def _read_table(path: str):
+    """
+    Read a CSV or Parquet file into a pandas DataFrame.
+    """
+    import pandas as pd
+
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def run_job(job: dict, output: str, plot_sample_size: int = None) -> dict:
+    """
+    Create the baseline (when missing) and the report of one job, and return its drift verdict.
+    """
+    from . import multivariate as mv
+    from . import report
+
+    name = job["name"]
+    target = job["target"]
+    drop_columns = job.get("drop_columns", [])
+    baseline_path = job.get("baseline", f"{output}/{name}/baseline")
+    report_path = f"{output}/{name}/report"
+
+    df = _read_table(job["dataset"]).drop(columns=drop_columns)
+    if not os.path.exists(f"{baseline_path}/kmeans_clusters.json"):
+        report.create_initial_report(df, target, job.get("base_metrics", {}), baseline_path,
+                                     number_of_output_classes=job.get("number_of_output_classes"),
+                                     plot_sample_size=plot_sample_size)
+
+    with open(f"{baseline_path}/kmeans_clusters.json", 'r') as f:
+        original_clusters = mv.get_cluster_info_from_json(json.load(f))
+    with open(f"{baseline_path}/base_metrics.json", 'r') as f:
+        base_metrics = json.load(f)
+
+    X = df.drop(columns=[target])
+    degraded_dfs = [
+        _read_table(batch_path).drop(columns=drop_columns + [target], errors='ignore')[X.columns]
+        for batch_path in job["batches"]
+    ]
+
+    result = report.create_report(X, original_clusters, degraded_dfs, base_metrics, report_path,
+                                  new_metrics=job.get("new_metrics"), plot_sample_size=plot_sample_size)
+
+    return {
+        "baseline": baseline_path,
+        "report": report_path,
+        "verdict": report.get_drift_verdict(result)
+    }
+
+def _preload_modules():
+    """
+    Import the plotting and sklearn modules once in the driver, so forked workers share them instead of importing them per job.
+    """
+    import matplotlib
+    import matplotlib.pyplot
+    import seaborn
+    import sklearn.cluster
+    import sklearn.metrics
+    from . import report
+
+def _limit_memory(memory_limit_mb: int):
+    """
+    Limit the address space of the current process, allocations past it raise MemoryError.
+    """
+    if memory_limit_mb is None:
+        return
+
+    import resource
+
+    limit = int(memory_limit_mb) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _job_process(job: dict, output: str, plot_sample_size: int, memory_limit_mb: int, threads: int, connection):
+    """
+    Entry point of the process running one job, sends its result back through the connection.
+    """
+    start = time.perf_counter()
+    try:
+        import matplotlib.pyplot as plt
+        plt.switch_backend("Agg")
+        _limit_memory(memory_limit_mb)
+        limit_threads(threads)
+
+        result = {"name": job["name"], "status": "ok", **run_job(job, output, plot_sample_size)}
+    except BaseException as e:
+        result = {"name": job["name"], "status": "failed", "error": f"{type(e).__name__}: {e}",
+                  "traceback": traceback.format_exc()}
+    finally:
+        # The job processes are not daemonic so the pools of the job can start, stop any worker they left behind
+        for child in multiprocessing.active_children():
+            child.terminate()
+            child.join()
+
+    result["seconds"] = time.perf_counter() - start
+    connection.send(result)
+    connection.close()
+
+def run_manifest(jobs: list[dict] | str, output: str, max_workers: int = None, memory_limit_mb: int = None, plot_sample_size: int = None) -> list[dict]:
+    """
+    Run the jobs of a manifest across a pool of processes and write the summary index to `{output}/index.json`.
+
+    Every job runs in its own process, at most `max_workers` (the number of cores by default) at the same time,
+    with an address space limited to `memory_limit_mb` MB and its OpenMP and BLAS threads limited to
+    get_threads_per_worker, so the jobs do not oversubscribe the cores. A job that raises, runs out of memory
+    or is killed is recorded as failed without stopping the others. The job processes are not daemonic, so a job can
+    run its own process pools (cluster_workers, stability_workers, permutation_workers), and any of them still running
+    when the manifest stops, for example on KeyboardInterrupt, is terminated. On platforms with fork the plotting and sklearn modules are
+    imported once and shared by all the job processes.
+    """
+    if isinstance(jobs, str):
+        jobs = load_manifest(jobs)
+
+    max_workers = max_workers or get_cpu_count()
+    threads = get_threads_per_worker(max_workers)
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    if context.get_start_method() == "fork":
+        _preload_modules()
+
+    os.makedirs(output, exist_ok=True)
+    pending = list(jobs)
+    running = dict()
+    results = dict()
+
+    try:
+        while pending or running:
+            while pending and len(running) < max_workers:
+                job = pending.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_job_process, args=(job, output, plot_sample_size, memory_limit_mb, threads, sender))
+                process.start()
+                sender.close()
+                running[receiver] = (process, job, time.perf_counter())
+
+            for receiver in wait(list(running)):
+                process, job, start = running.pop(receiver)
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    # The process died before answering, for example killed by the OOM killer
+                    process.join()
+                    result = {"name": job["name"], "status": "failed",
+                              "error": f"Worker process exited with code {process.exitcode}",
+                              "seconds": time.perf_counter() - start}
+                receiver.close()
+                process.join()
+                results[job["name"]] = result
+    finally:
+        for receiver, (process, _, _) in running.items():
+            process.terminate()
+            process.join()
+            receiver.close()
+
+    index = [results[job["name"]] for job in jobs]
+    with open(f"{output}/index.json", 'w') as f:
+        json.dump({
+            "jobs": len(index),
+            "failed": sum(result["status"] == "failed" for result in index),
+            "drifted": sum(result.get("verdict", {}).get("drifted", False) for result in index),
+            "results": index
+        }, f, indent=4)
+
+    return index
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from . import backends
+from . import univariate as uv
+from .histograms import Histogram, ks_statistic, population_stability_index, wasserstein_distance
+from .profiling import profiled, span
+from .sampling import DEFAULT_SEED, sample_indices
+
+DESCRIPTOR_METRICS = ["mean", "std", "q1", "q2", "q3"]
+HISTOGRAM_METRICS = ["psi", "ks", "wasserstein"]
+
+# Values drawn at once by the bootstrap, bounds its memory to about 32 MB per block
+_BLOCK_VALUES = 4_000_000
+
+def _threshold(statistics: np.ndarray, level: float) -> float:
+    """
+    Returns the `level` quantile of the bootstrap values of a drift statistic.
+    A statistic that never moves gets a tiny threshold instead of zero, so any change of it is still reported.
+    """
+    return max(float(np.quantile(statistics, level)), float(np.finfo(float).eps))
+
+def _bootstrap_descriptors(values: np.ndarray, batch_size: int, n_bootstrap: int, rng: np.random.Generator) -> dict[str, np.ndarray]:
+    """
+    Returns the descriptors of `n_bootstrap` batches of `batch_size` values drawn with replacement,
+    computed along the rows of blocks of resamples at once.
+    """
+    block_size = max(1, _BLOCK_VALUES // batch_size)
+    statistics = {metric: [] for metric in DESCRIPTOR_METRICS}
+    for start in range(0, n_bootstrap, block_size):
+        resamples = values[rng.integers(0, len(values), size=(min(block_size, n_bootstrap - start), batch_size))]
+        q1, q2, q3 = np.quantile(resamples, [0.25, 0.5, 0.75], axis=1)
+        statistics["mean"].append(resamples.mean(axis=1))
+        statistics["std"].append(resamples.std(axis=1, ddof=1))
+        statistics["q1"].append(q1)
+        statistics["q2"].append(q2)
+        statistics["q3"].append(q3)
+
+    return {metric: np.concatenate(values) for metric, values in statistics.items()}
+
+def _calibrate_numeric(values: np.ndarray, histogram: Histogram, batch_size: int, n_bootstrap: int, n_count_bootstrap: int, level: float, rng: np.random.Generator) -> dict:
+    """
+    Returns the thresholds of the descriptors and, when a histogram is given, of its drift tests for a numeric column.
+    The descriptors are close to normal, so their thresholds come from the bootstrap standard error, which is
+    stable with few resamples. The drift test thresholds are empirical quantiles of cheap multinomial resamples.
+    """
+    bootstrap = _bootstrap_descriptors(values, batch_size, n_bootstrap, rng)
+    z = norm.ppf(1 - (1 - level) / 2)
+    thresholds = {
+        metric: max(float(z * bootstrap[metric].std(ddof=1)), float(np.finfo(float).eps * max(1.0, abs(bootstrap[metric].mean()))))
+        for metric in DESCRIPTOR_METRICS
+    }
+
+    if histogram is not None and histogram.counts.sum() > 0:
+        # Batches drawn from the baseline histogram itself, as multinomial counts over its bins
+        counts = rng.multinomial(batch_size, histogram.counts / histogram.counts.sum(), size=n_count_bootstrap)
+        thresholds["psi"] = _threshold(population_stability_index(histogram.counts, counts), level)
+        thresholds["ks"] = _threshold(ks_statistic(histogram.counts, counts)[0], level)
+        thresholds["wasserstein"] = _threshold(wasserstein_distance(histogram.edges, histogram.counts, counts), level)
+
+    return thresholds
+
+def _calibrate_categorical(descriptors: uv.CategoricalDescriptors, batch_size: int, n_count_bootstrap: int, false_alarm_rate: float, rng: np.random.Generator) -> dict:
+    """
+    Returns the PSI threshold of a categorical column from batches drawn from its frequency table,
+    and the significance level of its chi-square test, sharing the false alarm rate between both.
+    """
+    expected = np.array(list(descriptors.frequencies.values()), dtype=float)
+    if expected.sum() == 0:
+        return {}
+
+    counts = rng.multinomial(batch_size, expected / expected.sum(), size=n_count_bootstrap)
+    return {
+        "psi": _threshold(population_stability_index(expected, counts), 1 - false_alarm_rate / 2),
+        "alpha": false_alarm_rate / 2
+    }
+
+@profiled("calibration.calibrate_thresholds")
+def calibrate_thresholds(df: pd.DataFrame, descriptors: dict = None, histograms: dict[str, Histogram] = None, false_alarm_rate: float = 0.01,
+                         n_bootstrap: int = 200, batch_size: int = None, sample_size: int = 10_000, seed: int = DEFAULT_SEED,
+                         n_count_bootstrap: int = 5000) -> dict[str, dict[str, float]]:
+    """
+    Learns the drift thresholds of every column by bootstrapping the original data.
+
+    Batches of `batch_size` rows (the size of the subsample by default) are resampled `n_bootstrap` times from a
+    uniform subsample of `sample_size` rows of every numeric column, and `n_count_bootstrap` times from the histograms
+    and frequency tables for the drift tests and categorical columns. The threshold of every metric is the deviation
+    that keeps the false alarm rate of the column, over all its metrics, below `false_alarm_rate`.
+    Returns a dictionary of thresholds per column and metric, in the units of the compared statistics.
+    """
+    descriptors = descriptors if descriptors is not None else uv.get_distribution_descriptors_all_columns(df)
+    histograms = histograms or {}
+    rng = np.random.default_rng(seed)
+
+    thresholds = dict()
+    for column_name, column_descriptors in descriptors.items():
+        with span("calibration.bootstrap"):
+            if isinstance(column_descriptors, uv.CategoricalDescriptors):
+                column_batch_size = batch_size or min(column_descriptors.count, sample_size)
+                if column_batch_size > 0:
+                    thresholds[column_name] = _calibrate_categorical(column_descriptors, column_batch_size, n_count_bootstrap, false_alarm_rate, rng)
+                continue
+
+            values = backends.numeric_values(df, column_name)
+            if len(values) < 2:
+                continue
+            values = values[sample_indices(len(values), sample_size, seed)].astype(float)
+
+            histogram = histograms.get(column_name)
+            # Bonferroni correction over the metrics of the column
+            level = 1 - false_alarm_rate / (len(DESCRIPTOR_METRICS) + (len(HISTOGRAM_METRICS) if histogram is not None else 0))
+            thresholds[column_name] = _calibrate_numeric(values, histogram, batch_size or len(values), n_bootstrap, n_count_bootstrap, level, rng)
+
+    return thresholds
@@ -0,0 +1,442 @@
+"""
+Command-line interface of data-degradation-detector.
+
+    data-degradation-detector baseline data/WineQT.csv --target quality --drop Id --output baseline
+    data-degradation-detector compare baseline batch_1.csv batch_2.csv --target quality --drop Id --jsonl
+    data-degradation-detector report baseline data/WineQT.csv batch_1.csv --target quality --drop Id --output report
+    data-degradation-detector batch manifest.json --output reports --workers 8
+
+The heavy modules (pandas, sklearn, matplotlib) are only imported by the subcommand that needs them.
+"""
+
+import argparse
+import json
+import sys
+
+def _use_agg_backend():
+    """
+    Select the non-interactive matplotlib backend, the CLI only writes figures to files.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+def _emit(record: dict, args):
+    """
+    Print a result as a JSON line or as a short human readable line.
+    """
+    if args.jsonl:
+        print(json.dumps(record), flush=True)
+    else:
+        print(', '.join(f"{k}: {v}" for k, v in record.items() if not isinstance(v, dict)), flush=True)
+
+def _read_chunks(path: str, chunksize: int, drop: list[str]):
+    """
+    Yield the chunks of a CSV file without the dropped columns.
+    """
+    import pandas as pd
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        yield chunk.drop(columns=drop, errors='ignore')
+
+def _read_frame(path: str, drop: list[str], backend: str = "pandas"):
+    """
+    Read a whole CSV or Parquet file with the given backend, without the dropped columns.
+    """
+    from .backends import drop_columns, read_table
+
+    return drop_columns(read_table(path, backend), drop)
+
+def _iter_batches(paths: list[str], chunksize: int, drop: list[str], backend: str = "pandas"):
+    """
+    Yield (label, DataFrame) for every file, or for every chunk of every file when `chunksize` is given.
+    Chunks are always read by pandas, whole files by the given backend.
+    """
+    for path in paths:
+        if chunksize:
+            for i, chunk in enumerate(_read_chunks(path, chunksize, drop)):
+                yield f"{path}#{i}", chunk
+        else:
+            yield path, _read_frame(path, drop, backend)
+
+def _load_json_option(path: str):
+    if path is None:
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def run_baseline(args) -> int:
+    """
+    Create the baseline statistics of the original data, in memory or streaming over chunks of a CSV file.
+    """
+    _use_agg_backend()
+    from . import report
+
+    base_metrics = _load_json_option(args.metrics) or {}
+
+    if not args.chunksize:
+        df = _read_frame(args.data, args.drop, args.backend)
+        report.create_initial_report(df, args.target, base_metrics, args.output, number_of_output_classes=args.classes,
+                                     plot_sample_size=args.plot_sample_size, profile=args.profile, histogram_bins=args.bins,
+                                     plot=not args.no_plot, binary=args.binary, n_components=args.components,
+                                     projection_method=args.projection, scaling=args.scaling, calibrate=args.calibrate,
+                                     false_alarm_rate=args.false_alarm_rate, calibration_batch_size=args.calibration_batch_size,
+                                     stability_bootstrap=args.stability_bootstrap, stability_workers=args.stability_workers,
+                                     segment_column=args.segment, cluster_workers=args.cluster_workers,
+                                     nan_policy=args.nan_policy, coreset_size=args.coreset_size,
+                                     multivariate_drift=args.multivariate_drift)
+        _emit({"baseline": args.output, "rows": len(df), "mode": "in-memory"}, args)
+        return 0
+
+    from . import multivariate as mv
+    from . import profiling as prof
+    from . import univariate as uv
+    from .calibration import calibrate_thresholds
+    from .histograms import get_edges
+    from .multivariate_drift import MultivariateBaseline
+    from .streaming import describe_chunks, histogram_chunks
+    from contextlib import nullcontext
+    import numpy as np
+
+    drop = args.drop + [args.target]
+    collector = prof.TimingCollector() if args.profile else None
+    with prof.profiling(collector) if collector else nullcontext():
+        # First pass: exact moments and frequencies plus a reservoir sample of the rows
+        descriptors, sample = describe_chunks(_read_chunks(args.data, args.chunksize, drop), sample_size=args.sample_size)
+        # Second pass: exact histograms over the edges of the exact range
+        edges = {
+            column: get_edges(np.array([d.min_val, d.max_val]), args.bins)
+            for column, d in descriptors.items() if isinstance(d, uv.DistributionDescriptors)
+        }
+        histograms = histogram_chunks(_read_chunks(args.data, args.chunksize, drop), edges)
+
+        X = mv.select_numeric_columns(sample)
+        scaler = mv.get_scaler_from_descriptors(descriptors, X.columns, args.scaling) if args.scaling else None
+        projection = dict(n_components=args.components, projection_method=args.projection, scaler=scaler, nan_policy=args.nan_policy,
+                          coreset_size=args.coreset_size)
+        if args.classes is not None:
+            cluster_info = mv.get_cluster_defined_number(X, args.classes, path=args.output, plot=not args.no_plot, sample_size=args.plot_sample_size, **projection)
+        else:
+            cluster_info = mv.get_best_clusters(X, path=args.output, plot=not args.no_plot, sample_size=args.plot_sample_size,
+                                                max_workers=args.cluster_workers, **projection)
+        if args.stability_bootstrap:
+            cluster_info.stability = mv.cluster_stability(X, cluster_info, n_bootstrap=args.stability_bootstrap, max_workers=args.stability_workers,
+                                                          nan_policy=args.nan_policy)
+        corr = mv.correlation_matrix(sample, path=args.output, plot=not args.no_plot)
+        thresholds = calibrate_thresholds(sample, descriptors, histograms, false_alarm_rate=args.false_alarm_rate,
+                                          batch_size=args.calibration_batch_size) if args.calibrate else None
+
+        # Fitted on the sample, whose size stands for the count of the baseline: the Mahalanobis test is only more conservative
+        multivariate = MultivariateBaseline(X) if args.multivariate_drift else None
+
+        report.save_baseline(args.output, base_metrics, descriptors, histograms, cluster_info, corr, binary=args.binary, thresholds=thresholds,
+                             multivariate=multivariate)
+
+    prof.write_timings(collector, args.output)
+    _emit({"baseline": args.output, "sample_rows": len(sample), "mode": "chunked"}, args)
+    return 0
+
+_worker_baseline = None
+
+def _initialize_compare_worker(shared_baseline):
+    """
+    Attach every worker process to the baseline in shared memory, unpacked once per worker.
+    """
+    global _worker_baseline
+    from . import report
+    _worker_baseline = report.get_baseline_from_arrays(shared_baseline.arrays())
+
+def _compare_batch(label: str, df, sigma: float, delta: float, baseline: dict = None) -> dict:
+    """
+    Compare one batch against the baseline and return its JSON-lines record.
+    """
+    from . import univariate as uv
+    from .report import get_drift_verdict
+
+    baseline = baseline or _worker_baseline
+    columns = uv.compare_to_baseline(baseline["descriptors"], baseline["histograms"], df, sigma=sigma, delta=delta, thresholds=baseline["thresholds"])
+    segments = baseline["segments"].compare(df, sigma=sigma, delta=delta) if baseline.get("segments") else None
+    multivariate = baseline["multivariate_drift"].compare(df).get_json() if baseline.get("multivariate_drift") else None
+    verdict = get_drift_verdict({
+        "distribution_comparison": [columns],
+        "segment_comparison": [segments] if segments else None,
+        "multivariate_drift": [multivariate] if multivariate else None
+    })["batches"][0]
+
+    record = {
+        "batch": label,
+        "rows": len(df),
+        "drifted": verdict["drifted"],
+        "drifted_columns": verdict["drifted_columns"],
+        "columns": columns
+    }
+    if segments:
+        record["drifted_segments"] = verdict["drifted_segments"]
+        record["segments"] = segments
+    if multivariate:
+        record["multivariate_drift"] = multivariate
+    return record
+
+def _compare_shared_batch(label: str, frame, sigma: float, delta: float) -> dict:
+    """
+    Compare one batch placed in shared memory, detaching from it once compared.
+    """
+    df = frame.to_pandas()
+    try:
+        return _compare_batch(label, df, sigma, delta)
+    finally:
+        del df
+        frame.close()
+
+def _ordered_results(executor, batches, sigma: float, delta: float, max_in_flight: int):
+    """
+    Yield the results of the batches in order, keeping at most `max_in_flight` of them in memory at once.
+    pandas batches are sent to the workers in shared memory, unlinked once compared or when the results are closed.
+    """
+    from collections import deque
+    from .backends import is_native
+    from .shared import SharedFrame
+
+    def result(future, frame):
+        try:
+            return future.result()
+        finally:
+            if frame is not None:
+                frame.unlink()
+
+    in_flight = deque()
+    try:
+        for label, df in batches:
+            if is_native(df):
+                in_flight.append((executor.submit(_compare_batch, label, df, sigma, delta), None))
+            else:
+                frame = SharedFrame(df)
+                in_flight.append((executor.submit(_compare_shared_batch, label, frame, sigma, delta), frame))
+            if len(in_flight) >= max_in_flight:
+                yield result(*in_flight.popleft())
+
+        while in_flight:
+            yield result(*in_flight.popleft())
+    finally:
+        for future, frame in in_flight:
+            future.cancel()
+            if frame is not None:
+                frame.unlink()
+
+def run_compare(args) -> int:
+    """
+    Compare batches against a baseline without plotting, streaming one record per batch (or per chunk).
+    """
+    import os
+    from . import report
+
+    drop = args.drop + ([args.target] if args.target else [])
+    batches = _iter_batches(args.data, args.chunksize, drop, args.backend)
+
+    baseline = report.load_baseline(args.baseline)
+    if args.workers > 1:
+        from .concurrency import process_pool
+        from .shared import SharedArrays
+
+        # The workers attach to a single copy of the baseline instead of loading their own
+        shared_baseline = SharedArrays(report.get_baseline_arrays(baseline))
+        executor = process_pool(args.workers, initializer=_initialize_compare_worker, initargs=(shared_baseline,))
+        results = _ordered_results(executor, batches, args.sigma, args.delta, 2 * args.workers)
+    else:
+        executor = None
+        results = (_compare_batch(label, df, args.sigma, args.delta, baseline) for label, df in batches)
+
+    try:
+        drifted = False
+        for i, record in enumerate(results):
+            drifted = drifted or record["drifted"]
+            if args.output:
+                os.makedirs(args.output, exist_ok=True)
+                with open(f"{args.output}/distribution_comparison_{i}.json", 'w') as f:
+                    json.dump(record, f, indent=4)
+            _emit(record, args)
+    finally:
+        if executor is not None:
+            results.close()
+            executor.shutdown()
+            shared_baseline.unlink()
+
+    return 2 if drifted and args.fail_on_drift else 0
+
+def run_report(args) -> int:
+    """
+    Create the full report of batches against a baseline.
+    """
+    _use_agg_backend()
+    from . import report
+    from .backends import column_names, select_columns
+
+    baseline = report.load_baseline(args.baseline)
+    drop = args.drop + [args.target]
+    original_df = _read_frame(args.original, drop, args.backend)
+    degraded_dfs = [select_columns(_read_frame(path, drop, args.backend), column_names(original_df)) for path in args.data]
+
+    result = report.create_report(original_df, baseline["clusters"], degraded_dfs, baseline["base_metrics"], args.output,
+                                  new_metrics=_load_json_option(args.metrics), plot_sample_size=args.plot_sample_size,
+                                  profile=args.profile, plot=not args.no_plot, segment_column=args.segment,
+                                  multivariate_baseline=baseline["multivariate_drift"], permutation_workers=args.permutation_workers,
+                                  output_format=args.output_format, multivariate_drift=args.multivariate_drift)
+
+    for path, batch in zip(args.data, report.get_drift_verdict(result)["batches"]):
+        _emit({"batch": path, **batch}, args)
+    return 0
+
+def run_rollup(args) -> int:
+    """
+    Add batches to a store of column states per time window, and write the descriptor evolution over the windows of a granularity.
+    """
+    import os
+    _use_agg_backend()
+    from . import rollups
+    from .univariate import write_descriptor_evolution
+
+    if os.path.exists(f"{args.store}/rollups.json"):
+        store = rollups.load_rollups(args.store)
+    else:
+        from . import report
+        edges = {column: histogram.edges for column, histogram in report.load_baseline(args.baseline)["histograms"].items()} if args.baseline else None
+        store = rollups.RollupStore(args.granularity, edges=edges, bins=args.bins)
+
+    drop = args.drop + ([args.target] if args.target else [])
+    for path, timestamp in zip(args.data, args.timestamps):
+        window = store.add(_read_frame(path, drop, args.backend), timestamp)
+        _emit({"batch": path, "window": window}, args)
+
+    if args.evolution and args.no_plot:
+        write_descriptor_evolution(store.get_descriptor_evolution(args.evolution), args.output)
+    elif args.evolution:
+        store.plot_descriptor_evolution(args.evolution, path=args.output)
+
+    rollups.save_rollups(store, args.store)
+    return 0
+
+def run_batch(args) -> int:
+    """
+    Run the jobs of a manifest across a pool of processes.
+    """
+    from .batch import run_manifest
+
+    index = run_manifest(args.manifest, args.output, max_workers=args.workers, memory_limit_mb=args.memory_limit_mb,
+                         plot_sample_size=args.plot_sample_size)
+    for result in index:
+        _emit({k: v for k, v in result.items() if k != "traceback"}, args)
+
+    return 1 if any(result["status"] == "failed" for result in index) else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser of the CLI.
+    """
+    parser = argparse.ArgumentParser(prog="data-degradation-detector", description="Detect data degradation between a baseline and new batches of data.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--drop", nargs="+", default=[], help="Columns to leave out of the analysis, such as ids.")
+    common.add_argument("--jsonl", action="store_true", help="Print the results as JSON lines on stdout.")
+    common.add_argument("--threads-per-worker", type=int,
+                        help="OpenMP and BLAS threads of every worker process, the cores divided among the workers by default.")
+
+    plotting = argparse.ArgumentParser(add_help=False)
+    plotting.add_argument("--no-plot", action="store_true", help="Only compute the statistics, without any figure.")
+    plotting.add_argument("--plot-sample-size", type=int, help="Rows drawn in the scatter plots.")
+    plotting.add_argument("--profile", action="store_true", help="Write timings.json with the time and memory of every stage.")
+
+    reading = argparse.ArgumentParser(add_help=False)
+    reading.add_argument("--backend", choices=["pandas", "polars", "arrow"], default="pandas",
+                         help="Library the whole files are read and described with, polars and arrow need their package installed.")
+
+    baseline = subparsers.add_parser("baseline", parents=[common, plotting, reading], help="Create the baseline statistics of the original data.")
+    baseline.add_argument("data", help="CSV or Parquet file with the original data.")
+    baseline.add_argument("--target", required=True, help="Name of the target column.")
+    baseline.add_argument("--output", required=True, help="Directory of the baseline.")
+    baseline.add_argument("--classes", type=int, help="Fixed number of clusters, searched between 2 and 10 otherwise.")
+    baseline.add_argument("--metrics", help="JSON file with the metrics of the model on the original data.")
+    baseline.add_argument("--components", type=int, help="Cluster on this many principal components of the numeric columns.")
+    baseline.add_argument("--projection", choices=["pca", "randomized"], default="pca", help="Exact PCA or randomized SVD for --components.")
+    baseline.add_argument("--scaling", choices=["standard", "robust"], help="Scale the numeric columns before the clustering.")
+    baseline.add_argument("--calibrate", action="store_true", help="Learn the drift thresholds of every column by bootstrapping the data.")
+    baseline.add_argument("--false-alarm-rate", type=float, default=0.01, help="False alarm rate per column of the calibrated thresholds.")
+    baseline.add_argument("--calibration-batch-size", type=int, help="Rows of the batches the thresholds are calibrated for, those of the sample by default.")
+    baseline.add_argument("--stability-bootstrap", type=int, help="Refit the clustering this many times on resampled rows to learn its stability.")
+    baseline.add_argument("--stability-workers", type=int, default=1, help="Processes running the stability refits.")
+    baseline.add_argument("--cluster-workers", type=int, default=1, help="Processes fitting the cluster counts searched without --classes.")
+    baseline.add_argument("--nan-policy", choices=["drop", "impute", "raise"], default="drop", help="Handling of the rows with missing or infinite values in the clustering.")
+    baseline.add_argument("--coreset-size", type=int, help="Fit the clustering on a weighted coreset of this many rows instead of every row.")
+    baseline.add_argument("--bins", type=int, default=20, help="Number of bins of the baseline histograms.")
+    baseline.add_argument("--segment", help="Also store the statistics of every segment of this column in segments.json, needs the whole data in memory.")
+    baseline.add_argument("--binary", action="store_true", help="Also store the baseline in a single baseline.npz.")
+    baseline.add_argument("--multivariate-drift", action="store_true",
+                          help="Also store the baseline of the multivariate drift score, which compare and report then use.")
+    baseline.add_argument("--chunksize", type=int, help="Stream the CSV file in chunks of this many rows.")
+    baseline.add_argument("--sample-size", type=int, default=100_000, help="Rows kept for quartiles and clustering in chunked mode.")
+    baseline.set_defaults(func=run_baseline)
+
+    compare = subparsers.add_parser("compare", parents=[common, reading], help="Compare batches against a baseline, without plots.")
+    compare.add_argument("baseline", help="Directory of the baseline.")
+    compare.add_argument("data", nargs="+", help="CSV or Parquet files with the batches.")
+    compare.add_argument("--target", help="Name of the target column, left out when present.")
+    compare.add_argument("--chunksize", type=int, help="Treat every chunk of this many rows of the CSV files as a batch.")
+    compare.add_argument("--workers", type=int, default=1, help="Number of processes comparing batches in parallel.")
+    compare.add_argument("--sigma", type=float, default=1.0, help="Standard deviations the mean may move.")
+    compare.add_argument("--delta", type=float, default=0.1, help="Relative change allowed for std and quartiles.")
+    compare.add_argument("--output", help="Directory to also write one JSON file per batch to.")
+    compare.add_argument("--fail-on-drift", action="store_true", help="Exit with status 2 when any batch drifted.")
+    compare.set_defaults(func=run_compare)
+
+    rollup = subparsers.add_parser("rollup", parents=[common, plotting, reading], help="Add batches to a store of descriptor states per time window.")
+    rollup.add_argument("store", help="Directory of the rollup store, created with the first batches.")
+    rollup.add_argument("data", nargs="*", help="CSV or Parquet files with the batches.")
+    rollup.add_argument("--timestamps", nargs="+", default=[], help="Timestamp of every batch, in the order of the files.")
+    rollup.add_argument("--granularity", choices=["hour", "day", "week", "month"], default="hour", help="Window of the batches of a new store.")
+    rollup.add_argument("--baseline", help="Baseline whose histogram edges a new store bins the batches over.")
+    rollup.add_argument("--bins", type=int, default=20, help="Number of bins of the columns without baseline edges.")
+    rollup.add_argument("--target", help="Name of the target column, left out when present.")
+    rollup.add_argument("--evolution", choices=["hour", "day", "week", "month"], help="Write the descriptor evolution over the windows of this granularity.")
+    rollup.add_argument("--output", help="Directory of the descriptor evolution, required with --evolution.")
+    rollup.set_defaults(func=run_rollup)
+
+    report = subparsers.add_parser("report", parents=[common, plotting, reading], help="Create the full report of batches against a baseline.")
+    report.add_argument("baseline", help="Directory of the baseline.")
+    report.add_argument("original", help="CSV or Parquet file with the original data.")
+    report.add_argument("data", nargs="+", help="CSV or Parquet files with the batches.")
+    report.add_argument("--target", required=True, help="Name of the target column.")
+    report.add_argument("--output", required=True, help="Directory of the report.")
+    report.add_argument("--metrics", help="JSON file with the list of metrics of the model on every batch.")
+    report.add_argument("--segment", help="Also compare every segment of this column.")
+    report.add_argument("--multivariate-drift", action="store_true",
+                        help="Score the multivariate drift of every batch, against the original data when the baseline has no multivariate baseline.")
+    report.add_argument("--permutation-workers", type=int, default=1, help="Processes running the permutations of the multivariate drift score.")
+    report.add_argument("--output-format", choices=["files", "jsonl", "html"], default="files",
+                        help="One file per artifact, or the results in report.jsonl with the figures in figures.zip or report.html.")
+    report.set_defaults(func=run_report)
+
+    batch = subparsers.add_parser("batch", parents=[common], help="Run the baseline and report of every job of a manifest.")
+    batch.add_argument("manifest", help="JSON manifest of jobs.")
+    batch.add_argument("--output", required=True, help="Directory of the reports and index.json.")
+    batch.add_argument("--workers", type=int, help="Number of jobs run at the same time, one per core by default.")
+    batch.add_argument("--memory-limit-mb", type=int, help="Memory budget of every job.")
+    batch.add_argument("--plot-sample-size", type=int, help="Rows drawn in the scatter plots.")
+    batch.set_defaults(func=run_batch)
+
+    return parser
+
+def main(argv: list[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "baseline" and args.segment and args.chunksize:
+        parser.error("--segment needs the whole data in memory, it cannot be used with --chunksize")
+    if args.command == "rollup" and len(args.data) != len(args.timestamps):
+        parser.error("every batch needs one of --timestamps")
+    if args.command == "rollup" and args.evolution and not args.output:
+        parser.error("--evolution needs --output")
+    if args.threads_per_worker is not None:
+        from .concurrency import set_threads_per_worker
+        set_threads_per_worker(args.threads_per_worker)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+import pandas as pd
+from . import backends
+from . import univariate as uv
+from . import multivariate as mv
+
+def _column_drifted(changes: dict) -> bool:
+    """
+    Returns whether the JSON changes of a column drifted: any descriptor changed or any histogram drift test fired,
+    as in report.get_drift_verdict.
+    """
+    return bool(changes.get("changed") or changes.get("drift_tests", {}).get("drifted"))
+
+class BatchComparison:
+    """
+    A class to represent the comparison of one batch against a baseline, computed only when accessed and memoized:
+    the changes of a column describe and bin that column alone, and the clustering, segments and multivariate drift
+    are only computed when asked for or when every cheaper check found no drift.
+    """
+
+    def __init__(self, baseline: dict, batch, sigma: float = 1.0, delta: float = 0.1):
+        """
+        Initializes the BatchComparison of a DataFrame, Polars DataFrame or Arrow table against a baseline
+        as returned by report.load_baseline. Nothing is computed yet.
+        """
+        self.baseline = baseline
+        self.batch = batch
+        self.sigma = sigma
+        self.delta = delta
+        self._columns = dict()
+        self._cache = dict()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the BatchComparison.
+        """
+        return f"BatchComparison(rows={len(self.batch)}, columns={len(self.columns)}, computed={len(self._columns)})"
+
+    @property
+    def columns(self) -> list[str]:
+        """
+        Columns of the baseline, in the order they are compared.
+        """
+        return list(self.baseline["descriptors"])
+
+    def _describe(self, column: str):
+        """
+        Returns the new descriptors and histogram of a column of the batch, binned over the stored edges.
+        """
+        original_histogram = self.baseline["histograms"].get(column)
+        if isinstance(self.baseline["descriptors"][column], uv.CategoricalDescriptors):
+            original_histogram = None
+
+        if backends.is_native(self.batch):
+            data = backends.select_columns(self.batch, [column])
+            descriptors = backends.describe(data)[column]
+            histogram = backends.histograms(data, edges={column: original_histogram.edges})[column] if original_histogram is not None else None
+        else:
+            descriptors = uv.get_distribution_descriptors(self.batch[column])
+            histogram = uv.get_histogram(self.batch[column], edges=original_histogram.edges) if original_histogram is not None else None
+
+        return descriptors, original_histogram, histogram
+
+    def column(self, column: str):
+        """
+        Returns the DistributionChanges or CategoricalChanges of a column, computed on its first access.
+        """
+        if column not in self._columns:
+            if column not in self.baseline["descriptors"]:
+                raise ValueError(f"Column '{column}' is not in the baseline.")
+            descriptors, original_histogram, histogram = self._describe(column)
+            self._columns[column] = uv.get_distribution_changes(
+                self.baseline["descriptors"][column], descriptors, sigma=self.sigma, delta=self.delta,
+                original_histogram=original_histogram, new_histogram=histogram,
+                thresholds=(self.baseline.get("thresholds") or {}).get(column))
+
+        return self._columns[column]
+
+    def descriptors(self, column: str):
+        """
+        Returns the descriptors of a column of the batch, those its changes were computed on.
+        """
+        return self.column(column).new_data
+
+    def drifting_columns(self):
+        """
+        Yields the drifting columns in order, comparing every column only when the previous ones have been yielded.
+        """
+        for column in self.columns:
+            if _column_drifted(self.column(column).get_json()):
+                yield column
+
+    def first_drifting_column(self) -> str:
+        """
+        Returns the first drifting column, without comparing the columns after it, or None when no column drifts.
+        """
+        return next(self.drifting_columns(), None)
+
+    def distribution_comparison(self) -> dict:
+        """
+        Returns the JSON changes of every column, as compare_to_baseline does.
+        """
+        return {column: self.column(column).get_json() for column in self.columns}
+
+    def _memoized(self, name: str, compute):
+        """
+        Returns the value of `name`, computing it on its first access.
+        """
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    def _numeric_batch(self) -> pd.DataFrame:
+        """
+        Returns the numeric columns of the baseline in the batch, as the clustering reads them.
+        """
+        columns = [column for column, descriptors in self.baseline["descriptors"].items() if isinstance(descriptors, uv.DistributionDescriptors)]
+        if backends.is_native(self.batch):
+            return backends.numeric_frame(self.batch, columns)
+        return self.batch[columns]
+
+    def clusters(self) -> mv.ClusterChanges:
+        """
+        Returns the ClusterChanges of a clustering of the batch with as many clusters as the baseline, fitted on its first access.
+        """
+        def compute():
+            original = self.baseline["clusters"]
+            new_clusters = mv.get_cluster_defined_number(self._numeric_batch(), original.num_clusters, plot=False,
+                                                         projection=original.projection, scaler=original.scaler,
+                                                         radius_definition=original.radius_definition)
+            return mv.compare_clusters(original, new_clusters)
+
+        return self._memoized("clusters", compute)
+
+    def segments(self) -> dict:
+        """
+        Returns the comparison of every segment of the batch, None without segments in the baseline.
+        """
+        segments = self.baseline.get("segments")
+        return self._memoized("segments", lambda: segments.compare(self.batch, sigma=self.sigma, delta=self.delta) if segments else None)
+
+    def multivariate_drift(self) -> dict:
+        """
+        Returns the JSON multivariate drift of the batch, None without a multivariate baseline.
+        """
+        multivariate = self.baseline.get("multivariate_drift")
+        return self._memoized("multivariate_drift", lambda: multivariate.compare(self.batch).get_json() if multivariate else None)
+
+    @property
+    def drifted(self) -> bool:
+        """
+        Whether the batch drifted, checking the columns, then the segments, the multivariate drift and the clustering,
+        and stopping at the first drift found.
+        """
+        return (self.first_drifting_column() is not None
+                or bool((self.segments() or {}).get("drifted_segments"))
+                or bool((self.multivariate_drift() or {}).get("drifted"))
+                or bool(self.clusters().changed))
+
+    def get_json(self) -> dict:
+        """
+        Returns every comparison of the batch and its verdict, in the format of report.get_drift_verdict.
+        """
+        columns = self.distribution_comparison()
+        cluster_comparison = self.clusters().get_json()
+        segments, multivariate = self.segments(), self.multivariate_drift()
+        drifted_columns = [column for column, changes in columns.items() if _column_drifted(changes)]
+        json_data = {
+            "drifted": self.drifted,
+            "drifted_columns": drifted_columns,
+            "cluster_changes": list(cluster_comparison.get("changed", {})),
+            "distribution_comparison": columns,
+            "cluster_comparison": cluster_comparison
+        }
+        if segments:
+            json_data["drifted_segments"] = segments.get("drifted_segments", {})
+            json_data["segment_comparison"] = segments
+        if multivariate:
+            json_data["multivariate_drift"] = multivariate
+
+        return json_data
+
+class LazyComparison:
+    """
+    A class to represent the comparison of a list of batches against a baseline, every batch compared only when accessed.
+    Indexing returns the memoized BatchComparison of a batch.
+    """
+
+    def __init__(self, baseline: dict, batches: list, sigma: float = 1.0, delta: float = 0.1):
+        """
+        Initializes the LazyComparison of the batches against a baseline as returned by report.load_baseline.
+        """
+        self.baseline = baseline
+        self.batches = list(batches)
+        self.sigma = sigma
+        self.delta = delta
+        self._comparisons = dict()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the LazyComparison.
+        """
+        return f"LazyComparison(batches={len(self.batches)}, accessed={len(self._comparisons)})"
+
+    def __len__(self):
+        return len(self.batches)
+
+    def __getitem__(self, index: int) -> BatchComparison:
+        index = range(len(self.batches))[index]
+        if index not in self._comparisons:
+            self._comparisons[index] = BatchComparison(self.baseline, self.batches[index], sigma=self.sigma, delta=self.delta)
+        return self._comparisons[index]
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.batches)))
+
+    def drifting_batches(self):
+        """
+        Yields the index of every drifting batch in order, comparing every batch only when the previous ones have been yielded.
+        """
+        for i, comparison in enumerate(self):
+            if comparison.drifted:
+                yield i
+
+    def first_drifting_batch(self) -> int:
+        """
+        Returns the index of the first drifting batch, without comparing the batches after it, or None when none drifts.
+        """
+        return next(self.drifting_batches(), None)
+
+    @property
+    def drifted(self) -> bool:
+        """
+        Whether any batch drifted, stopping at the first drifting one.
+        """
+        return self.first_drifting_batch() is not None
+
+    def evolution(self, column: str) -> pd.DataFrame:
+        """
+        Returns the evolution of the descriptors of a numeric column over the batches, one row per batch and one column
+        per statistic of univariate.EVOLUTION_STATS, from the memoized descriptors of that column alone.
+        """
+        if not isinstance(self.baseline["descriptors"].get(column), uv.DistributionDescriptors):
+            raise ValueError(f"Column '{column}' is not a numeric column of the baseline.")
+
+        rows = []
+        for comparison in self:
+            descriptors = comparison.descriptors(column).get_json()
+            # Non-missing values, as counted by the evolution tables
+            rows.append({**descriptors, "count": descriptors["count"] - descriptors["null_count"]})
+
+        return pd.DataFrame(rows, columns=uv.EVOLUTION_STATS).rename_axis("batch")
+
+    def get_verdict(self) -> dict:
+        """
+        Returns the verdict of every batch, in the format of report.get_drift_verdict, comparing all of them.
+        """
+        batches = []
+        for comparison in self:
+            json_data = comparison.get_json()
+            batch = {key: json_data[key] for key in ["drifted", "drifted_columns", "cluster_changes", "drifted_segments"] if key in json_data}
+            if "multivariate_drift" in json_data:
+                batch["multivariate_drift"] = json_data["multivariate_drift"].get("drifted", [])
+            batches.append(batch)
+
+        return {"drifted": any(batch["drifted"] for batch in batches), "batches": batches}
@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
+
+# Environment variables read by the OpenMP and BLAS libraries loaded after the limit is set
+THREAD_VARIABLES = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "BLIS_NUM_THREADS",
+                    "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+_threads_per_worker = None
+
+def get_cpu_count() -> int:
+    """
+    Returns the number of cores the current process may run on.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def set_threads_per_worker(threads: int = None):
+    """
+    Sets the number of OpenMP and BLAS threads of every worker process of the library, such as the KMeans and
+    silhouette threads of sklearn. With None, the default, the cores are divided among the workers of each pool.
+    """
+    global _threads_per_worker
+    if threads is not None and threads < 1:
+        raise ValueError("The number of threads per worker must be at least 1.")
+    _threads_per_worker = threads
+
+def get_threads_per_worker(max_workers: int = None) -> int:
+    """
+    Returns the number of native threads of every worker of a pool of `max_workers` processes (one per core by default).
+    """
+    if _threads_per_worker is not None:
+        return _threads_per_worker
+    return max(1, get_cpu_count() // (max_workers or get_cpu_count()))
+
+def limit_threads(threads: int):
+    """
+    Limits the OpenMP and BLAS thread pools of the current process to `threads` threads,
+    for the libraries already loaded and for those loaded later.
+    """
+    for variable in THREAD_VARIABLES:
+        os.environ[variable] = str(threads)
+    threadpool_limits(limits=threads)
+
+def _initialize_worker(threads: int, initializer, initargs: tuple):
+    """
+    Limit the native threads of the worker process before running the initializer of its pool.
+    """
+    limit_threads(threads)
+    if initializer is not None:
+        initializer(*initargs)
+
+def process_pool(max_workers: int = None, initializer=None, initargs: tuple = ()) -> ProcessPoolExecutor:
+    """
+    Returns a ProcessPoolExecutor of `max_workers` processes (one per core by default) whose OpenMP and BLAS
+    threads are limited to get_threads_per_worker, so the processes and their threads together do not run
+    more threads than there are cores.
+    """
+    max_workers = max_workers or get_cpu_count()
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_worker,
+                               initargs=(get_threads_per_worker(max_workers), initializer, initargs))
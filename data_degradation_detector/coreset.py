@@ -0,0 +1,117 @@
+import numpy as np
+from .sampling import DEFAULT_SEED
+
+# Probability with which the guarantee of a coreset may fail
+FAILURE_PROBABILITY = 0.05
+
+class Coreset:
+    """
+    A class to represent a lightweight coreset of the rows of a numeric array (Bachem, Lucic and Krause, 2018):
+    `size` rows drawn with replacement, with probability half uniform and half proportional to their squared distance
+    to the mean, weighted by the inverse of that probability. The weighted KMeans cost of any centroids on the coreset
+    is an unbiased estimate of their cost on all the rows, so the cluster counts can be fitted on the coreset alone.
+
+    The rows are read once, in chunks of `chunk_size`: every chunk is weighted against the mean of the rows read so
+    far and every one of the `size` draws takes one of its rows with the probability of the weight of the chunk.
+    """
+
+    def __init__(self, values: np.ndarray = None, size: int = 10_000, seed: int = DEFAULT_SEED, chunk_size: int = 65536, json_data: dict = None):
+        """
+        Initializes the Coreset of the rows of a float array, such as a memory-mapped .npy file, or from a JSON representation.
+        With `size` rows or more the coreset is the array itself, with unit weights.
+        """
+        if json_data is not None:
+            self.rows = json_data['rows']
+            self.points = np.asarray(json_data['points'], dtype=float)
+            self.weights = np.asarray(json_data['weights'], dtype=float)
+        elif values is not None:
+            if size <= 0:
+                raise ValueError("The coreset size must be a positive integer.")
+            self.rows = len(values)
+            if size >= self.rows:
+                self.points = np.asarray(values, dtype=float)
+                self.weights = np.ones(self.rows)
+            else:
+                self.points, self.weights = _sample_coreset(values, size, seed, chunk_size)
+        else:
+            raise ValueError("Either an array or JSON data must be provided to initialize Coreset.")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the Coreset.
+        """
+        return f"Coreset(size={len(self.points)}, rows={self.rows})"
+
+    @property
+    def size(self) -> int:
+        """
+        Number of rows of the coreset.
+        """
+        return len(self.points)
+
+    def epsilon(self, num_clusters: int, failure_probability: float = FAILURE_PROBABILITY) -> float:
+        """
+        Returns the error of the coreset for `num_clusters` clusters: with probability 1 - `failure_probability` the cost
+        of any centroids on the coreset is within epsilon / 2 of their cost plus epsilon / 2 of the cost of the mean,
+        with epsilon = sqrt((d k log k + log(1 / failure_probability)) / size), the bound of the lightweight
+        coreset up to its constant factor. It is 0 when the coreset holds every row.
+        """
+        if self.size >= self.rows:
+            return 0.0
+        dimensions = self.points.shape[1]
+        return float(np.sqrt((dimensions * num_clusters * np.log(num_clusters) + np.log(1 / failure_probability)) / self.size))
+
+    def get_guarantee(self, num_clusters: int, failure_probability: float = FAILURE_PROBABILITY) -> dict:
+        """
+        Returns the size, the number of rows summarized and the error of the coreset for `num_clusters` clusters,
+        to store with the clustering fitted on it.
+        """
+        return {
+            "size": self.size,
+            "rows": self.rows,
+            "epsilon": self.epsilon(num_clusters, failure_probability),
+            "failure_probability": failure_probability
+        }
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the Coreset.
+        """
+        return {
+            "rows": self.rows,
+            "points": self.points.tolist(),
+            "weights": self.weights.tolist()
+        }
+
+def _sample_coreset(values: np.ndarray, size: int, seed: int, chunk_size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draws `size` rows with replacement in a single pass over the chunks of the values and returns them with their weights.
+    A row is drawn with probability w / W, W the total weight, and weighted W / (size w).
+    """
+    rng = np.random.default_rng(seed)
+    points = np.empty((size, values.shape[1]))
+    drawn_weights = np.ones(size)
+    total_weight = 0.0
+    count = 0
+    sums = np.zeros(values.shape[1])
+    squared_distances = 0.0
+    for start in range(0, len(values), chunk_size):
+        chunk = np.asarray(values[start:start + chunk_size], dtype=float)
+        count += len(chunk)
+        sums += chunk.sum(axis=0)
+        distances = ((chunk - sums / count) ** 2).sum(axis=1)
+        squared_distances += distances.sum()
+        # Half uniform and half proportional to the squared distance to the mean, scaled by the number of rows
+        weights = squared_distances / count + distances
+        if squared_distances == 0:
+            weights = np.ones(len(chunk))
+
+        chunk_weight = weights.sum()
+        total_weight += chunk_weight
+        replaced = np.flatnonzero(rng.random(size) < chunk_weight / total_weight)
+        if len(replaced):
+            rows = rng.choice(len(chunk), size=len(replaced), p=weights / chunk_weight)
+            points[replaced] = chunk[rows]
+            drawn_weights[replaced] = weights[rows]
+
+    return points, total_weight / (size * drawn_weights)
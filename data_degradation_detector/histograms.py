@@ -0,0 +1,209 @@
+import numpy as np
+
+class Histogram:
+    """
+    A class to represent a fixed-edge histogram of a numeric variable.
+    Besides the bins between the edges it keeps an underflow and an overflow bin,
+    so values of later batches outside the original range are still counted.
+    """
+
+    def __init__(self, values: np.ndarray=None, edges: np.ndarray=None, bins: int = 20, json_data: dict=None):
+        """
+        Initializes the Histogram from an array of values or a JSON representation.
+        When no edges are given, `bins` equal-width bins between the minimum and maximum of the values are used.
+        """
+        if values is not None:
+            values = np.asarray(values)
+            if edges is None:
+                edges = get_edges(values, bins)
+            self.edges = np.asarray(edges, dtype=float)
+            self.counts = bin_counts(values, self.edges)
+        elif json_data is not None:
+            self.edges = np.asarray(json_data['edges'], dtype=float)
+            self.counts = np.asarray(json_data['counts'], dtype=np.int64)
+        else:
+            raise ValueError("Either an array of values or JSON data must be provided to initialize Histogram.")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the Histogram.
+        """
+        return (f"Histogram(bins={len(self.edges) - 1}, range=[{self.edges[0]}, {self.edges[-1]}], "
+                f"count={int(self.counts.sum())}, underflow={int(self.counts[0])}, overflow={int(self.counts[-1])})")
+
+    def __eq__(self, value):
+        if not isinstance(value, Histogram):
+            return NotImplemented
+
+        return np.array_equal(self.edges, value.edges) and np.array_equal(self.counts, value.counts)
+
+    def bin(self, values: np.ndarray) -> "Histogram":
+        """
+        Returns the histogram of other values over the same edges.
+        """
+        return Histogram(values, edges=self.edges)
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """
+        Returns the histogram of the values of both histograms, which must share their edges.
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Both histograms must share the same edges.")
+
+        return Histogram(json_data={"edges": self.edges, "counts": self.counts + other.counts})
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the Histogram.
+        """
+        return {
+            "edges": self.edges.tolist(),
+            "counts": self.counts.tolist()
+        }
+
+class HistogramDrift:
+    """
+    A class to represent the drift between two histograms over the same edges,
+    measured with the PSI, an approximate Kolmogorov-Smirnov statistic and the 1-D Wasserstein distance.
+    Every statistic costs O(bins) once the values are binned.
+    """
+
+    def __init__(self, original: Histogram, new_data: Histogram, psi_threshold: float = 0.2, ks_threshold: float = 0.1, wasserstein_threshold: float = None):
+        """
+        Initializes the HistogramDrift with two histograms sharing their edges.
+        The Wasserstein distance is only flagged when a threshold, in the units of the variable, is given.
+        """
+        if not np.array_equal(original.edges, new_data.edges):
+            raise ValueError("Both histograms must share the same edges.")
+
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.wasserstein_threshold = wasserstein_threshold
+
+        self.psi = population_stability_index(original.counts, new_data.counts)
+        self.ks, self.ks_p_value = ks_statistic(original.counts, new_data.counts)
+        self.wasserstein = wasserstein_distance(original.edges, original.counts, new_data.counts)
+
+        self.drifted = []
+        if self.psi > psi_threshold:
+            self.drifted.append("psi")
+        if self.ks > ks_threshold:
+            self.drifted.append("ks")
+        if wasserstein_threshold is not None and self.wasserstein > wasserstein_threshold:
+            self.drifted.append("wasserstein")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the HistogramDrift.
+        """
+        return (f"HistogramDrift(psi={self.psi:.4f}, ks={self.ks:.4f}, ks_p_value={self.ks_p_value:.4f}, "
+                f"wasserstein={self.wasserstein:.4f}, drifted={self.drifted})")
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the HistogramDrift.
+        """
+        return {
+            "psi": self.psi,
+            "ks": self.ks,
+            "ks_p_value": self.ks_p_value,
+            "wasserstein": self.wasserstein,
+            "drifted": self.drifted,
+            "psi_threshold": self.psi_threshold,
+            "ks_threshold": self.ks_threshold,
+            "wasserstein_threshold": self.wasserstein_threshold,
+        }
+
+def get_edges(values: np.ndarray, bins: int = 20) -> np.ndarray:
+    """
+    Returns `bins` + 1 equal-width edges between the minimum and maximum of the values.
+    """
+    if len(values) == 0:
+        return np.linspace(0.0, 1.0, bins + 1)
+
+    low, high = float(np.min(values)), float(np.max(values))
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+
+    return np.linspace(low, high, bins + 1)
+
+def bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """
+    Returns the counts of the values in one vectorized pass: an underflow bin, one bin
+    per pair of edges (the last one closed on the right) and an overflow bin.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        values = values[~np.isnan(values)]
+
+    positions = np.searchsorted(edges, values, side='right')
+    # The maximum of the original values belongs to the last bin, not to the overflow
+    positions[values == edges[-1]] = len(edges) - 1
+
+    return np.bincount(positions, minlength=len(edges) + 1).astype(np.int64)
+
+def _result(values: np.ndarray):
+    """
+    Returns a float for a single statistic and the array otherwise.
+    """
+    return float(values) if np.ndim(values) == 0 else values
+
+def _totals(expected: np.ndarray, observed: np.ndarray) -> tuple[float, np.ndarray, np.ndarray]:
+    """
+    Returns the total of the expected counts, the totals of the observed counts (1 where empty, to divide safely)
+    and the mask of the statistics that are defined, those with counts on both sides.
+    """
+    n = expected.sum()
+    m = observed.sum(axis=-1, keepdims=True)
+    defined = (m[..., 0] > 0) & (n > 0)
+    return n if n > 0 else 1.0, np.where(m > 0, m, 1.0), defined
+
+def population_stability_index(expected, observed, epsilon: float = 1e-4) -> float:
+    """
+    Returns the population stability index between two arrays of counts over the same bins.
+    Empty bins are smoothed with `epsilon` so the logarithm stays finite.
+    `observed` can also hold one array of counts per row, which returns one PSI per row.
+    """
+    expected = np.asarray(expected, dtype=float)
+    observed = np.asarray(observed, dtype=float)
+    n, m, defined = _totals(expected, observed)
+
+    p = np.maximum(expected / n, epsilon)
+    q = np.maximum(observed / m, epsilon)
+    return _result(np.where(defined, np.sum((q - p) * np.log(q / p), axis=-1), 0.0))
+
+def ks_statistic(expected, observed) -> tuple[float, float]:
+    """
+    Returns the Kolmogorov-Smirnov statistic between two arrays of counts, evaluated on the bin edges,
+    and its asymptotic p-value. Binning can only hide differences, so it is a lower bound of the exact statistic.
+    `observed` can also hold one array of counts per row, which returns one statistic and p-value per row.
+    """
+    from scipy.stats import kstwobign
+
+    expected = np.asarray(expected, dtype=float)
+    observed = np.asarray(observed, dtype=float)
+    n, m, defined = _totals(expected, observed)
+
+    statistic = np.where(defined, np.max(np.abs(np.cumsum(expected) / n - np.cumsum(observed, axis=-1) / m), axis=-1), 0.0)
+    effective_n = n * m[..., 0] / (n + m[..., 0])
+    p_value = np.where(defined, kstwobign.sf(np.sqrt(effective_n) * statistic), 1.0)
+
+    return _result(statistic), _result(p_value)
+
+def wasserstein_distance(edges, expected, observed) -> float:
+    """
+    Returns the 1-D Wasserstein distance between two arrays of counts over the same edges,
+    assuming the values are uniform inside every bin. The underflow and overflow masses are
+    placed on the first and last edge, which makes the distance a lower bound when they are not empty.
+    `observed` can also hold one array of counts per row, which returns one distance per row.
+    """
+    edges = np.asarray(edges, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    observed = np.asarray(observed, dtype=float)
+    n, m, defined = _totals(expected, observed)
+
+    # CDF difference on every edge: the underflow is already below the first edge
+    difference = np.abs(np.cumsum(expected[:-1]) / n - np.cumsum(observed[..., :-1], axis=-1) / m)
+    widths = np.diff(edges)
+
+    return _result(np.where(defined, np.sum(widths * (difference[..., :-1] + difference[..., 1:]) / 2, axis=-1), 0.0))
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from .streaming import ColumnMoments
+
+class RegressionMetrics:
+    """
+    A class to accumulate the sufficient statistics of the regression metrics of a model over chunks of predictions:
+    the sums of the absolute and squared errors and the moments of the target. Two accumulators can be merged,
+    so the chunks can be processed in any order or in different processes.
+    """
+
+    def __init__(self, json_data: dict=None):
+        """
+        Initializes an empty RegressionMetrics or restores it from a JSON representation.
+        """
+        if json_data is not None:
+            self.absolute_error = json_data['absolute_error']
+            self.squared_error = json_data['squared_error']
+            self.target = ColumnMoments(json_data=json_data['target'])
+        else:
+            self.absolute_error = 0.0
+            self.squared_error = 0.0
+            self.target = ColumnMoments()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the RegressionMetrics.
+        """
+        return f"RegressionMetrics(count={self.count}, {', '.join(f'{name}={value}' for name, value in self.get_metrics().items())})"
+
+    @property
+    def count(self) -> int:
+        """
+        Number of accumulated predictions.
+        """
+        return self.target.count
+
+    def update(self, y_true, y_pred):
+        """
+        Adds a chunk of targets and their predictions.
+        """
+        y_true, y_pred = np.asarray(y_true, dtype=float), np.asarray(y_pred, dtype=float)
+        if len(y_true) != len(y_pred):
+            raise ValueError("The targets and the predictions must have the same length.")
+        errors = y_true - y_pred
+
+        self.absolute_error += float(np.abs(errors).sum())
+        self.squared_error += float(errors @ errors)
+        self.target.update(y_true)
+
+        return self
+
+    def merge(self, other: "RegressionMetrics"):
+        """
+        Adds the predictions accumulated by another RegressionMetrics.
+        """
+        self.absolute_error += other.absolute_error
+        self.squared_error += other.squared_error
+        self.target.merge(other.target)
+
+        return self
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Returns the rmse, mse, mae and r2 of the accumulated predictions, NaN without any.
+        As in sklearn, the r2 of a constant target is 1 for perfect predictions and 0 otherwise.
+        """
+        if self.count == 0:
+            return {"rmse": float('nan'), "mse": float('nan'), "mae": float('nan'), "r2": float('nan')}
+
+        mse = self.squared_error / self.count
+        if self.target.m2 > 0:
+            r2 = 1 - self.squared_error / self.target.m2
+        else:
+            r2 = 1.0 if self.squared_error == 0 else 0.0
+
+        return {"rmse": float(np.sqrt(mse)), "mse": mse, "mae": self.absolute_error / self.count, "r2": r2}
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the RegressionMetrics.
+        """
+        return {
+            "absolute_error": self.absolute_error,
+            "squared_error": self.squared_error,
+            "target": self.target.get_json()
+        }
+
+class ClassificationMetrics:
+    """
+    A class to accumulate the confusion matrix of a classifier over chunks of predictions, the sufficient statistic of its
+    accuracy and of its macro-averaged precision, recall and F1 score. The labels are added as they appear, and two
+    accumulators can be merged whatever the labels each one has seen.
+    """
+
+    def __init__(self, labels: list = None, json_data: dict=None):
+        """
+        Initializes an empty ClassificationMetrics, over the given `labels` first, or restores it from a JSON representation.
+        """
+        if json_data is not None:
+            self.labels = list(json_data['labels'])
+            self.confusion = np.asarray(json_data['confusion'], dtype=np.int64).reshape(len(self.labels), len(self.labels))
+        else:
+            self.labels = []
+            self.confusion = np.zeros((0, 0), dtype=np.int64)
+            if labels is not None:
+                self._add_labels(labels)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the ClassificationMetrics.
+        """
+        return f"ClassificationMetrics(count={self.count}, labels={len(self.labels)}, {', '.join(f'{name}={value}' for name, value in self.get_metrics().items())})"
+
+    @property
+    def count(self) -> int:
+        """
+        Number of accumulated predictions.
+        """
+        return int(self.confusion.sum())
+
+    def _add_labels(self, labels) -> np.ndarray:
+        """
+        Adds the labels not seen yet, growing the confusion matrix, and returns the index of every given label.
+        """
+        positions = {label: i for i, label in enumerate(self.labels)}
+        new_labels = [label for label in labels if label not in positions]
+        if new_labels:
+            for label in new_labels:
+                positions[label] = len(self.labels)
+                self.labels.append(label)
+            confusion = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+            confusion[:len(self.confusion), :len(self.confusion)] = self.confusion
+            self.confusion = confusion
+
+        return np.array([positions[label] for label in labels], dtype=np.int64)
+
+    def update(self, y_true, y_pred):
+        """
+        Adds a chunk of labels and their predictions.
+        """
+        y_true, y_pred = pd.Series(y_true).to_numpy(), pd.Series(y_pred).to_numpy()
+        if len(y_true) != len(y_pred):
+            raise ValueError("The labels and the predictions must have the same length.")
+
+        # The labels of the chunk are mapped once, then every pair is counted in one bincount
+        labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+        indices = self._add_labels(labels.tolist())[codes.reshape(-1)]
+        size = len(self.labels)
+        self.confusion += np.bincount(indices[:len(y_true)] * size + indices[len(y_true):], minlength=size * size).reshape(size, size)
+
+        return self
+
+    def merge(self, other: "ClassificationMetrics"):
+        """
+        Adds the predictions accumulated by another ClassificationMetrics.
+        """
+        indices = self._add_labels(other.labels)
+        self.confusion[np.ix_(indices, indices)] += other.confusion
+
+        return self
+
+    def get_metrics(self) -> dict[str, float]:
+        """
+        Returns the accuracy and the macro-averaged precision, recall and F1 score of the accumulated predictions,
+        over every label seen, NaN without any. As in sklearn, the precision of a label never predicted is 0.
+        """
+        if self.count == 0:
+            return {"accuracy": float('nan'), "precision": float('nan'), "recall": float('nan'), "f1": float('nan')}
+
+        true_positives = np.diag(self.confusion).astype(float)
+        predicted = self.confusion.sum(axis=0)
+        actual = self.confusion.sum(axis=1)
+        precision = np.divide(true_positives, predicted, out=np.zeros_like(true_positives), where=predicted > 0)
+        recall = np.divide(true_positives, actual, out=np.zeros_like(true_positives), where=actual > 0)
+        f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(true_positives), where=precision + recall > 0)
+
+        return {
+            "accuracy": float(true_positives.sum() / self.count),
+            "precision": float(precision.mean()),
+            "recall": float(recall.mean()),
+            "f1": float(f1.mean())
+        }
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the ClassificationMetrics.
+        """
+        return {
+            "labels": self.labels,
+            "confusion": self.confusion.tolist()
+        }
+
+def get_metrics(metrics) -> dict:
+    """
+    Returns the metrics of a RegressionMetrics or ClassificationMetrics accumulator, or the given dict of metrics.
+    """
+    if isinstance(metrics, (RegressionMetrics, ClassificationMetrics)):
+        return metrics.get_metrics()
+    return metrics
+
+def merge_metrics(accumulators: list):
+    """
+    Returns a new accumulator merging a list of accumulators of the same kind, such as those of the workers
+    of one batch, without modifying them.
+    """
+    if not accumulators:
+        raise ValueError("At least one accumulator must be given.")
+
+    merged = type(accumulators[0])()
+    for accumulator in accumulators:
+        merged.merge(accumulator)
+
+    return merged
@@ -1,25 +1,297 @@
 from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
 from sklearn.metrics import silhouette_score
+from sklearn import config_context
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import os
 import seaborn as sns
+from . import backends
+from .artifacts import save_figure
+from .concurrency import process_pool
+from .coreset import Coreset
+from .sampling import DEFAULT_SEED, sample_indices, stratified_sample_indices
+from .profiling import profiled, span
+
+# Rows of the silhouette sample when KMeans is fitted on a sample, the score costs O(rows^2)
+SILHOUETTE_SAMPLE_SIZE = 10_000
+# Memory in MB of every block of pairwise distances computed by the silhouette score
+SILHOUETTE_WORKING_MEMORY = 64
+# Handling of the rows with missing or infinite values before the clustering
+NAN_POLICIES = ["drop", "impute", "raise"]
+# Definitions of the cluster radius: the largest distance of a row to its own centroid, or, in the baselines written
+# before it was fixed, the largest norm of the differences of a row to every centroid
+RADIUS_DEFINITIONS = ["centroid", "legacy"]
+
+def load_array(path: str) -> np.ndarray:
+    """
+    Memory-maps a .npy file read-only, so the clustering reads its rows from disk instead of holding them in memory.
+    """
+    return np.load(path, mmap_mode='r')
+
+def _as_array(X) -> np.ndarray:
+    """
+    Returns X as a float64 array, without a copy when it already is one, such as a memory-mapped .npy file
+    or a DataFrame with a single float64 block.
+    """
+    if isinstance(X, pd.DataFrame):
+        return X.to_numpy(dtype=float, copy=False)
+    return np.asarray(X, dtype=float)
+
+def _column_names(X) -> list[str]:
+    """
+    Returns the names of the columns of a DataFrame, or generated names for the columns of an array.
+    """
+    if isinstance(X, pd.DataFrame):
+        return [str(column) for column in X.columns]
+    return [f"column_{i}" for i in range(np.shape(X)[1])]
+
+class Scaler:
+    """
+    A class to represent the scaling of the numeric columns fitted on the original data, so no column dominates
+    the distances of the clustering. "standard" centers on the mean and divides by the standard deviation,
+    "robust" centers on the median and divides by the interquartile range.
+    """
+
+    def __init__(self, X=None, method: str = "standard", json_data: dict = None):
+        """
+        Fits the Scaler on X or restores it from a JSON representation.
+        """
+        if X is not None:
+            if method not in ("standard", "robust"):
+                raise ValueError(f"Unknown scaling method: {method}")
+
+            values = _as_array(X)
+            self.columns = _column_names(X)
+            self.method = method
+            if method == "standard":
+                self.center = np.nanmean(values, axis=0)
+                self.scale = np.nanstd(values, axis=0, ddof=1)
+            else:
+                q1, self.center, q3 = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0)
+                self.scale = q3 - q1
+        elif json_data is not None:
+            self.columns = json_data['columns']
+            self.method = json_data['method']
+            self.center = np.array(json_data['center'], dtype=float)
+            self.scale = np.array(json_data['scale'], dtype=float)
+        else:
+            raise ValueError("Either a DataFrame or JSON data must be provided to initialize Scaler.")
+
+        # Constant columns are only centered
+        self.scale = np.where(np.isfinite(self.scale) & (self.scale > 0), self.scale, 1.0)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the Scaler.
+        """
+        return f"Scaler(method={self.method}, columns={len(self.columns)})"
+
+    def transform(self, X) -> pd.DataFrame:
+        """
+        Scales the columns of X in a single vectorized operation.
+        """
+        with span("multivariate.scaler_transform"):
+            values = (_as_array(X) - self.center) / self.scale
+        return pd.DataFrame(values, columns=self.columns, index=getattr(X, 'index', None))
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the Scaler.
+        """
+        return {
+            "method": self.method,
+            "columns": self.columns,
+            "center": self.center.tolist(),
+            "scale": self.scale.tolist()
+        }
+
+def get_scaler_from_descriptors(descriptors: dict, columns: list, method: str = "standard") -> Scaler:
+    """
+    Builds the Scaler of the given columns from their distribution descriptors, without another pass over the data.
+    The standard scaler uses the mean and standard deviation, the robust one the median and interquartile range.
+    """
+    if method not in ("standard", "robust"):
+        raise ValueError(f"Unknown scaling method: {method}")
+
+    columns_descriptors = [descriptors[column] for column in columns]
+    if method == "standard":
+        center = [d.mean for d in columns_descriptors]
+        scale = [d.std for d in columns_descriptors]
+    else:
+        center = [d.q2 for d in columns_descriptors]
+        scale = [d.q3 - d.q1 for d in columns_descriptors]
+
+    return Scaler(json_data={"method": method, "columns": [str(column) for column in columns], "center": center, "scale": scale})
+
+class Projection:
+    """
+    A class to represent a linear projection of the numeric columns fitted on the original data,
+    so the clustering of every later batch runs in the same reduced space.
+    """
+
+    def __init__(self, X=None, n_components: int = None, method: str = "pca", seed: int = DEFAULT_SEED, json_data: dict = None):
+        """
+        Fits the Projection on X or restores it from a JSON representation.
+        `method` is "pca" for an exact PCA or "randomized" for a randomized SVD, faster on wide data.
+        """
+        if X is not None:
+            if method not in ("pca", "randomized"):
+                raise ValueError(f"Unknown projection method: {method}")
+
+            self.columns = _column_names(X)
+            pca = PCA(n_components=n_components, svd_solver="full" if method == "pca" else "randomized", random_state=seed)
+            with span("multivariate.projection_fit"):
+                pca.fit(_as_array(X))
+            self.method = method
+            self.mean = pca.mean_
+            self.components = pca.components_
+            self.explained_variance_ratio = pca.explained_variance_ratio_.tolist()
+        elif json_data is not None:
+            self.columns = json_data['columns']
+            self.method = json_data['method']
+            self.mean = np.array(json_data['mean'], dtype=float)
+            self.components = np.array(json_data['components'], dtype=float)
+            self.explained_variance_ratio = json_data['explained_variance_ratio']
+        else:
+            raise ValueError("Either a DataFrame or JSON data must be provided to initialize Projection.")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the Projection.
+        """
+        return (f"Projection(method={self.method}, columns={len(self.columns)}, components={len(self.components)}, "
+                f"explained_variance={sum(self.explained_variance_ratio):.4f})")
+
+    def transform(self, X) -> pd.DataFrame:
+        """
+        Projects the rows of X onto the components.
+        """
+        with span("multivariate.projection_transform"):
+            values = (_as_array(X) - self.mean) @ self.components.T
+        return pd.DataFrame(values, columns=[f"component_{i}" for i in range(len(self.components))], index=getattr(X, 'index', None))
+
+    def explained_variance(self, X) -> float:
+        """
+        Returns the share of the total variance of X kept by the components, to check that they still fit a new batch.
+        """
+        values = _as_array(X)
+        values = values - values.mean(axis=0)
+        total = float(np.sum(values ** 2))
+        if total == 0:
+            return 1.0
+
+        kept = float(np.sum((values @ self.components.T) ** 2))
+        return kept / total
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the Projection.
+        """
+        return {
+            "method": self.method,
+            "columns": self.columns,
+            "mean": self.mean.tolist(),
+            "components": self.components.tolist(),
+            "explained_variance_ratio": self.explained_variance_ratio,
+            "explained_variance": sum(self.explained_variance_ratio)
+        }
+
+def _missing_rows(values: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """
+    Returns the mask of the rows with a missing or infinite value, checked in chunks of rows
+    so no boolean array of the size of the data is allocated, or None when every value is finite.
+    """
+    missing = np.concatenate([~np.isfinite(values[start:start + chunk_size]).all(axis=1) for start in range(0, len(values), chunk_size)] or [np.zeros(0, dtype=bool)])
+    return missing if missing.any() else None
+
+def _handle_missing(X, nan_policy: str = "drop", chunk_size: int = 65536):
+    """
+    Returns X without missing or infinite values, unchanged when it has none. "drop" keeps the other rows,
+    "impute" replaces the values by the mean of the finite values of their column, and "raise" raises a ValueError.
+    Only the rows kept by "drop", or the imputed copy of X, are copied.
+    """
+    if nan_policy not in NAN_POLICIES:
+        raise ValueError(f"The NaN policy must be one of {NAN_POLICIES}.")
+
+    values = _as_array(X)
+    missing = _missing_rows(values, chunk_size)
+    if missing is None:
+        return X
+    if nan_policy == "raise":
+        raise ValueError(f"{int(missing.sum())} rows have missing or infinite values.")
+
+    if nan_policy == "drop":
+        values = values[~missing]
+    else:
+        sums = np.zeros(values.shape[1])
+        counts = np.zeros(values.shape[1])
+        for start in range(0, len(values), chunk_size):
+            chunk = values[start:start + chunk_size]
+            finite = np.isfinite(chunk)
+            sums += np.where(finite, chunk, 0).sum(axis=0)
+            counts += finite.sum(axis=0)
+        # Columns without any finite value are filled with zeros
+        means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+
+        values = values.copy()
+        rows = np.flatnonzero(missing)
+        imputed = values[rows]
+        imputed[~np.isfinite(imputed)] = np.broadcast_to(means, imputed.shape)[~np.isfinite(imputed)]
+        values[rows] = imputed
+
+    if isinstance(X, pd.DataFrame):
+        # The rows keep their labels, so they can still be traced back to the rows of X
+        return pd.DataFrame(values, columns=X.columns, index=X.index[~missing] if nan_policy == "drop" else X.index)
+    return values
+
+def _project(X, n_components: int = None, projection: Projection = None, method: str = "pca", seed: int = DEFAULT_SEED):
+    """
+    Returns X in the reduced space and the projection used: the given one, a new one fitted
+    on X when `n_components` is given, or X itself and None otherwise.
+    """
+    if projection is None and n_components is not None:
+        projection = Projection(X, n_components, method=method, seed=seed)
+
+    if projection is None:
+        return X, None
+    return projection.transform(X), projection
+
+def _scale(X, scaling: str = None, scaler: Scaler = None):
+    """
+    Returns X scaled and the scaler used: the given one, a new one fitted on X when `scaling`
+    is given, or X itself and None otherwise.
+    """
+    if scaler is None and scaling is not None:
+        scaler = Scaler(X, method=scaling)
+
+    if scaler is None:
+        return X, None
+    return scaler.transform(X), scaler
 
 class Cluster_statistics:
     """
     Class to that holds statistics on the clusters.
     """
 
-    def __init__(self, num_clusters: int, silhouette_score: float, centroids: list, radius: list[float], labels_percentages: list[float]):
+    def __init__(self, num_clusters: int, silhouette_score: float, centroids: list, radius: list[float], labels_percentages: list[float], projection: Projection = None, scaler: Scaler = None, stability: dict = None, coreset: dict = None, radius_definition: str = "centroid"):
         """
         Initialize the Cluster_statistics object with the number of clusters, inertia, and silhouette score.
+        When a scaler or a projection is given the centroids and radius are in the scaled or reduced space.
+        The confidence intervals of cluster_stability can be attached with `stability`.
+        When the clustering was fitted on a coreset, `coreset` holds its size, the rows it summarizes and its error.
+        `radius_definition` is one of RADIUS_DEFINITIONS, "legacy" for the baselines written before the radius was fixed.
         """
         self.num_clusters = num_clusters
         self.silhouette_score = silhouette_score
         self.centroids = centroids
         self.radius = radius
         self.labels_percentages = labels_percentages
+        self.projection = projection
+        self.scaler = scaler
+        self.stability = stability
+        self.coreset = coreset
+        self.radius_definition = radius_definition
 
     def __repr__(self):
         """
@@ -43,14 +315,33 @@ class Cluster_statistics:
         radius_list = [radius for radius in self.radius]
         labels_percentages_list = [label_percentage for label_percentage in self.labels_percentages]
 
-        return {
+        json_data = {
             "num_clusters": self.num_clusters,
             "silhouette_score": self.silhouette_score,
             "centroids": centroid_list,
             "radius": radius_list,
-            "labels_percentages": labels_percentages_list
+            "labels_percentages": labels_percentages_list,
+            "radius_definition": self.radius_definition
         }
+        if self.scaler is not None:
+            json_data["scaler"] = self.scaler.get_json()
+        if self.projection is not None:
+            json_data["projection"] = self.projection.get_json()
+        if self.stability is not None:
+            json_data["stability"] = self.stability
+        if self.coreset is not None:
+            json_data["coreset"] = self.coreset
+
+        return json_data
     
+    def transform(self, X):
+        """
+        Applies the scaler and the projection of the clustering, if any, to the rows of X.
+        """
+        X, _ = _scale(X, scaler=self.scaler)
+        X, _ = _project(X, projection=self.projection)
+        return X
+
     def __eq__(self, value):
         if not isinstance(value, Cluster_statistics):
             return NotImplemented
@@ -94,6 +385,10 @@ class ClusterChanges:
         self.changed = dict()
         self.unchanged = dict()
 
+        if original.radius_definition != new_data.radius_definition:
+            raise ValueError(f"Cannot compare a {original.radius_definition} radius with a {new_data.radius_definition} radius, "
+                             f"fit the new clustering with radius_definition=\"{original.radius_definition}\".")
+
         if original.num_clusters != new_data.num_clusters:
             self.changed['num_clusters'] = 100 * abs(original.num_clusters - new_data.num_clusters) / original.num_clusters
         else:
@@ -103,7 +398,10 @@ class ClusterChanges:
             ("silhouette_score", original.silhouette_score, new_data.silhouette_score, delta * original.silhouette_score),
         ]
 
-        if original.num_clusters == new_data.num_clusters:
+        if original.num_clusters == new_data.num_clusters and original.stability is not None:
+            new_data = ClusterChanges.reorder_changes(original, new_data)
+            metrics += ClusterChanges._stability_metrics(original, new_data, delta)
+        elif original.num_clusters == new_data.num_clusters:
             new_data = ClusterChanges.reorder_changes(original, new_data)
 
             # Compare centroids and radius
@@ -146,6 +444,30 @@ class ClusterChanges:
 
         return (f"Change: {change_str}, Unchanged: {unchanged_str}, delta: {self.delta}")
     
+    def _stability_metrics(original: Cluster_statistics, new_data: Cluster_statistics, delta: float) -> list:
+        """
+        Metrics of every cluster with thresholds taken from the bootstrap confidence intervals of the original clustering:
+        the centroid is compared by its displacement, the radius and label percentage by the width of their interval.
+        A resample never reaches past the farthest row, so the radius keeps `delta` as the least relative change reported.
+        """
+        stability = original.stability
+        # The new clustering is fitted on a sample of its own, so both sides carry the refit jitter
+        scale = np.sqrt(2)
+        metrics = []
+        for i, (orig_centroid, new_centroid, shift) in enumerate(zip(original.centroids, new_data.centroids, stability['centroid_shift'])):
+            metrics.append((f'centroid_{i}', np.asarray(orig_centroid, dtype=float), np.asarray(new_centroid, dtype=float), scale * shift))
+
+        for name, orig_values, new_values, intervals, floor in [
+            ('radius', original.radius, new_data.radius, stability['radius'], delta),
+            ('label_percentage', original.labels_percentages, new_data.labels_percentages, stability['labels_percentages'], 0)
+        ]:
+            for i, (orig_val, new_val, (low, high)) in enumerate(zip(orig_values, new_values, intervals)):
+                # The bootstrap radius cannot exceed the original one, so both sides use the larger half-width of the interval
+                threshold = max(scale * max(high - orig_val, orig_val - low), floor * orig_val)
+                metrics.append((f'{name}_{i}', orig_val, new_val, threshold))
+
+        return metrics
+
     def reorder_changes(original, new_data):
         """
         Reorder the changes to match the order of another ClusterChanges object.
@@ -177,74 +499,305 @@ class ClusterChanges:
             "delta": self.delta
         }
 
-def _calculate_radius(X, kmeans):
+def select_numeric_columns(X: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the numeric columns of X that the clustering runs on, X itself when every column is numeric.
+    The numeric columns of a Polars DataFrame or an Arrow table are converted to a float64 pandas DataFrame.
+    """
+    if backends.is_native(X):
+        return backends.numeric_frame(X)
+    numeric = [col for col in X.columns if pd.api.types.is_numeric_dtype(X[col].dtype) and not pd.api.types.is_bool_dtype(X[col].dtype)]
+    if len(numeric) == len(X.columns):
+        return X
+    return X[numeric]
+
+class RowAttribution:
+    """
+    A class to represent the assignment of every row of a batch to its nearest baseline centroid.
+    The score of a row is its distance to that centroid divided by the stored radius of the cluster,
+    so rows with a score above 1 fall outside every cluster seen in the baseline.
+    """
+
+    def __init__(self, labels: np.ndarray, distances: np.ndarray, radius: list[float]):
+        """
+        Initializes the RowAttribution with the nearest centroid and the distance to it of every row.
+        """
+        self.labels = labels
+        self.distances = distances
+
+        radius = np.asarray(radius, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.scores = np.where(radius[labels] > 0, distances / radius[labels], np.where(distances > 0, np.inf, 0.0))
+        self.outliers = self.scores > 1
+
+        self.cluster_counts = np.bincount(labels, minlength=len(radius))
+        self.outlier_counts = np.bincount(labels[self.outliers], minlength=len(radius))
+
+    def __repr__(self):
+        """
+        Returns a string representation of the RowAttribution.
+        """
+        return (f"RowAttribution(rows={len(self.labels)}, outliers={int(self.outliers.sum())}, "
+                f"cluster_counts={self.cluster_counts.tolist()}, outlier_counts={self.outlier_counts.tolist()})")
+
+    def top_rows(self, n: int = 10) -> np.ndarray:
+        """
+        Returns the positions of the `n` rows with the highest outlier scores, highest first.
+        """
+        n = min(n, len(self.scores))
+        top = np.argpartition(-self.scores, n - 1)[:n] if n else np.array([], dtype=np.int64)
+        return top[np.argsort(-self.scores[top], kind='stable')]
+
+    def get_json(self, top: int = 10) -> dict:
+        """
+        Returns a JSON representation of the per-cluster counts and of the `top` rows with the highest scores.
+        """
+        rows = len(self.labels)
+        top_rows = self.top_rows(top)
+
+        return {
+            "rows": rows,
+            "outliers": int(self.outliers.sum()),
+            "outlier_percentage": 100 * float(self.outliers.mean()) if rows else 0.0,
+            "cluster_counts": self.cluster_counts.tolist(),
+            "outlier_counts": self.outlier_counts.tolist(),
+            "top_rows": [
+                {"row": int(row), "cluster": int(self.labels[row]), "distance": float(self.distances[row]), "score": float(self.scores[row])}
+                for row in top_rows
+            ]
+        }
+
+def nearest_centroids(X, centroids, chunk_size: int = 65536) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the index of the nearest centroid and the Euclidean distance to it of every row of X.
+    The rows are processed in chunks of `chunk_size`, with the distances of a whole chunk computed as a single matrix product.
+    """
+    X = _as_array(X)
+    centroids = np.asarray(centroids, dtype=float)
+    squared_norms = np.einsum('ij,ij->i', centroids, centroids)
+
+    labels = np.empty(len(X), dtype=np.int64)
+    distances = np.empty(len(X), dtype=float)
+    for start in range(0, len(X), chunk_size):
+        chunk = X[start:start + chunk_size]
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, the row norm does not change the argmin
+        partial = squared_norms - 2 * (chunk @ centroids.T)
+        chunk_labels = np.argmin(partial, axis=1)
+        squared = partial[np.arange(len(chunk)), chunk_labels] + np.einsum('ij,ij->i', chunk, chunk)
+        labels[start:start + chunk_size] = chunk_labels
+        distances[start:start + chunk_size] = np.sqrt(np.maximum(squared, 0))
+
+    return labels, distances
+
+@profiled("multivariate.attribute_rows")
+def attribute_rows(X, cluster_info: Cluster_statistics, chunk_size: int = 65536) -> RowAttribution:
+    """
+    Assign every row of X to its nearest baseline centroid, without refitting, and score it against the cluster radius.
+    The rows are scaled and projected first when the baseline clusters were found in a scaled or reduced space.
+    The "legacy" radius of older baselines is larger than the distance to the own centroid, so their scores are lower;
+    recreate the baseline to score the rows against the radius of the clusters.
+    """
+    X = cluster_info.transform(X)
+    labels, distances = nearest_centroids(X, cluster_info.centroids, chunk_size=chunk_size)
+    return RowAttribution(labels, distances, cluster_info.radius)
+
+def _fit_kmeans(values: np.ndarray, num_clusters: int, fit_sample_size: int = None, seed: int = DEFAULT_SEED, sample_weight: np.ndarray = None) -> KMeans:
+    """
+    Fit KMeans on all the rows, or on a uniform sample of `fit_sample_size` rows whose centroids
+    then label every row in chunks, so only the sample is ever held in memory.
+    The rows of a coreset are fitted with their `sample_weight`.
+    """
+    if sample_weight is not None or fit_sample_size is None or fit_sample_size >= len(values):
+        kmeans = KMeans(n_clusters=num_clusters, random_state=42)
+        with span("multivariate.kmeans_fit"):
+            kmeans.fit(values, sample_weight=sample_weight)
+        return kmeans
+
+    # The sample is a new array, KMeans can center it in place
+    kmeans = KMeans(n_clusters=num_clusters, random_state=42, copy_x=False)
+    with span("multivariate.kmeans_fit"):
+        kmeans.fit(values[sample_indices(len(values), fit_sample_size, seed)])
+    with span("multivariate.kmeans_labels"):
+        kmeans.labels_, _ = nearest_centroids(values, kmeans.cluster_centers_)
+
+    return kmeans
+
+def _silhouette_score(values: np.ndarray, labels: np.ndarray, sample_size: int = None, seed: int = DEFAULT_SEED, sample_weight: np.ndarray = None) -> float:
+    """
+    Silhouette score of the labels on a sample of `sample_size` rows, or all of them. The rows of a coreset are
+    resampled in proportion to their `sample_weight`, so the score is that of a uniform sample of the rows it summarizes.
+    """
+    if sample_weight is not None:
+        rows = np.random.default_rng(seed).choice(len(values), size=min(sample_size or SILHOUETTE_SAMPLE_SIZE, len(values)), p=sample_weight / sample_weight.sum())
+        values, labels, sample_size = values[rows], labels[rows], None
+    with span("multivariate.silhouette_score"), config_context(working_memory=SILHOUETTE_WORKING_MEMORY):
+        return float(silhouette_score(values, labels, sample_size=sample_size, random_state=seed))
+
+def _labels_percentages(labels: np.ndarray, num_clusters: int, sample_weight: np.ndarray = None) -> np.ndarray:
+    """
+    Percentage of the rows in every cluster, the rows of a coreset counting for their `sample_weight`.
+    """
+    counts = np.bincount(labels, weights=sample_weight, minlength=num_clusters)
+    return counts / counts.sum() * 100
+
+def _fitting_values(X, coreset_size: int = None, seed: int = DEFAULT_SEED):
+    """
+    Returns the rows the clustering is fitted on, their weights and the coreset they come from:
+    the rows of X unweighted, or the rows of a coreset of `coreset_size` rows of X and their weights.
+    """
+    values = _as_array(X)
+    if coreset_size is None:
+        return values, None, None
+
+    with span("multivariate.coreset"):
+        coreset = Coreset(values, coreset_size, seed=seed)
+    return coreset.points, coreset.weights, coreset
+
+@profiled("multivariate.calculate_radius")
+def _calculate_radius(X, kmeans, chunk_size: int = 65536, definition: str = "centroid", labels: np.ndarray = None):
     """
     Calculate the radius of each cluster based on the distance of points to their respective centroids.
+    The rows are read in chunks of `chunk_size`, so a memory-mapped X is never loaded at once.
+    The rows are labelled by the KMeans fit unless their `labels` are given.
+    With the "legacy" definition the distance of a row is the norm of its differences to every centroid, as the
+    baselines written before the radius was fixed stored it, so their batches are measured the same way.
     """
+    if definition not in RADIUS_DEFINITIONS:
+        raise ValueError(f"Unknown radius definition: {definition}, expected one of {RADIUS_DEFINITIONS}")
+
+    X = _as_array(X)
+    centroids = kmeans.cluster_centers_
+    all_labels = kmeans.labels_ if labels is None else labels
+    radius = np.zeros(len(centroids))
+    for start in range(0, len(X), chunk_size):
+        chunk = X[start:start + chunk_size]
+        labels = all_labels[start:start + chunk_size]
+        if definition == "legacy":
+            # sum_j ||x - c_j||^2 = k ||x||^2 - 2 x.sum_j c_j + sum_j ||c_j||^2
+            squared = len(centroids) * np.einsum('ij,ij->i', chunk, chunk) - 2 * chunk @ centroids.sum(axis=0) + (centroids ** 2).sum()
+            distances = np.sqrt(np.maximum(squared, 0))
+        else:
+            distances = np.linalg.norm(chunk - centroids[labels], axis=1)
+        np.maximum.at(radius, labels, distances)
 
-    X = np.array(X, dtype=float)
-    radius = [0]*len(kmeans.cluster_centers_)
-    for data_point, label in zip(X, kmeans.labels_):
-        radius[label] = max(radius[label], np.linalg.norm(data_point-kmeans.cluster_centers_))
+    return radius.tolist()
 
-    return radius
+def _radius_and_percentages(X, values: np.ndarray, kmeans, num_clusters: int, sample_weight: np.ndarray = None, coreset: Coreset = None, definition: str = "centroid"):
+    """
+    Returns the radius and the label percentages of the clusters of a KMeans fitted on `values`.
+    A coreset only keeps a few rows of every region, so the farthest rows of a cluster are rarely among them:
+    the rows of X are then labelled in chunks and the radius and percentages computed over all of them.
+    """
+    if coreset is None:
+        return _calculate_radius(values, kmeans, definition=definition), _labels_percentages(kmeans.labels_, num_clusters, sample_weight)
+
+    with span("multivariate.kmeans_labels"):
+        labels, _ = nearest_centroids(X, kmeans.cluster_centers_)
+    return _calculate_radius(X, kmeans, definition=definition, labels=labels), _labels_percentages(labels, num_clusters)
 
-def plot_clusters(X, kmeans, best_cluster, path: str = None):
+@profiled("multivariate.plot_clusters")
+def plot_clusters(X, kmeans, best_cluster, path: str = None, sample_size: int = None, seed: int = DEFAULT_SEED):
     """
     Plot the clusters and their centroids.
+    When `sample_size` is given only a sample of that many rows, stratified by cluster label, is drawn.
     """
-    if len(X.columns) == 2:
+    columns = _column_names(X)
+    if len(columns) in (2, 3):
+        sample = stratified_sample_indices(kmeans.labels_, sample_size, seed)
+        X_sample = X.iloc[sample] if isinstance(X, pd.DataFrame) else pd.DataFrame(_as_array(X)[sample], columns=columns)
+        labels_sample = kmeans.labels_[sample]
+
+    if len(columns) == 2:
         plt.figure(figsize=(8, 4))
-        plt.scatter(X.iloc[:, 0], X.iloc[:, 1], c=kmeans.labels_, cmap='viridis', marker='o')
+        plt.scatter(X_sample.iloc[:, 0], X_sample.iloc[:, 1], c=labels_sample, cmap='viridis', marker='o')
         plt.scatter(kmeans.cluster_centers_[:, 0], kmeans.cluster_centers_[:, 1], c='red', marker='x', s=100, label='Centroids')
         plt.title(f'KMeans Clustering with {best_cluster} clusters')
-        plt.xlabel(X.columns[0])
-        plt.ylabel(X.columns[1])
+        plt.xlabel(columns[0])
+        plt.ylabel(columns[1])
 
         plt.legend()
         plt.grid(True)
 
         if path:
-            os.makedirs(path, exist_ok=True)
-            plt.savefig(f"{path}/kmeans_clusters_{best_cluster}.png")
-            plt.close()
+            with span("multivariate.savefig"):
+                save_figure(f"{path}/kmeans_clusters_{best_cluster}.png")
         else:
             plt.show()
-    elif len(X.columns) == 3:
+    elif len(columns) == 3:
         fig = plt.figure(figsize=(8, 4))
         ax = fig.add_subplot(111, projection='3d')
 
-        ax.scatter(X.iloc[:, 0], X.iloc[:, 1], X.iloc[:, 2], c=kmeans.labels_, cmap='viridis', marker='o')
+        ax.scatter(X_sample.iloc[:, 0], X_sample.iloc[:, 1], X_sample.iloc[:, 2], c=labels_sample, cmap='viridis', marker='o')
         ax.scatter(kmeans.cluster_centers_[:, 0], kmeans.cluster_centers_[:, 1], kmeans.cluster_centers_[:, 2], c='red', marker='x', s=100, label='Centroids')
         ax.set_title(f'KMeans Clustering with {best_cluster} clusters')
-        ax.set_xlabel(X.columns[0])
-        ax.set_ylabel(X.columns[1])
-        ax.set_zlabel(X.columns[2])
+        ax.set_xlabel(columns[0])
+        ax.set_ylabel(columns[1])
+        ax.set_zlabel(columns[2])
         plt.legend()
         plt.grid(True)
 
         if path:
-            plt.savefig(f"{path}/kmeans_clusters_{best_cluster}.png")
-            plt.close()
+            with span("multivariate.savefig"):
+                save_figure(f"{path}/kmeans_clusters_{best_cluster}.png")
         else:
             plt.show()
 
-def get_best_clusters(X, path: str = None, plot: bool = True):
+_sweep_values = None
+_sweep_options = None
+
+def _initialize_sweep_worker(values: np.ndarray, options: dict):
+    """
+    Keep the data and the fitting options in the process running the fits of the cluster counts.
+    """
+    global _sweep_values, _sweep_options
+    _sweep_values = values
+    _sweep_options = options
+
+def _sweep_score(num_clusters: int) -> float:
+    """
+    Fit KMeans with `num_clusters` clusters and return its silhouette score.
+    """
+    seed, sample_weight = _sweep_options["seed"], _sweep_options["sample_weight"]
+    kmeans = _fit_kmeans(_sweep_values, num_clusters, _sweep_options["fit_sample_size"], seed, sample_weight)
+    return _silhouette_score(_sweep_values, kmeans.labels_, _sweep_options["silhouette_sample_size"], seed, sample_weight)
+
+@profiled("multivariate.get_best_clusters")
+def get_best_clusters(X, path: str = None, plot: bool = True, sample_size: int = None, seed: int = DEFAULT_SEED, n_components: int = None, projection: Projection = None, projection_method: str = "pca", scaling: str = None, scaler: Scaler = None, silhouette_sample_size: int = None, fit_sample_size: int = None, max_workers: int = 1, nan_policy: str = "drop", coreset_size: int = None):
     """
     Perform clustering on the dataset X and plot silhouette scores for different cluster counts.
+    With `scaling` ("standard" or "robust") the columns are first scaled by a scaler fitted on X, or by the given `scaler`.
+    With `n_components` the clustering runs on a projection of X fitted on it, or on the given `projection`.
+    X can be a DataFrame or a float64 array, such as a memory-mapped .npy file, which is used without a copy.
+    With `fit_sample_size` KMeans is fitted on a sample of that many rows and every row is then labelled in chunks,
+    and the silhouette score is computed on a sample of `silhouette_sample_size` rows (at most 10000 by default).
+    The cluster counts are fitted in a pool of `max_workers` processes, whose native threads share the cores.
+    The rows with missing or infinite values are handled by the `nan_policy` ("drop", "impute" or "raise").
+    With `coreset_size` the rows are read once to build a weighted coreset of that many rows, on which the cluster counts
+    and the silhouette scores are computed instead of `fit_sample_size`; the radius and the label percentages are then
+    computed over every row, read once more in chunks.
     """
+    X = _handle_missing(X, nan_policy)
+    X, scaler = _scale(X, scaling, scaler)
+    X, projection = _project(X, n_components, projection, projection_method, seed)
+    values, sample_weight, coreset = _fitting_values(X, coreset_size, seed)
+    if silhouette_sample_size is None and fit_sample_size is not None:
+        silhouette_sample_size = min(fit_sample_size, SILHOUETTE_SAMPLE_SIZE)
 
-    max_silhouette = -1
-    silhouette_scores = []
-    best_cluster = 0
-    for k in range(2, 11):
-        kmeans = KMeans(n_clusters=k, random_state=42)
-        kmeans.fit(X)
-        score = silhouette_score(X, kmeans.labels_)
-        silhouette_scores.append(score)
-        if score > max_silhouette:
-            max_silhouette = score
-            best_cluster = k
+    cluster_counts = list(range(2, 11))
+    options = {"fit_sample_size": fit_sample_size, "silhouette_sample_size": silhouette_sample_size, "seed": seed, "sample_weight": sample_weight}
+    if max_workers is None or max_workers > 1:
+        with process_pool(max_workers, initializer=_initialize_sweep_worker, initargs=(values, options)) as executor:
+            silhouette_scores = list(executor.map(_sweep_score, cluster_counts))
+    else:
+        _initialize_sweep_worker(values, options)
+        try:
+            silhouette_scores = [_sweep_score(k) for k in cluster_counts]
+        finally:
+            _initialize_sweep_worker(None, None)
+
+    # The first count with the highest score
+    best_cluster = cluster_counts[int(np.argmax(silhouette_scores))]
+    max_silhouette = max(silhouette_scores)
 
     # Plot silhouette scores for each k
     if plot:
@@ -256,56 +809,140 @@ def get_best_clusters(X, path: str = None, plot: bool = True):
         plt.xticks(range(2, 11))
         plt.grid(True)
         if path:
-            os.makedirs(path, exist_ok=True)
-            plt.savefig(f"{path}/silhouette_scores.png")
-            plt.close()
+            with span("multivariate.savefig"):
+                save_figure(f"{path}/silhouette_scores.png")
         else:
             plt.show()
             plt.show()
 
     # Fit KMeans with the best number of clusters
-    kmeans = KMeans(n_clusters=best_cluster, random_state=42)
-    kmeans.fit(X)
-
-    radius = _calculate_radius(X, kmeans)
+    kmeans = _fit_kmeans(values, best_cluster, fit_sample_size, seed, sample_weight)
 
-    labels_percentages = np.bincount(kmeans.labels_) / len(kmeans.labels_) * 100
+    radius, labels_percentages = _radius_and_percentages(X, values, kmeans, best_cluster, sample_weight, coreset)
 
     if plot:
-        plot_clusters(X, kmeans, best_cluster, path=path)
+        plot_clusters(X if coreset is None else pd.DataFrame(values, columns=_column_names(X)), kmeans, best_cluster, path=path, sample_size=sample_size, seed=seed)
 
     return Cluster_statistics(
         num_clusters=best_cluster,
         silhouette_score=max_silhouette,
         centroids=kmeans.cluster_centers_,
         radius=radius,
-        labels_percentages=labels_percentages.tolist()
+        labels_percentages=labels_percentages.tolist(),
+        projection=projection,
+        scaler=scaler,
+        coreset=coreset.get_guarantee(best_cluster) if coreset is not None else None
     )
 
-def get_cluster_defined_number(X, num_clusters: int, path: str = None, plot: bool = True):
+@profiled("multivariate.get_cluster_defined_number")
+def get_cluster_defined_number(X, num_clusters: int, path: str = None, plot: bool = True, sample_size: int = None, seed: int = DEFAULT_SEED, n_components: int = None, projection: Projection = None, projection_method: str = "pca", scaling: str = None, scaler: Scaler = None, silhouette_sample_size: int = None, fit_sample_size: int = None, nan_policy: str = "drop", coreset_size: int = None, radius_definition: str = "centroid"):
     """
     Perform clustering on the dataset X with a defined number of clusters.
+    With `scaling` ("standard" or "robust") the columns are first scaled by a scaler fitted on X, or by the given `scaler`.
+    With `n_components` the clustering runs on a projection of X fitted on it, or on the given `projection`.
+    X can be a DataFrame or a float64 array, such as a memory-mapped .npy file, which is used without a copy.
+    With `fit_sample_size` KMeans is fitted on a sample of that many rows and every row is then labelled in chunks,
+    and the silhouette score is computed on a sample of `silhouette_sample_size` rows (at most 10000 by default).
+    The rows with missing or infinite values are handled by the `nan_policy` ("drop", "impute" or "raise").
+    With `coreset_size` the clustering is fitted on a weighted coreset of that many rows, as in get_best_clusters,
+    and the radius and the label percentages are computed over every row.
+    The radius follows `radius_definition`, that of the baseline a batch is compared against.
     """
+    X = _handle_missing(X, nan_policy)
+    X, scaler = _scale(X, scaling, scaler)
+    X, projection = _project(X, n_components, projection, projection_method, seed)
+    values, sample_weight, coreset = _fitting_values(X, coreset_size, seed)
+    if silhouette_sample_size is None and fit_sample_size is not None:
+        silhouette_sample_size = min(fit_sample_size, SILHOUETTE_SAMPLE_SIZE)
 
-    kmeans = KMeans(n_clusters=num_clusters, random_state=42)
-    kmeans.fit(X)
-    score = silhouette_score(X, kmeans.labels_)
+    kmeans = _fit_kmeans(values, num_clusters, fit_sample_size, seed, sample_weight)
+    score = _silhouette_score(values, kmeans.labels_, silhouette_sample_size, seed, sample_weight)
 
-    radius = _calculate_radius(X, kmeans)
-
-    labels_percentages = np.bincount(kmeans.labels_) / len(kmeans.labels_) * 100
+    radius, labels_percentages = _radius_and_percentages(X, values, kmeans, num_clusters, sample_weight, coreset, radius_definition)
 
     if plot:
-        plot_clusters(X, kmeans, num_clusters, path=path)
+        plot_clusters(X if coreset is None else pd.DataFrame(values, columns=_column_names(X)), kmeans, num_clusters, path=path, sample_size=sample_size, seed=seed)
 
     return Cluster_statistics(
         num_clusters=num_clusters,
         silhouette_score=score,
         centroids=kmeans.cluster_centers_,
         radius=radius,
-        labels_percentages=labels_percentages
+        labels_percentages=labels_percentages,
+        projection=projection,
+        scaler=scaler,
+        coreset=coreset.get_guarantee(num_clusters) if coreset is not None else None,
+        radius_definition=radius_definition
     )
 
+_stability_values = None
+_stability_centroids = None
+_stability_radius_definition = None
+
+def _initialize_stability_worker(values: np.ndarray, centroids: np.ndarray, radius_definition: str = "centroid"):
+    """
+    Keep the data, the original centroids and the definition of their radius in the process running the bootstrap fits.
+    """
+    global _stability_values, _stability_centroids, _stability_radius_definition
+    _stability_values = values
+    _stability_centroids = centroids
+    _stability_radius_definition = radius_definition
+
+def _stability_fit(seed: int, sample_size: int) -> tuple[np.ndarray, list[float], np.ndarray]:
+    """
+    Refit KMeans on a resample of the rows, warm-started from the original centroids so the clusters keep their order.
+    Returns its centroids, radius and label percentages.
+    """
+    rng = np.random.default_rng(seed)
+    values = _stability_values[rng.integers(0, len(_stability_values), size=sample_size)]
+    kmeans = KMeans(n_clusters=len(_stability_centroids), init=_stability_centroids, n_init=1, random_state=42, copy_x=False)
+    kmeans.fit(values)
+    labels_percentages = np.bincount(kmeans.labels_, minlength=len(_stability_centroids)) / len(values) * 100
+
+    return kmeans.cluster_centers_, _calculate_radius(values, kmeans, definition=_stability_radius_definition), labels_percentages
+
+@profiled("multivariate.cluster_stability")
+def cluster_stability(X, cluster_info: Cluster_statistics, n_bootstrap: int = 50, sample_size: int = None, confidence: float = 0.95,
+                      max_workers: int = 1, seed: int = DEFAULT_SEED, nan_policy: str = "drop") -> dict:
+    """
+    Estimate how much the centroids, radius and label percentages of a clustering move when it is refitted on
+    resampled data, so real drift can be told apart from refit jitter.
+
+    KMeans is refitted `n_bootstrap` times on `sample_size` rows (as many as X by default) drawn with replacement,
+    warm-started from the original centroids, in a pool of `max_workers` processes. Returns the `confidence` quantile
+    of the displacement of every centroid and the `confidence` intervals of every radius and label percentage,
+    to attach as the `stability` of the Cluster_statistics. The rows with missing or infinite values are handled by the `nan_policy`.
+    """
+    values = _as_array(cluster_info.transform(_handle_missing(X, nan_policy)))
+    centroids = np.asarray(cluster_info.centroids, dtype=float)
+    sample_size = sample_size or len(values)
+    seeds = np.random.default_rng(seed).integers(0, 2**32, size=n_bootstrap).tolist()
+
+    with span("multivariate.stability_fits"):
+        if max_workers is None or max_workers > 1:
+            with process_pool(max_workers, initializer=_initialize_stability_worker, initargs=(values, centroids, cluster_info.radius_definition)) as executor:
+                fits = list(executor.map(_stability_fit, seeds, [sample_size] * n_bootstrap))
+        else:
+            _initialize_stability_worker(values, centroids, cluster_info.radius_definition)
+            try:
+                fits = [_stability_fit(fit_seed, sample_size) for fit_seed in seeds]
+            finally:
+                _initialize_stability_worker(None, None)
+
+    bootstrap_centroids = np.stack([fit[0] for fit in fits])
+    bootstrap_radius = np.array([fit[1] for fit in fits])
+    bootstrap_percentages = np.stack([fit[2] for fit in fits])
+    tails = [(1 - confidence) / 2, 1 - (1 - confidence) / 2]
+
+    return {
+        "n_bootstrap": n_bootstrap,
+        "sample_size": sample_size,
+        "confidence": confidence,
+        "centroid_shift": np.quantile(np.linalg.norm(bootstrap_centroids - centroids, axis=2), confidence, axis=0).tolist(),
+        "radius": np.quantile(bootstrap_radius, tails, axis=0).T.tolist(),
+        "labels_percentages": np.quantile(bootstrap_percentages, tails, axis=0).T.tolist()
+    }
+
 def get_cluster_info_from_json(json_data):
     """
     Extract cluster information from a JSON object.
@@ -315,13 +952,24 @@ def get_cluster_info_from_json(json_data):
     centroids = [np.array(centroid) for centroid in json_data.get('centroids', [])]
     radius = json_data.get('radius', [])
     labels_percentages = json_data.get('labels_percentages', [])
+    projection = Projection(json_data=json_data['projection']) if 'projection' in json_data else None
+    scaler = Scaler(json_data=json_data['scaler']) if 'scaler' in json_data else None
+    stability = json_data.get('stability')
+    coreset = json_data.get('coreset')
+    # Baselines written before the radius was fixed do not store its definition
+    radius_definition = json_data.get('radius_definition', "legacy")
 
     return Cluster_statistics(
         num_clusters=num_clusters,
         silhouette_score=silhouette_score,
         centroids=centroids,
         radius=radius,
-        labels_percentages=labels_percentages
+        labels_percentages=labels_percentages,
+        projection=projection,
+        scaler=scaler,
+        stability=stability,
+        coreset=coreset,
+        radius_definition=radius_definition
     )
 
 def compare_clusters(cluster_stats1: Cluster_statistics, cluster_stats2: Cluster_statistics, delta: float = 0.1):
@@ -331,14 +979,15 @@ def compare_clusters(cluster_stats1: Cluster_statistics, cluster_stats2: Cluster
 
     return ClusterChanges(original=cluster_stats1, new_data=cluster_stats2, delta=delta)
 
-def clustering_evolution(dfs: list[pd.DataFrame], num_clusters: int, path: str = None):
+@profiled("multivariate.clustering_evolution")
+def clustering_evolution(dfs: list[pd.DataFrame], num_clusters: int, path: str = None, projection: Projection = None, scaler: Scaler = None):
     """
-    Compares the evolution of clustering across multiple DataFrames.
+    Compares the evolution of clustering across multiple DataFrames, in the space of `scaler` and `projection` when given.
     """
 
     cluster_stats = []
     for i, df in enumerate(dfs):
-        stats = get_cluster_defined_number(df, num_clusters)
+        stats = get_cluster_defined_number(df, num_clusters, projection=projection, scaler=scaler)
         if i!=0:
             stats = ClusterChanges.reorder_changes(cluster_stats[0], stats)
         cluster_stats.append(stats)
@@ -376,9 +1025,8 @@ def clustering_evolution(dfs: list[pd.DataFrame], num_clusters: int, path: str =
     plt.tight_layout(pad=2.0)
 
     if path:
-        os.makedirs(path, exist_ok=True)
-        plt.savefig(f"{path}/clustering_evolution.png")
-        plt.close()
+        with span("multivariate.savefig"):
+            save_figure(f"{path}/clustering_evolution.png")
     else:
         plt.show()
 
@@ -386,20 +1034,24 @@ def clustering_evolution(dfs: list[pd.DataFrame], num_clusters: int, path: str =
     for i in range(1, len(cluster_stats)):
         compare_clusters(cluster_stats[i - 1], cluster_stats[i])
 
-def correlation_matrix(df: pd.DataFrame, path: str = None):
+@profiled("multivariate.correlation_matrix")
+def correlation_matrix(df: pd.DataFrame, path: str = None, plot: bool = True):
     """
-    Generate and save a correlation matrix heatmap for the DataFrame.
+    Generate and save a correlation matrix heatmap for the numeric columns of the DataFrame.
+    The correlations of a Polars DataFrame or an Arrow table are computed by its backend.
     """
-    corr = df.corr()
+    corr = backends.correlation(df) if backends.is_native(df) else df.corr(numeric_only=True)
+    if not plot:
+        return corr
+
     plt.figure(figsize=(10, 8))
     plt.title('Correlation Matrix')
     sns.heatmap(corr, annot=True, fmt='.2f', cmap='coolwarm', square=True)
     plt.tight_layout()
 
     if path:
-        os.makedirs(path, exist_ok=True)
-        plt.savefig(f"{path}/correlation_matrix.png")
-        plt.close()
+        with span("multivariate.savefig"):
+            save_figure(f"{path}/correlation_matrix.png")
     else:
         plt.show()
 
@@ -0,0 +1,332 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import pdist
+from scipy.stats import chi2
+from . import multivariate as mv
+from .concurrency import process_pool
+from .profiling import profiled, span
+from .sampling import DEFAULT_SEED, sample_indices
+
+# Permutations drawn at once, as one matrix product of their row selections with the features
+_PERMUTATION_BLOCK = 64
+
+class FeatureMap:
+    """
+    A class to represent random Fourier features of a Gaussian kernel, z(x) = sqrt(2 / D) cos(x W + b) on the
+    standardized columns, so the kernel MMD between two sets of rows is the distance between the means of their features
+    and costs O(rows) instead of O(rows^2).
+    """
+
+    def __init__(self, X=None, n_features: int = 256, bandwidth: float = None, seed: int = DEFAULT_SEED, json_data: dict = None):
+        """
+        Draws the FeatureMap for the columns of X or restores it from a JSON representation.
+        Without a `bandwidth` the median distance between standardized rows of a sample of X is used.
+        """
+        if X is not None:
+            values = mv._as_array(X)
+            self.mean = values.mean(axis=0)
+            std = values.std(axis=0)
+            self.scale = np.where(std > 0, std, 1.0)
+            if bandwidth is None:
+                sample = (values[sample_indices(len(values), 1000, seed)] - self.mean) / self.scale
+                bandwidth = float(np.median(pdist(sample))) if len(sample) > 1 else 1.0
+            self.bandwidth = bandwidth if bandwidth > 0 else 1.0
+
+            rng = np.random.default_rng(seed)
+            self.weights = rng.normal(0, 1 / self.bandwidth, size=(values.shape[1], n_features))
+            self.offsets = rng.uniform(0, 2 * np.pi, size=n_features)
+        elif json_data is not None:
+            # Float arrays, such as those of a shared baseline, are used without a copy
+            self.mean = np.asarray(json_data['mean'], dtype=float)
+            self.scale = np.asarray(json_data['scale'], dtype=float)
+            self.bandwidth = float(json_data['bandwidth'])
+            self.weights = np.asarray(json_data['weights'], dtype=float)
+            self.offsets = np.asarray(json_data['offsets'], dtype=float)
+        else:
+            raise ValueError("Either a DataFrame or JSON data must be provided to initialize FeatureMap.")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the FeatureMap.
+        """
+        return f"FeatureMap(columns={len(self.mean)}, features={len(self.offsets)}, bandwidth={self.bandwidth:.4f})"
+
+    def transform(self, values: np.ndarray) -> np.ndarray:
+        """
+        Returns the (rows x features) random features of an array of rows.
+        They are computed in float32, several times faster and far more precise than the sampling noise of the MMD.
+        """
+        features = ((values - self.mean) / self.scale).astype(np.float32) @ self.weights.astype(np.float32)
+        features += self.offsets.astype(np.float32)
+        np.cos(features, out=features)
+        features *= np.float32(np.sqrt(2 / len(self.offsets)))
+        return features
+
+    def mean_embedding(self, values: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """
+        Returns the mean of the features of the rows, computed in chunks so only `chunk_size` rows of features are held at once.
+        """
+        total = np.zeros(len(self.offsets))
+        for start in range(0, len(values), chunk_size):
+            total += self.transform(values[start:start + chunk_size]).sum(axis=0, dtype=np.float64)
+
+        return total / max(len(values), 1)
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the FeatureMap.
+        """
+        return {
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "bandwidth": self.bandwidth,
+            "weights": self.weights.tolist(),
+            "offsets": self.offsets.tolist()
+        }
+
+class MultivariateDrift:
+    """
+    A class to represent the multivariate drift of a batch against the baseline: the Mahalanobis distance of its mean
+    under the baseline covariance, with a chi-square p-value, and the kernel MMD of random features, with a permutation p-value.
+    Both tests are Bonferroni-corrected, so the batch drifts at most `alpha` of the time when nothing drifted.
+    """
+
+    def __init__(self, mahalanobis: float, mahalanobis_p_value: float, mmd: float, mmd_p_value: float, n_permutations: int, alpha: float = 0.05):
+        """
+        Initializes the MultivariateDrift with its statistics; a test drifts when its p-value is below `alpha`
+        divided by the number of tests.
+        """
+        self.mahalanobis = mahalanobis
+        self.mahalanobis_p_value = mahalanobis_p_value
+        self.mmd = mmd
+        self.mmd_p_value = mmd_p_value
+        self.n_permutations = n_permutations
+        self.alpha = alpha
+
+        self.drifted = []
+        if mahalanobis_p_value < alpha / 2:
+            self.drifted.append("mahalanobis")
+        if mmd_p_value < alpha / 2:
+            self.drifted.append("mmd")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the MultivariateDrift.
+        """
+        return (f"MultivariateDrift(mahalanobis={self.mahalanobis:.4f}, mahalanobis_p_value={self.mahalanobis_p_value:.4f}, "
+                f"mmd={self.mmd:.6f}, mmd_p_value={self.mmd_p_value:.4f}, drifted={self.drifted})")
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the MultivariateDrift.
+        """
+        return {
+            "mahalanobis": self.mahalanobis,
+            "mahalanobis_p_value": self.mahalanobis_p_value,
+            "mmd": self.mmd,
+            "mmd_p_value": self.mmd_p_value,
+            "n_permutations": self.n_permutations,
+            "alpha": self.alpha,
+            "drifted": self.drifted
+        }
+
+def _numeric_columns(X):
+    """
+    Returns the numeric columns of a DataFrame of any backend, or an array as it is.
+    """
+    return X if isinstance(X, np.ndarray) else mv.select_numeric_columns(X)
+
+def _complete_rows(X, columns: list[str] = None) -> np.ndarray:
+    """
+    Returns the rows of the numeric columns (those given, in that order) without any missing or infinite value,
+    as a float64 array, as the NaN policy of the clustering treats infinities as missing.
+    """
+    X = _numeric_columns(X)
+    if columns is not None and isinstance(X, pd.DataFrame):
+        X = X[columns]
+    values = mv._as_array(X)
+    complete = np.isfinite(values).all(axis=1)
+
+    return values if complete.all() else values[complete]
+
+_permutation_features = None
+_permutation_size = None
+
+def _initialize_permutation_worker(features: np.ndarray, size: int):
+    """
+    Keep the pooled features and the number of reference rows in the process running the permutations.
+    """
+    global _permutation_features, _permutation_size
+    _permutation_features = features
+    _permutation_size = size
+
+def _permutation_statistics(seed: int, n_permutations: int) -> np.ndarray:
+    """
+    Returns the squared MMD of `n_permutations` random splits of the pooled features into reference and batch rows.
+    """
+    rng = np.random.default_rng(seed)
+    n, size = len(_permutation_features), _permutation_size
+    total = _permutation_features.sum(axis=0)
+    labels = np.zeros(n)
+    labels[:size] = 1.0
+
+    statistics = []
+    for start in range(0, n_permutations, _PERMUTATION_BLOCK):
+        selections = rng.permuted(np.tile(labels, (min(_PERMUTATION_BLOCK, n_permutations - start), 1)), axis=1)
+        reference = selections @ _permutation_features
+        difference = reference / size - (total - reference) / (n - size)
+        statistics.append(np.sum(difference ** 2, axis=1))
+
+    return np.concatenate(statistics)
+
+class MultivariateBaseline:
+    """
+    A class to represent the multivariate state of the original numeric columns the batches are compared against:
+    their mean and covariance, the random feature map and mean embedding of the rows, and a sample of reference rows
+    for the permutation test.
+    """
+
+    def __init__(self, X=None, n_features: int = 256, bandwidth: float = None, sample_size: int = 1000, seed: int = DEFAULT_SEED, json_data: dict = None):
+        """
+        Fits the MultivariateBaseline on the numeric columns of X or restores it from a JSON representation,
+        or from the arrays of get_arrays, which are used without a copy and keep the inverse of the covariance.
+        Rows with missing or infinite values are left out.
+        """
+        if X is not None:
+            X = _numeric_columns(X)
+            self.columns = mv._column_names(X)
+            values = _complete_rows(X)
+            if len(values) < 2:
+                raise ValueError("At least two complete rows are needed to fit the MultivariateBaseline.")
+
+            with span("multivariate_drift.fit"):
+                self.count = len(values)
+                self.mean = values.mean(axis=0)
+                self.covariance = np.atleast_2d(np.cov(values, rowvar=False))
+                self.feature_map = FeatureMap(values, n_features=n_features, bandwidth=bandwidth, seed=seed)
+                self.embedding = self.feature_map.mean_embedding(values)
+                self.reference = values[sample_indices(len(values), sample_size, seed)]
+        elif json_data is not None:
+            self.columns = np.asarray(json_data['columns'], dtype=str).tolist()
+            self.count = int(json_data['count'])
+            self.mean = np.asarray(json_data['mean'], dtype=float)
+            self.covariance = np.asarray(json_data['covariance'], dtype=float)
+            self.feature_map = FeatureMap(json_data=json_data['feature_map'])
+            self.embedding = np.asarray(json_data['embedding'], dtype=float)
+            self.reference = np.asarray(json_data['reference'], dtype=float)
+        else:
+            raise ValueError("Either a DataFrame or JSON data must be provided to initialize MultivariateBaseline.")
+
+        if json_data is not None and 'precision' in json_data:
+            self._precision = np.asarray(json_data['precision'], dtype=float)
+            self._rank = int(json_data['rank'])
+        else:
+            self._precision = np.linalg.pinv(self.covariance)
+            self._rank = int(np.linalg.matrix_rank(self.covariance))
+
+    def __repr__(self):
+        """
+        Returns a string representation of the MultivariateBaseline.
+        """
+        return f"MultivariateBaseline(columns={len(self.columns)}, count={self.count}, reference={len(self.reference)}, feature_map={self.feature_map})"
+
+    def mahalanobis(self, values: np.ndarray) -> tuple[float, float]:
+        """
+        Returns the Mahalanobis distance of the mean of the rows to the baseline mean, and its p-value: the squared
+        distance over the variance of the difference of both means follows a chi-square with as many degrees of freedom
+        as the rank of the covariance when nothing drifted.
+        """
+        difference = values.mean(axis=0) - self.mean
+        distance = float(difference @ self._precision @ difference)
+        statistic = distance / (1 / len(values) + 1 / self.count)
+
+        return float(np.sqrt(max(distance, 0.0))), float(chi2.sf(statistic, max(self._rank, 1)))
+
+    def mmd(self, values: np.ndarray, n_permutations: int = 200, sample_size: int = 1000, max_workers: int = 1, seed: int = DEFAULT_SEED) -> tuple[float, float]:
+        """
+        Returns the squared MMD between the mean embeddings of the rows and of the baseline, in one pass over the rows,
+        and its permutation p-value: the statistic of the reference rows against `sample_size` rows of the batch,
+        against those of `n_permutations` random splits of both, in a pool of `max_workers` processes.
+        """
+        mmd = float(np.sum((self.feature_map.mean_embedding(values) - self.embedding) ** 2))
+        if n_permutations <= 0:
+            return mmd, float('nan')
+
+        sample = values[sample_indices(len(values), sample_size, seed)]
+        features = np.vstack([self.feature_map.transform(self.reference), self.feature_map.transform(sample)]).astype(float)
+        size = len(self.reference)
+        observed = float(np.sum((features[:size].mean(axis=0) - features[size:].mean(axis=0)) ** 2))
+
+        workers = max_workers or 1
+        blocks = [len(block) for block in np.array_split(np.arange(n_permutations), workers) if len(block)]
+        seeds = np.random.default_rng(seed).integers(0, 2**32, size=len(blocks)).tolist()
+        with span("multivariate_drift.permutations"):
+            if workers > 1:
+                with process_pool(workers, initializer=_initialize_permutation_worker, initargs=(features, size)) as executor:
+                    statistics = np.concatenate(list(executor.map(_permutation_statistics, seeds, blocks)))
+            else:
+                _initialize_permutation_worker(features, size)
+                try:
+                    statistics = _permutation_statistics(seeds[0], n_permutations)
+                finally:
+                    _initialize_permutation_worker(None, None)
+
+        return mmd, float((1 + np.sum(statistics >= observed)) / (1 + n_permutations))
+
+    @profiled("multivariate_drift.compare")
+    def compare(self, X, n_permutations: int = 200, sample_size: int = 1000, alpha: float = 0.05, max_workers: int = 1, seed: int = DEFAULT_SEED) -> MultivariateDrift:
+        """
+        Compares the numeric columns of a batch against the baseline, see mahalanobis and mmd.
+        A batch without complete rows is not compared and never drifts.
+        """
+        values = _complete_rows(X, self.columns)
+        if len(values) == 0:
+            return MultivariateDrift(float('nan'), 1.0, float('nan'), 1.0, n_permutations, alpha=alpha)
+
+        distance, distance_p_value = self.mahalanobis(values)
+        mmd, mmd_p_value = self.mmd(values, n_permutations=n_permutations, sample_size=sample_size, max_workers=max_workers, seed=seed)
+
+        return MultivariateDrift(distance, distance_p_value, mmd, 1.0 if np.isnan(mmd_p_value) else mmd_p_value, n_permutations, alpha=alpha)
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the MultivariateBaseline.
+        """
+        return {
+            "columns": self.columns,
+            "count": self.count,
+            "mean": self.mean.tolist(),
+            "covariance": self.covariance.tolist(),
+            "feature_map": self.feature_map.get_json(),
+            "embedding": self.embedding.tolist(),
+            "reference": self.reference.tolist()
+        }
+
+    def get_arrays(self) -> dict:
+        """
+        Returns the representation of get_json with numpy arrays instead of lists, plus the pseudo-inverse of the covariance
+        and its rank, so a baseline restored from them, for example in every worker of a pool, does not recompute them.
+        """
+        return {
+            "columns": np.array(self.columns, dtype=str),
+            "count": np.array(self.count),
+            "mean": self.mean,
+            "covariance": self.covariance,
+            "precision": self._precision,
+            "rank": np.array(self._rank),
+            "feature_map": {
+                "mean": self.feature_map.mean,
+                "scale": self.feature_map.scale,
+                "bandwidth": np.array(self.feature_map.bandwidth),
+                "weights": self.feature_map.weights,
+                "offsets": self.feature_map.offsets
+            },
+            "embedding": self.embedding,
+            "reference": self.reference
+        }
+
+def compare_multivariate(original, new_data, n_permutations: int = 200, alpha: float = 0.05, max_workers: int = 1, seed: int = DEFAULT_SEED) -> MultivariateDrift:
+    """
+    Compares the numeric columns of two DataFrames, see MultivariateBaseline.compare.
+    """
+    return MultivariateBaseline(original, seed=seed).compare(new_data, n_permutations=n_permutations, alpha=alpha, max_workers=max_workers, seed=seed)
@@ -0,0 +1,218 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+_collector = None
+
+def _peak_rss_mb():
+    """
+    Returns the peak resident set size of the process in MB, or None when unavailable.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class Collector:
+    """
+    Base class of the objects receiving the timing spans.
+    Subclass it and override `record` to export the spans to another metrics pipeline.
+    """
+
+    def record(self, name: str, seconds: float, peak_rss_mb: float = None, peak_rss_growth_mb: float = None):
+        """
+        Receives a finished span with its duration, the process peak RSS when it ended
+        and how much it raised that peak. The base collector discards it.
+        """
+        return None
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the collected spans, None when the collector does not keep them.
+        """
+        return None
+
+class TimingCollector(Collector):
+    """
+    Collector that aggregates the call count, time and peak memory of every span name.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty TimingCollector.
+        """
+        self.stages = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the TimingCollector.
+        """
+        stages_str = ', '.join(f"{name}: {stage['calls']} calls {stage['total_seconds']:.3f}s" for name, stage in self.stages.items())
+        return f"TimingCollector({stages_str})"
+
+    def record(self, name: str, seconds: float, peak_rss_mb: float = None, peak_rss_growth_mb: float = None):
+        """
+        Adds a finished span to the aggregate of its name.
+        """
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = {
+                    "calls": 0,
+                    "total_seconds": 0.0,
+                    "min_seconds": float('inf'),
+                    "max_seconds": 0.0,
+                    "peak_rss_mb": None,
+                    "peak_rss_growth_mb": None,
+                }
+
+            stage["calls"] += 1
+            stage["total_seconds"] += seconds
+            stage["min_seconds"] = min(stage["min_seconds"], seconds)
+            stage["max_seconds"] = max(stage["max_seconds"], seconds)
+            if peak_rss_mb is not None:
+                stage["peak_rss_mb"] = max(stage["peak_rss_mb"] or 0.0, peak_rss_mb)
+                stage["peak_rss_growth_mb"] = max(stage["peak_rss_growth_mb"] or 0.0, peak_rss_growth_mb)
+
+    def merge(self, json_data: dict):
+        """
+        Adds the stages of another TimingCollector JSON representation, for example one collected in a worker process.
+        """
+        with self._lock:
+            for name, other in json_data.get("stages", {}).items():
+                stage = self.stages.get(name)
+                if stage is None:
+                    self.stages[name] = dict(other)
+                    continue
+
+                stage["calls"] += other["calls"]
+                stage["total_seconds"] += other["total_seconds"]
+                stage["min_seconds"] = min(stage["min_seconds"], other["min_seconds"])
+                stage["max_seconds"] = max(stage["max_seconds"], other["max_seconds"])
+                for key in ("peak_rss_mb", "peak_rss_growth_mb"):
+                    if other[key] is not None:
+                        stage[key] = max(stage[key] or 0.0, other[key])
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the aggregated spans, slowest stages first.
+        """
+        with self._lock:
+            stages = sorted(self.stages.items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+            return {"stages": {name: dict(stage) for name, stage in stages}}
+
+class _Span:
+    """
+    Context manager timing a block of code into the active collector.
+    """
+
+    __slots__ = ("collector", "name", "start", "start_rss")
+
+    def __init__(self, collector: Collector, name: str):
+        self.collector = collector
+        self.name = name
+
+    def __enter__(self):
+        self.start_rss = _peak_rss_mb()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        peak_rss = _peak_rss_mb()
+        growth = None if peak_rss is None else peak_rss - self.start_rss
+        self.collector.record(self.name, seconds, peak_rss, growth)
+        return False
+
+class _NullSpan:
+    """
+    Context manager doing nothing, used while profiling is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def get_collector() -> Collector:
+    """
+    Returns the active collector, None when profiling is disabled.
+    """
+    return _collector
+
+def set_collector(collector: Collector = None) -> Collector:
+    """
+    Sets the active collector and returns the previous one. Passing None disables profiling.
+    """
+    global _collector
+    previous = _collector
+    _collector = collector
+    return previous
+
+@contextmanager
+def profiling(collector: Collector = None):
+    """
+    Activates a collector for the duration of the block, a new TimingCollector when none is given.
+    """
+    collector = TimingCollector() if collector is None else collector
+    previous = set_collector(collector)
+    try:
+        yield collector
+    finally:
+        set_collector(previous)
+
+def span(name: str):
+    """
+    Returns a context manager timing the block under `name` into the active collector.
+    """
+    collector = _collector
+    if collector is None:
+        return _NULL_SPAN
+    return _Span(collector, name)
+
+def profiled(name: str):
+    """
+    Decorator timing every call of the function under `name` into the active collector.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            collector = _collector
+            if collector is None:
+                return func(*args, **kwargs)
+            with _Span(collector, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def write_timings(collector: Collector, path: str):
+    """
+    Writes the spans of the collector to `{path}/timings.json` when it keeps them.
+    """
+    if collector is None:
+        return
+
+    json_data = collector.get_json()
+    if json_data is None:
+        return
+
+    os.makedirs(path, exist_ok=True)
+    with open(f"{path}/timings.json", 'w') as f:
+        json.dump(json_data, f, indent=4)
@@ -1,9 +1,25 @@
 import pandas as pd
 from . import univariate as uv
 from . import multivariate as mv
+from . import profiling as prof
+from . import backends
+from . import artifacts
+from .artifacts import save_figure
+from .calibration import calibrate_thresholds
+from .comparison import LazyComparison
+from .metrics import get_metrics
+from .multivariate_drift import MultivariateBaseline
+from .segments import SegmentBaseline
+from .histograms import Histogram
+from .sampling import DEFAULT_SEED, get_sampling_info
 import json
 import os
+import numpy as np
 import matplotlib.pyplot as plt
+from contextlib import contextmanager
+
+# Descriptors saved as columns of a float array, older baselines without the quality counters have only the first seven
+_DESCRIPTOR_FIELDS = ["mean", "std", "min_val", "max_val", "q1", "q2", "q3"] + uv.QUALITY_COUNTERS
 
 def get_number_of_output_classes(y: pd.Series) -> int:
     """
@@ -14,81 +30,472 @@ def get_number_of_output_classes(y: pd.Series) -> int:
     num_classes = len(y.unique())
     return num_classes if num_classes<=10 else None
 
-def create_initial_report(df: pd.DataFrame, target: str, base_metrics: dict, path: str, number_of_output_classes: int = None) -> None:
+@contextmanager
+def _report_profiling(name: str, path: str, profile: bool):
+    """
+    Times the report under `name` and writes timings.json next to its artifacts while profiling is enabled.
+    A TimingCollector is activated for the report when `profile` is True and no collector is active.
+    """
+    collector = prof.get_collector()
+    if profile and collector is None:
+        with prof.profiling() as collector, prof.span(name):
+            yield
+    else:
+        with prof.span(name):
+            yield
+
+    prof.write_timings(collector, path)
+
+def create_initial_report(df: pd.DataFrame, target: str, base_metrics: dict, path: str, number_of_output_classes: int = None, plot_sample_size: int = None, seed: int = DEFAULT_SEED, profile: bool = False, histogram_bins: int = 20, plot: bool = True, binary: bool = False, n_components: int = None, projection_method: str = "pca", scaling: str = None, calibrate: bool = False, false_alarm_rate: float = 0.01, calibration_batch_size: int = None, stability_bootstrap: int = None, stability_workers: int = 1, segment_column: str = None, cluster_workers: int = 1, nan_policy: str = "drop", coreset_size: int = None, multivariate_drift: bool = False) -> None:
     """
     Create the initial informative visualizations and statistics for the given DataFrame.
+    The fixed-edge histograms of the numeric columns, used by the drift tests of later batches, are stored in histograms.json.
+    Categorical columns get a frequency table and are left out of the clustering.
+    When `plot_sample_size` is given the plots only draw a sample of that many rows;
+    the statistics are still computed on the full DataFrame.
+    When `profile` is True the time and peak memory of every stage are written to timings.json.
+    When `plot` is False only the statistics are computed, and with `binary` they are also stored in baseline.npz.
+    With `n_components` the clustering runs on a projection of the numeric columns, stored with the clusters
+    and applied to every later batch.
+    With `scaling` ("standard" or "robust") the numeric columns are scaled before the clustering, with a scaler
+    built from the descriptors and stored with the clusters as well.
+    With `calibrate` the drift thresholds of every column are learned by bootstrapping batches of `calibration_batch_size`
+    rows at `false_alarm_rate` and stored in thresholds.json, where compare_to_baseline picks them up.
+    With `stability_bootstrap` the clustering is refitted that many times on resampled rows, in `stability_workers`
+    processes, and later clusterings are compared against the confidence intervals stored with the clusters.
+    The cluster counts searched without `number_of_output_classes` are fitted in `cluster_workers` processes.
+    The rows with missing or infinite numeric values are dropped from the clustering or imputed with the mean of their
+    column, as `nan_policy` ("drop", "impute" or "raise") tells.
+    With `coreset_size` the clustering is fitted on a weighted coreset of that many rows, built in one pass over the
+    numeric columns, and its size and error are stored with the clusters.
+    df can also be a Polars DataFrame or an Arrow table: its statistics are computed by its own backend and
+    only its numeric columns are converted, to NumPy, for the clustering.
+    With `segment_column` the descriptors and histograms of every segment of that column are stored in segments.json.
+    With `multivariate_drift` the mean, covariance and random feature map of the numeric columns, the baseline of
+    the multivariate drift score, are stored in multivariate_drift.json next to the clusters.
     """
-    X = df.drop(columns=[target])
-    y = df[target]
+    with _report_profiling("report.create_initial_report", path, profile):
+        X = backends.drop_columns(df, [target])
+        y = df[target]
+
+        # Get distribution descriptors for all columns
+        descriptors = uv.get_distribution_descriptors_all_columns(X)
+        histograms = uv.get_histograms_all_columns(X, bins=histogram_bins)
+        thresholds = calibrate_thresholds(X, descriptors, histograms, false_alarm_rate=false_alarm_rate, batch_size=calibration_batch_size, seed=seed) if calibrate else None
+
+        os.makedirs(path, exist_ok=True)
+        if plot:
+            with open(f"{path}/plot_sampling.json", 'w') as f:
+                json.dump(get_sampling_info(len(X), plot_sample_size, seed), f, indent=4)
 
-    # Get distribution descriptors for all columns
-    descriptors = uv.get_distribution_descriptors_all_columns(X)
-    descriptors = {k: v.get_json() for k, v in descriptors.items()}
+            # Plot distribution descriptors for all columns
+            uv.plot_distribution_descriptors_all_columns(X, path=path, sample_size=plot_sample_size, seed=seed)
 
+        X_numeric = mv.select_numeric_columns(X)
+        scaler = mv.get_scaler_from_descriptors(descriptors, X_numeric.columns, scaling) if scaling else None
+        if number_of_output_classes is not None:
+            cluster_info = mv.get_cluster_defined_number(X_numeric, number_of_output_classes, path=path, plot=plot, sample_size=plot_sample_size, seed=seed,
+                                                         n_components=n_components, projection_method=projection_method, scaler=scaler, nan_policy=nan_policy,
+                                                         coreset_size=coreset_size)
+        else:
+            cluster_info = mv.get_best_clusters(X_numeric, path=path, plot=plot, sample_size=plot_sample_size, seed=seed,
+                                                n_components=n_components, projection_method=projection_method, scaler=scaler,
+                                                max_workers=cluster_workers, nan_policy=nan_policy, coreset_size=coreset_size)
+        if stability_bootstrap:
+            cluster_info.stability = mv.cluster_stability(X_numeric, cluster_info, n_bootstrap=stability_bootstrap, max_workers=stability_workers, seed=seed,
+                                                          nan_policy=nan_policy)
+
+        multivariate = MultivariateBaseline(X_numeric, seed=seed) if multivariate_drift else None
+
+        corr = mv.correlation_matrix(df, path=path, plot=plot)
+        segments = SegmentBaseline(X, segment_column, bins=histogram_bins) if segment_column else None
+
+        save_baseline(path, base_metrics, descriptors, histograms, cluster_info, corr, binary=binary, thresholds=thresholds, segments=segments, multivariate=multivariate)
+
+def save_baseline(path: str, base_metrics: dict, descriptors: dict, histograms: dict, cluster_info: mv.Cluster_statistics, corr: pd.DataFrame, binary: bool = False, thresholds: dict = None, segments: SegmentBaseline = None, multivariate: MultivariateBaseline = None) -> None:
+    """
+    Write the statistics of the original data as the JSON files of the initial report.
+    With `binary` they are also packed in a single baseline.npz, which load_baseline reads instead of the JSON files.
+    Calibrated `thresholds` are written to thresholds.json, the statistics of every segment to segments.json
+    and the baseline of the multivariate drift score to multivariate_drift.json.
+    `base_metrics` can also be a RegressionMetrics or ClassificationMetrics accumulator, whose metrics are written.
+    """
     os.makedirs(path, exist_ok=True)
+    base_metrics = get_metrics(base_metrics)
     with open(f"{path}/base_metrics.json", 'w') as f:
         json.dump(base_metrics, f, indent=4)
 
     with open(f"{path}/distribution_descriptors.json", 'w') as f:
-        json.dump(descriptors, f, indent=4)
-
-    # Plot distribution descriptors for all columns
-    uv.plot_distribution_descriptors_all_columns(X, path=path)
+        json.dump({k: v.get_json() for k, v in descriptors.items()}, f, indent=4)
 
-    if number_of_output_classes is not None:
-        cluster_info = mv.get_cluster_defined_number(X, number_of_output_classes, path=path)
-    else:
-        cluster_info = mv.get_best_clusters(X, path=path)
+    with open(f"{path}/histograms.json", 'w') as f:
+        json.dump({k: v.get_json() for k, v in histograms.items()}, f, indent=4)
 
     with open(f"{path}/kmeans_clusters.json", 'w+') as f:
         json.dump(cluster_info.get_json(), f, indent=4)
 
-    corr = mv.correlation_matrix(df, path=path)
     with open(f"{path}/correlation_matrix.json", 'w+') as f:
         json.dump(corr.to_dict(), f, indent=4)
 
-def create_report(original_df: pd.DataFrame, original_clusters: mv.Cluster_statistics, degraded_dfs: list[pd.DataFrame], base_metrics: dict, path: str, new_metrics: list[dict] = None) -> None:
+    if thresholds is not None:
+        with open(f"{path}/thresholds.json", 'w') as f:
+            json.dump(thresholds, f, indent=4)
+
+    if segments is not None:
+        with open(f"{path}/segments.json", 'w') as f:
+            json.dump(segments.get_json(), f)
+
+    if multivariate is not None:
+        with open(f"{path}/multivariate_drift.json", 'w') as f:
+            json.dump(multivariate.get_json(), f)
+
+    if binary:
+        np.savez(f"{path}/baseline.npz", **get_baseline_arrays({
+            "base_metrics": base_metrics,
+            "descriptors": descriptors,
+            "histograms": histograms,
+            "clusters": cluster_info,
+            "correlation": corr,
+            "thresholds": thresholds,
+            "segments": segments,
+            "multivariate_drift": multivariate
+        }))
+
+def _get_segment_arrays(segments: SegmentBaseline) -> dict[str, np.ndarray]:
+    """
+    Pack a SegmentBaseline in numpy arrays: the numeric descriptors of every segment and column as the rows of one matrix,
+    and its histograms concatenated, with the number of bins of each one. Only the categorical descriptors stay in JSON.
+    """
+    names = list(segments.descriptors)
+    columns = list(next(iter(segments.descriptors.values()), {}))
+    numeric = [(i, column) for i, segment in enumerate(names) for column, d in segments.descriptors[segment].items()
+               if isinstance(d, uv.DistributionDescriptors)]
+    categorical = {str(segment): {column: d.get_json() for column, d in segments.descriptors[segment].items()
+                                  if not isinstance(d, uv.DistributionDescriptors)} for segment in names}
+    histograms = [(names.index(segment), column, h) for segment, hs in segments.histograms.items() for column, h in hs.items()]
+    return {
+        "segment_column": np.array(str(segments.segment_column)),
+        "segment_names": np.array([str(segment) for segment in names], dtype=str),
+        "segment_columns": np.array(columns, dtype=str),
+        "segment_descriptor_keys": np.array([i for i, _ in numeric], dtype=np.int64),
+        "segment_descriptor_columns": np.array([column for _, column in numeric], dtype=str),
+        "segment_descriptors": np.array([[getattr(segments.descriptors[names[i]][column], name) for name in _DESCRIPTOR_FIELDS] for i, column in numeric], dtype=float).reshape(len(numeric), len(_DESCRIPTOR_FIELDS)),
+        "segment_categorical": np.array(json.dumps(categorical)),
+        "segment_histogram_keys": np.array([i for i, _, _ in histograms], dtype=np.int64),
+        "segment_histogram_columns": np.array([column for _, column, _ in histograms], dtype=str),
+        "segment_histogram_bins": np.array([len(h.counts) for _, _, h in histograms], dtype=np.int64),
+        "segment_histogram_edges": np.concatenate([h.edges for _, _, h in histograms]) if histograms else np.empty(0),
+        "segment_histogram_counts": np.concatenate([h.counts for _, _, h in histograms]) if histograms else np.empty(0, dtype=np.int64),
+    }
+
+def _get_segments_from_arrays(data) -> SegmentBaseline:
+    """
+    Unpack the arrays of _get_segment_arrays into a SegmentBaseline, whose histograms keep reading slices of the arrays.
+    """
+    names = data["segment_names"].tolist()
+    categorical = json.loads(data["segment_categorical"].item())
+    numeric = {segment: dict() for segment in names}
+    for i, column, values in zip(data["segment_descriptor_keys"].tolist(), data["segment_descriptor_columns"].tolist(), data["segment_descriptors"]):
+        numeric[names[i]][column] = dict(zip(_DESCRIPTOR_FIELDS, values.tolist()))
+    descriptors = {
+        segment: {column: numeric[segment].get(column, categorical[segment].get(column)) for column in data["segment_columns"].tolist()}
+        for segment in names
+    }
+    segments = SegmentBaseline(json_data={"segment_column": data["segment_column"].item(), "descriptors": descriptors, "histograms": {}})
+
+    segments.histograms = {segment: dict() for segment in names}
+    edges, counts = data["segment_histogram_edges"], data["segment_histogram_counts"]
+    edge_offset = count_offset = 0
+    for i, column, bins in zip(data["segment_histogram_keys"].tolist(), data["segment_histogram_columns"].tolist(), data["segment_histogram_bins"].tolist()):
+        # The counts have an underflow and an overflow bin around the bins between the edges
+        n_edges = bins - 1
+        segments.histograms[names[i]][column] = Histogram(json_data={
+            "edges": edges[edge_offset:edge_offset + n_edges], "counts": counts[count_offset:count_offset + bins]
+        })
+        edge_offset += n_edges
+        count_offset += bins
+    return segments
+
+def get_baseline_arrays(baseline: dict) -> dict[str, np.ndarray]:
+    """
+    Pack a baseline, as returned by load_baseline, in numpy arrays: the descriptors, histograms, centroids, correlation
+    matrix and the segment and multivariate baselines as numeric arrays, and only the categorical descriptors, clusters,
+    metrics and thresholds as JSON strings. get_baseline_from_arrays unpacks them.
+    """
+    descriptors = baseline["descriptors"]
+    histograms = baseline["histograms"]
+    corr = baseline["correlation"]
+    clusters = baseline["clusters"].get_json()
+    numeric = [k for k, v in descriptors.items() if isinstance(v, uv.DistributionDescriptors)]
+    categorical = {k: v.get_json() for k, v in descriptors.items() if not isinstance(v, uv.DistributionDescriptors)}
+    arrays = {
+        "numeric_columns": np.array(numeric, dtype=str),
+        "descriptors": np.array([[getattr(descriptors[k], name) for name in _DESCRIPTOR_FIELDS] for k in numeric], dtype=float).reshape(len(numeric), len(_DESCRIPTOR_FIELDS)),
+        "histogram_columns": np.array(list(histograms), dtype=str),
+        "correlation_columns": np.array([str(c) for c in corr.columns], dtype=str),
+        "correlation": corr.to_numpy(dtype=float),
+        "centroids": np.array(clusters.pop("centroids"), dtype=float),
+        "categorical": np.array(json.dumps(categorical)),
+        "clusters": np.array(json.dumps(clusters)),
+        "base_metrics": np.array(json.dumps(baseline["base_metrics"])),
+        "thresholds": np.array(json.dumps(baseline["thresholds"] or {})),
+    }
+    if baseline.get("segments") is not None:
+        arrays.update(_get_segment_arrays(baseline["segments"]))
+    if baseline.get("multivariate_drift") is not None:
+        multivariate = baseline["multivariate_drift"].get_arrays()
+        feature_map = multivariate.pop("feature_map")
+        arrays.update({f"multivariate_{key}": value for key, value in multivariate.items()})
+        arrays.update({f"multivariate_feature_map_{key}": value for key, value in feature_map.items()})
+    for i, histogram in enumerate(histograms.values()):
+        arrays[f"histogram_edges_{i}"] = histogram.edges
+        arrays[f"histogram_counts_{i}"] = histogram.counts
+
+    return arrays
+
+def get_baseline_from_arrays(data) -> dict:
+    """
+    Unpack the arrays of get_baseline_arrays, or of a baseline.npz, into a baseline as returned by load_baseline.
+    The histograms, centroids, correlation matrix and multivariate baseline keep reading the arrays without copying them.
+    """
+    descriptors = {
+        column: uv.DistributionDescriptors(json_data=dict(zip(_DESCRIPTOR_FIELDS, values.tolist())))
+        for column, values in zip(data["numeric_columns"].tolist(), data["descriptors"])
+    }
+    descriptors.update(uv.get_distribution_descriptors_from_json(json.loads(data["categorical"].item())))
+    histograms = {
+        column: Histogram(json_data={"edges": data[f"histogram_edges_{i}"], "counts": data[f"histogram_counts_{i}"]})
+        for i, column in enumerate(data["histogram_columns"].tolist())
+    }
+    clusters = mv.get_cluster_info_from_json(json.loads(data["clusters"].item()))
+    # Older baseline.npz files keep the centroids in the JSON of the clusters
+    if "centroids" in data:
+        clusters.centroids = list(data["centroids"])
+    columns = data["correlation_columns"].tolist()
+
+    segments = None
+    if "segment_names" in data:
+        segments = _get_segments_from_arrays(data)
+    elif "segments" in data:
+        # Older baseline.npz files keep the segment baseline as JSON
+        segments = SegmentBaseline(json_data=json.loads(data["segments"].item()))
+    multivariate = None
+    if "multivariate_mean" in data:
+        multivariate = {key[len("multivariate_"):]: data[key] for key in data if key.startswith("multivariate_") and "feature_map" not in key}
+        multivariate["feature_map"] = {key[len("multivariate_feature_map_"):]: data[key] for key in data if key.startswith("multivariate_feature_map_")}
+        multivariate = MultivariateBaseline(json_data=multivariate)
+    elif "multivariate_drift" in data:
+        multivariate = MultivariateBaseline(json_data=json.loads(data["multivariate_drift"].item()))
+    return {
+        "base_metrics": json.loads(data["base_metrics"].item()),
+        "descriptors": descriptors,
+        "histograms": histograms,
+        "clusters": clusters,
+        "correlation": pd.DataFrame(data["correlation"], index=columns, columns=columns),
+        "thresholds": json.loads(data["thresholds"].item()) if "thresholds" in data else {},
+        "segments": segments,
+        "multivariate_drift": multivariate,
+    }
+
+def load_baseline(path: str) -> dict:
+    """
+    Load the statistics written by create_initial_report, from baseline.npz when present and otherwise from the JSON files.
+    Returns a dictionary with the base_metrics, descriptors, histograms, clusters, correlation, calibrated thresholds
+    (empty when not calibrated), SegmentBaseline (None without segments) and MultivariateBaseline (None in older baselines)
+    of the original data.
+    """
+    if os.path.exists(f"{path}/baseline.npz"):
+        with np.load(f"{path}/baseline.npz", allow_pickle=False) as data:
+            return get_baseline_from_arrays(data)
+
+    def read(name):
+        with open(f"{path}/{name}", 'r') as f:
+            return json.load(f)
+
+    histograms = read("histograms.json") if os.path.exists(f"{path}/histograms.json") else {}
+    return {
+        "base_metrics": read("base_metrics.json"),
+        "descriptors": uv.get_distribution_descriptors_from_json(read("distribution_descriptors.json")),
+        "histograms": uv.get_histograms_from_json(histograms),
+        "clusters": mv.get_cluster_info_from_json(read("kmeans_clusters.json")),
+        "correlation": pd.DataFrame(read("correlation_matrix.json")),
+        "thresholds": read("thresholds.json") if os.path.exists(f"{path}/thresholds.json") else {},
+        "segments": SegmentBaseline(json_data=read("segments.json")) if os.path.exists(f"{path}/segments.json") else None,
+        "multivariate_drift": MultivariateBaseline(json_data=read("multivariate_drift.json")) if os.path.exists(f"{path}/multivariate_drift.json") else None,
+    }
+
+def create_report(original_df: pd.DataFrame, original_clusters: mv.Cluster_statistics, degraded_dfs: list[pd.DataFrame], base_metrics: dict, path: str, new_metrics: list[dict] = None, plot_sample_size: int = None, seed: int = DEFAULT_SEED, profile: bool = False, plot: bool = True, segment_column: str = None, multivariate_baseline: MultivariateBaseline = None, permutation_workers: int = 1, output_format: str = "files", multivariate_drift: bool = False) -> dict:
     """
     Create a report comparing the original and degraded DataFrames.
+    Returns the distribution and cluster comparisons of every degraded DataFrame, as written to the JSON files,
+    and the attribution of its rows to the nearest original centroid with the rows outside every original cluster.
+    When `plot_sample_size` is given the comparison plots only draw a sample of that many rows.
+    When `profile` is True the time and peak memory of every stage are written to timings.json.
+    When `plot` is False only the JSON comparisons are written, without any figure.
+    The DataFrames can also be Polars DataFrames or Arrow tables, compared on the statistics of their own backend.
+    With `segment_column` every segment of the degraded DataFrames is also compared against the same segment
+    of the original one, in segment_comparison_{i}.json.
+    With `multivariate_drift`, or a `multivariate_baseline`, the numeric columns of every degraded DataFrame get a multivariate
+    drift score, Mahalanobis distance and random-feature MMD, against `multivariate_baseline` (fitted on the original DataFrame
+    when not given), with its permutations run in `permutation_workers` processes, in clusters/multivariate_drift_{i}.json.
+    Every artifact is written by a background thread. With `output_format` "jsonl" the JSON results and tables are appended
+    to a single report.jsonl and the figures to figures.zip, with "html" the figures go to a self-contained report.html instead.
+    `base_metrics` and every entry of `new_metrics` can be a dict of metrics or a RegressionMetrics or ClassificationMetrics
+    accumulator updated from the chunks of predictions of its batch.
     """
-    for i, degraded_df in enumerate(degraded_dfs):
-        degraded_path = f"{path}/degraded_{i}"
-        distribution_comparison = uv.compare_distribbutions_all_columns(original_df, degraded_df, path=degraded_path)
-        with open(f"{degraded_path}/distribution_comparison_{i}.json", 'w') as f:
-            json.dump(distribution_comparison, f, indent=4)
-
-    evolution_path = f"{path}/evolution"
-    uv.descriptor_evolution_all_columns(degraded_dfs, path=evolution_path)
-
-    cluster_path = f"{path}/clusters"
-    os.makedirs(cluster_path, exist_ok=True)
-    degraded_clusters = [mv.get_cluster_defined_number(df, original_clusters.num_clusters, plot=False) for df in degraded_dfs]
-    for i, degraded_cluster in enumerate(degraded_clusters):
-        cluster_comparison = mv.compare_clusters(original_clusters, degraded_cluster)
-        with open(f"{cluster_path}/cluster_comparison_{i}.json", 'w') as f:
-            json.dump(cluster_comparison.get_json(), f, indent=4)
-
-    mv.clustering_evolution(degraded_dfs, original_clusters.num_clusters, path=evolution_path)
-    if new_metrics:
-        metric_names, metric_values = zip(*[(k, v) for k, v in base_metrics.items()])
-        
-        metrics_evolution = []
-        for i, metric_name in enumerate(metric_names):
-            metrics_evolution.append((metric_values[i], [degraded_metric[metric_name] for degraded_metric in new_metrics]))
-
-        plt.figure(figsize=(10, 6))
-        for i, (metric_name, metric_values) in enumerate(metrics_evolution):
-            plt.plot(range(len(metric_values)), metric_values, label=metric_name)
-        plt.xlabel('Degraded DataFrame Index')
-        plt.ylabel('Metric Value')
-        plt.title('Evolution of Metrics Across Degraded DataFrames')
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout(pad=2.0)
-
-        if path:
-            os.makedirs(path, exist_ok=True)
-            plt.savefig(f"{path}/metrics_evolution.png")
-            plt.close()
-        else:
-            plt.show()
\ No newline at end of file
+    writer = artifacts.ArtifactWriter(path, output_format)
+    with _report_profiling("report.create_report", path, profile), artifacts.writing(writer):
+        os.makedirs(path, exist_ok=True)
+        if plot:
+            artifacts.save_json(f"{path}/plot_sampling.json", {
+                "original": get_sampling_info(len(original_df), plot_sample_size, seed),
+                "degraded": [get_sampling_info(len(df), plot_sample_size, seed) for df in degraded_dfs]
+            })
+
+        distribution_comparisons = []
+        with prof.span("report.distribution_comparison"):
+            for i, degraded_df in enumerate(degraded_dfs):
+                degraded_path = f"{path}/degraded_{i}"
+                distribution_comparison = uv.compare_distribbutions_all_columns(original_df, degraded_df, path=degraded_path, sample_size=plot_sample_size, seed=seed, plot=plot)
+                artifacts.save_json(f"{degraded_path}/distribution_comparison_{i}.json", distribution_comparison)
+                distribution_comparisons.append(distribution_comparison)
+
+        segment_comparisons = []
+        if segment_column:
+            with prof.span("report.segment_comparison"):
+                # The segments of the original data are described once for every batch
+                segment_baseline = SegmentBaseline(original_df, segment_column)
+                for i, degraded_df in enumerate(degraded_dfs):
+                    segment_comparison = segment_baseline.compare(degraded_df)
+                    artifacts.save_json(f"{path}/degraded_{i}/segment_comparison_{i}.json", segment_comparison)
+                    segment_comparisons.append(segment_comparison)
+
+        evolution_path = f"{path}/evolution"
+        with prof.span("report.descriptor_evolution"):
+            uv.descriptor_evolution_all_columns(degraded_dfs, path=evolution_path, plot=plot)
+
+        cluster_path = f"{path}/clusters"
+        cluster_comparisons = []
+        with prof.span("report.cluster_comparison"):
+            projection, scaler = original_clusters.projection, original_clusters.scaler
+            degraded_clusters = [
+                mv.get_cluster_defined_number(mv.select_numeric_columns(df), original_clusters.num_clusters, plot=False, projection=projection, scaler=scaler,
+                                              radius_definition=original_clusters.radius_definition)
+                for df in degraded_dfs
+            ]
+            for i, (degraded_df, degraded_cluster) in enumerate(zip(degraded_dfs, degraded_clusters)):
+                cluster_comparison = mv.compare_clusters(original_clusters, degraded_cluster).get_json()
+                if projection is not None:
+                    X_numeric = mv.select_numeric_columns(degraded_df)
+                    cluster_comparison["explained_variance"] = {
+                        "original": sum(projection.explained_variance_ratio),
+                        "new_data": projection.explained_variance(scaler.transform(X_numeric) if scaler else X_numeric)
+                    }
+                artifacts.save_json(f"{cluster_path}/cluster_comparison_{i}.json", cluster_comparison)
+                cluster_comparisons.append(cluster_comparison)
+
+        multivariate_drifts = []
+        if multivariate_drift or multivariate_baseline is not None:
+            with prof.span("report.multivariate_drift"):
+                multivariate_baseline = multivariate_baseline or MultivariateBaseline(mv.select_numeric_columns(original_df), seed=seed)
+                for i, degraded_df in enumerate(degraded_dfs):
+                    drift = multivariate_baseline.compare(degraded_df, max_workers=permutation_workers, seed=seed).get_json()
+                    artifacts.save_json(f"{cluster_path}/multivariate_drift_{i}.json", drift)
+                    multivariate_drifts.append(drift)
+
+        row_attributions = []
+        with prof.span("report.row_attribution"):
+            for i, degraded_df in enumerate(degraded_dfs):
+                row_attribution = mv.attribute_rows(mv.select_numeric_columns(degraded_df), original_clusters).get_json()
+                artifacts.save_json(f"{cluster_path}/row_attribution_{i}.json", row_attribution)
+                row_attributions.append(row_attribution)
+
+        if plot:
+            with prof.span("report.clustering_evolution"):
+                mv.clustering_evolution([mv.select_numeric_columns(df) for df in degraded_dfs], original_clusters.num_clusters, path=evolution_path,
+                                        projection=original_clusters.projection, scaler=original_clusters.scaler)
+
+        # Without base metrics, as in a baseline created without them, there is no evolution to draw
+        if new_metrics and base_metrics and plot:
+            with prof.span("report.metrics_evolution"):
+                _plot_metrics_evolution(get_metrics(base_metrics), [get_metrics(metrics) for metrics in new_metrics], path)
+
+    return {
+        "distribution_comparison": distribution_comparisons,
+        "cluster_comparison": cluster_comparisons,
+        "row_attribution": row_attributions,
+        "segment_comparison": segment_comparisons,
+        "multivariate_drift": multivariate_drifts
+    }
+
+def get_drift_verdict(report: dict) -> dict:
+    """
+    Summarize the comparisons returned by create_report into the drifting columns and cluster metrics of every degraded DataFrame.
+    The cluster, segment and multivariate comparisons are optional.
+    A column drifts when any of its descriptors changed or any of its histogram drift tests fired.
+    """
+    batches = []
+    cluster_comparisons = report.get("cluster_comparison") or [{}] * len(report["distribution_comparison"])
+    segment_comparisons = report.get("segment_comparison") or [{}] * len(report["distribution_comparison"])
+    multivariate_drifts = report.get("multivariate_drift") or [{}] * len(report["distribution_comparison"])
+    for distribution_comparison, cluster_comparison, segment_comparison, multivariate_drift in zip(
+            report["distribution_comparison"], cluster_comparisons, segment_comparisons, multivariate_drifts):
+        drifted_columns = [
+            column for column, changes in distribution_comparison.items()
+            if changes.get("changed") or changes.get("drift_tests", {}).get("drifted")
+        ]
+        cluster_changes = list(cluster_comparison.get("changed", {}))
+        drifted_segments = segment_comparison.get("drifted_segments", {})
+        multivariate_tests = multivariate_drift.get("drifted", [])
+        batch = {
+            "drifted": bool(drifted_columns or cluster_changes or drifted_segments or multivariate_tests),
+            "drifted_columns": drifted_columns,
+            "cluster_changes": cluster_changes
+        }
+        if segment_comparison:
+            batch["drifted_segments"] = drifted_segments
+        if multivariate_drift:
+            batch["multivariate_drift"] = multivariate_tests
+        batches.append(batch)
+
+    return {
+        "drifted": any(batch["drifted"] for batch in batches),
+        "batches": batches
+    }
+
+def compare_batches(baseline: dict | str, batches: list, sigma: float = 1.0, delta: float = 0.1) -> LazyComparison:
+    """
+    Returns the lazy comparison of the batches against a baseline, a dictionary as returned by load_baseline or the path
+    it is loaded from. Unlike create_report nothing is computed, plotted or written up front: the changes of a column,
+    the clustering of a batch and the evolution of a column are computed when accessed and memoized, and queries
+    such as `first_drifting_batch()` or `[17].first_drifting_column()` stop at the first drift found.
+    """
+    if isinstance(baseline, str):
+        baseline = load_baseline(baseline)
+    return LazyComparison(baseline, batches, sigma=sigma, delta=delta)
+
+def _plot_metrics_evolution(base_metrics: dict, new_metrics: list[dict], path: str):
+    """
+    Plot the evolution of the model metrics across the degraded DataFrames.
+    """
+    metric_names, metric_values = zip(*[(k, v) for k, v in base_metrics.items()])
+    
+    metrics_evolution = []
+    for i, metric_name in enumerate(metric_names):
+        metrics_evolution.append((metric_values[i], [degraded_metric[metric_name] for degraded_metric in new_metrics]))
+
+    plt.figure(figsize=(10, 6))
+    for i, (metric_name, metric_values) in enumerate(metrics_evolution):
+        plt.plot(range(len(metric_values)), metric_values, label=metric_name)
+    plt.xlabel('Degraded DataFrame Index')
+    plt.ylabel('Metric Value')
+    plt.title('Evolution of Metrics Across Degraded DataFrames')
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout(pad=2.0)
+
+    if path:
+        with prof.span("report.savefig"):
+            save_figure(f"{path}/metrics_evolution.png")
+    else:
+        plt.show()
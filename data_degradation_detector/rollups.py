@@ -0,0 +1,280 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from . import backends
+from . import univariate as uv
+from .histograms import Histogram, get_edges
+from .streaming import ColumnMoments, QualityCounters, QuantileSketch
+
+# Period frequencies of the windows, from the finest to the coarsest
+GRANULARITIES = {"hour": "h", "day": "D", "week": "W", "month": "M"}
+# Windows every granularity is merged from, weeks do not nest into months
+_PARENTS = {"day": "hour", "week": "day", "month": "day"}
+
+class ColumnState:
+    """
+    A class to represent the mergeable state behind the DistributionDescriptors of a numeric variable:
+    its moments, minimum and maximum, a quantile sketch, a fixed-edge histogram and its data quality counters.
+    """
+
+    def __init__(self, values: np.ndarray=None, edges: np.ndarray=None, sketch_size: int = 128, quality: QualityCounters=None, json_data: dict=None):
+        """
+        Initializes the ColumnState from an array of finite values binned over `edges`, empty, or from a JSON representation.
+        The `quality` counters of the rows the values come from default to those of the values alone.
+        """
+        if json_data is not None:
+            self.moments = ColumnMoments(json_data=json_data['moments'])
+            self.sketch = QuantileSketch(json_data=json_data['sketch'])
+            self.histogram = Histogram(json_data=json_data['histogram']) if json_data['histogram'] is not None else None
+            # States saved before the quality counters were kept do not know them
+            self.quality = QualityCounters(json_data=json_data['quality']) if json_data.get('quality') is not None else None
+        else:
+            self.moments = ColumnMoments()
+            self.sketch = QuantileSketch(sketch_size)
+            self.histogram = None
+            self.quality = quality if quality is not None else QualityCounters()
+            if values is not None:
+                if quality is None:
+                    self.quality.update(values, len(values), 0, 0)
+                self.moments.update(values)
+                self.sketch.update(values)
+                self.histogram = Histogram(values, edges=edges)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the ColumnState.
+        """
+        return f"ColumnState(moments={self.moments}, sketch={self.sketch}, histogram={self.histogram}, quality={self.quality})"
+
+    def merge(self, other: "ColumnState"):
+        """
+        Adds the state of the same variable over other rows, in O(sketch size + bins).
+        """
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        if other.histogram is not None:
+            self.histogram = other.histogram if self.histogram is None else self.histogram.merge(other.histogram)
+        if self.quality is not None:
+            self.quality = self.quality.merge(other.quality) if other.quality is not None else None
+
+        return self
+
+    def get_descriptors(self) -> uv.DistributionDescriptors:
+        """
+        Returns the DistributionDescriptors of the merged rows, with the quartiles of the sketch.
+        """
+        counts = self.quality.get_counts() if self.quality is not None else {}
+        if self.moments.count == 0:
+            return uv.DistributionDescriptors(json_data={**{stat: float('nan') for stat in ["mean", "std", "min_val", "max_val", "q1", "q2", "q3"]}, **counts})
+
+        q1, q2, q3 = self.sketch.quantile([0.25, 0.5, 0.75])
+        return uv.DistributionDescriptors(json_data={
+            "mean": self.moments.mean,
+            "std": self.moments.std,
+            "min_val": self.moments.min_val,
+            "max_val": self.moments.max_val,
+            "q1": float(q1),
+            "q2": float(q2),
+            "q3": float(q3),
+            **counts
+        })
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the ColumnState.
+        """
+        return {
+            "moments": self.moments.get_json(),
+            "sketch": self.sketch.get_json(),
+            "histogram": self.histogram.get_json() if self.histogram is not None else None,
+            "quality": self.quality.get_json() if self.quality is not None else None
+        }
+
+def get_column_states(df: pd.DataFrame, edges: dict[str, np.ndarray] = None, bins: int = 20, sketch_size: int = 128) -> dict[str, ColumnState]:
+    """
+    Computes the state of every numeric column of a batch, binned over the given edges or,
+    for the columns without edges, over `bins` equal-width bins of the batch.
+    """
+    edges = edges or {}
+    states = dict()
+    native = backends.is_native(df)
+    for column_name in backends.column_names(df):
+        categorical = backends.is_categorical(df, column_name) if native else uv.is_categorical(df[column_name])
+        if categorical:
+            continue
+        values, null_count, inf_count = backends.finite_values(df, column_name)
+        quality = QualityCounters().update(values, len(values) + null_count + inf_count, null_count, inf_count)
+        if len(values) == 0 and column_name not in edges:
+            # Edges are only learned from values
+            states[column_name] = ColumnState(sketch_size=sketch_size, quality=quality)
+            continue
+        column_edges = edges[column_name] if column_name in edges else get_edges(values, bins)
+        states[column_name] = ColumnState(values, edges=column_edges, sketch_size=sketch_size, quality=quality)
+
+    return states
+
+def merge_states(states: list[dict[str, ColumnState]]) -> dict[str, ColumnState]:
+    """
+    Returns new states merging those of every column over a list of batches, without modifying them.
+    """
+    merged = dict()
+    for batch_states in states:
+        for column_name, state in batch_states.items():
+            merged.setdefault(column_name, ColumnState(sketch_size=state.sketch.size)).merge(state)
+
+    return merged
+
+def get_window(timestamp, granularity: str) -> str:
+    """
+    Returns the label of the window of a granularity holding a timestamp, such as '2024-05-01 13:00' for an hour.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    return str(pd.Period(pd.Timestamp(timestamp), GRANULARITIES[granularity]))
+
+class RollupStore:
+    """
+    A class to keep the column states of batches per time window, at the granularity of the batches and rolled up
+    to coarser ones. Coarser windows are merged from the stored states of finer ones, never from the data again,
+    and the histograms of every column share the edges of its first batch so they can be merged.
+    """
+
+    def __init__(self, granularity: str = "hour", edges: dict[str, np.ndarray] = None, bins: int = 20, sketch_size: int = 128, json_data: dict=None):
+        """
+        Initializes an empty RollupStore for batches of a granularity, with the histogram edges of a baseline when given,
+        or restores it from a JSON representation.
+        """
+        if json_data is not None:
+            self.granularity = json_data['granularity']
+            self.bins = json_data['bins']
+            self.sketch_size = json_data['sketch_size']
+            self.edges = {column: np.asarray(column_edges, dtype=float) for column, column_edges in json_data['edges'].items()}
+            self.windows = {
+                granularity: {window: {column: ColumnState(json_data=state) for column, state in states.items()} for window, states in windows.items()}
+                for granularity, windows in json_data['windows'].items()
+            }
+        else:
+            if granularity not in GRANULARITIES:
+                raise ValueError(f"Unknown granularity: {granularity}")
+            self.granularity = granularity
+            self.bins = bins
+            self.sketch_size = sketch_size
+            self.edges = {column: np.asarray(column_edges, dtype=float) for column, column_edges in (edges or {}).items()}
+            self.windows = {granularity: dict()}
+
+    def __repr__(self):
+        """
+        Returns a string representation of the RollupStore.
+        """
+        return f"RollupStore(granularity={self.granularity}, windows={ {granularity: len(windows) for granularity, windows in self.windows.items()} })"
+
+    def add(self, df: pd.DataFrame, timestamp) -> str:
+        """
+        Adds the states of a batch to the window of its timestamp, merging them with those of the batches already
+        in that window, and to the windows of every granularity already rolled up. Returns the label of the window.
+        """
+        states = get_column_states(df, self.edges, bins=self.bins, sketch_size=self.sketch_size)
+        for column_name, state in states.items():
+            if state.histogram is not None:
+                self.edges.setdefault(column_name, state.histogram.edges)
+
+        for granularity, windows in self.windows.items():
+            window = get_window(timestamp, granularity)
+            windows[window] = merge_states([windows.get(window, {}), states])
+
+        return get_window(timestamp, self.granularity)
+
+    def roll_up(self, granularity: str) -> dict[str, dict[str, ColumnState]]:
+        """
+        Merges the windows of a coarser granularity from those of the finer granularity it is made of, rolling that one up first.
+        Returns the states of every window, kept up to date by later batches.
+        """
+        if granularity in self.windows:
+            return self.windows[granularity]
+
+        order = list(GRANULARITIES)
+        if order.index(granularity) < order.index(self.granularity) or (self.granularity == "week" and granularity == "month"):
+            raise ValueError(f"Windows of a {self.granularity} cannot be rolled up to a {granularity}.")
+
+        parent = _PARENTS[granularity]
+        if order.index(parent) < order.index(self.granularity):
+            parent = self.granularity
+        parent_windows = self.roll_up(parent)
+
+        children = dict()
+        for window in parent_windows:
+            start = pd.Period(window, GRANULARITIES[parent]).start_time
+            children.setdefault(get_window(start, granularity), []).append(parent_windows[window])
+
+        self.windows[granularity] = {window: merge_states(children[window]) for window in sorted(children)}
+        return self.windows[granularity]
+
+    def get_descriptors(self, granularity: str = None) -> dict[str, dict[str, uv.DistributionDescriptors]]:
+        """
+        Returns the DistributionDescriptors of every column of every window of a granularity, that of the batches by default.
+        """
+        windows = self.roll_up(granularity or self.granularity)
+        return {window: {column: state.get_descriptors() for column, state in states.items()} for window, states in windows.items()}
+
+    def get_descriptor_evolution(self, granularity: str = None) -> pd.DataFrame:
+        """
+        Returns the evolution of the descriptors over the windows of a granularity as the long table of
+        univariate.get_descriptor_evolution, one batch per window in time order, with the label of the window.
+        """
+        windows = self.roll_up(granularity or self.granularity)
+        rows = []
+        for batch, window in enumerate(sorted(windows)):
+            for column, state in windows[window].items():
+                descriptors = state.get_descriptors().get_json()
+                rows.append({"batch": batch, "window": window, "column": column, "count": state.moments.count,
+                             **{stat: descriptors[stat] for stat in uv.EVOLUTION_STATS if stat != "count"}})
+
+        table = pd.DataFrame(rows, columns=["batch", "window", "column"] + uv.EVOLUTION_STATS)
+        table["count"] = table["count"].astype(np.int64)
+        return table
+
+    def plot_descriptor_evolution(self, granularity: str = None, path: str = None) -> pd.DataFrame:
+        """
+        Plots the evolution of every column over the windows of a granularity and, when a path is given,
+        writes the table to descriptor_evolution.csv next to the figures. Returns the table.
+        """
+        table = self.get_descriptor_evolution(granularity)
+        if path:
+            uv.write_descriptor_evolution(table, path)
+
+        for column_name in table["column"].unique():
+            uv.plot_descriptor_evolution(table, column_name, path=path)
+
+        return table
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the RollupStore.
+        """
+        return {
+            "granularity": self.granularity,
+            "bins": self.bins,
+            "sketch_size": self.sketch_size,
+            "edges": {column: column_edges.tolist() for column, column_edges in self.edges.items()},
+            "windows": {
+                granularity: {window: {column: state.get_json() for column, state in states.items()} for window, states in windows.items()}
+                for granularity, windows in self.windows.items()
+            }
+        }
+
+def save_rollups(store: RollupStore, path: str) -> None:
+    """
+    Writes a RollupStore to `{path}/rollups.json`.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(f"{path}/rollups.json", 'w') as f:
+        json.dump(store.get_json(), f)
+
+def load_rollups(path: str) -> RollupStore:
+    """
+    Reads the RollupStore written by save_rollups.
+    """
+    with open(f"{path}/rollups.json", 'r') as f:
+        return RollupStore(json_data=json.load(f))
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 42
+
+class Reservoir:
+    """
+    Fixed-size uniform sample of rows maintained over a stream of chunks (Algorithm R).
+    """
+
+    def __init__(self, size: int, seed: int = DEFAULT_SEED):
+        """
+        Initializes an empty reservoir holding at most `size` rows.
+        """
+        if size <= 0:
+            raise ValueError("The reservoir size must be a positive integer.")
+
+        self.size = size
+        self.seed = seed
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._sample = None
+
+    def __repr__(self):
+        """
+        Returns a string representation of the Reservoir.
+        """
+        return f"Reservoir(size={self.size}, seed={self.seed}, seen={self.seen}, sampled={len(self)})"
+
+    def __len__(self):
+        return 0 if self._sample is None else len(self._sample)
+
+    def update(self, chunk: pd.DataFrame | pd.Series):
+        """
+        Offers every row of the chunk to the reservoir.
+        """
+        n = len(chunk)
+        if n == 0:
+            return self
+
+        # Fill phase: the first `size` rows of the stream are always kept
+        fill = min(max(self.size - self.seen, 0), n)
+        if fill:
+            head = chunk.iloc[:fill]
+            self._sample = head if self._sample is None else pd.concat([self._sample, head])
+
+        if fill < n:
+            # Row t (0-based position in the stream) replaces slot j ~ U[0, t] when j < size
+            positions = np.arange(self.seen + fill, self.seen + n)
+            slots = self._rng.integers(0, positions + 1)
+            accepted = np.flatnonzero(slots < self.size)
+            if accepted.size:
+                # When several rows hit the same slot only the last one survives
+                last_slots, last_idx = np.unique(slots[accepted][::-1], return_index=True)
+                rows = fill + accepted[::-1][last_idx]
+                keep = np.ones(self.size, dtype=bool)
+                keep[last_slots] = False
+                self._sample = pd.concat([self._sample.iloc[keep], chunk.iloc[rows]])
+
+        self.seen += n
+        return self
+
+    def get_sample(self) -> pd.DataFrame | pd.Series:
+        """
+        Returns the rows currently held by the reservoir.
+        """
+        return self._sample
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the sampling parameters.
+        """
+        return {
+            "sample_size": len(self),
+            "requested_size": self.size,
+            "seed": self.seed,
+            "rows": self.seen
+        }
+
+def sample_indices(n: int, size: int = None, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    Returns the sorted positions of a uniform sample of `size` out of `n` rows.
+    All rows are returned when `size` is None or not smaller than `n`.
+    """
+    if size is None or size >= n:
+        return np.arange(n)
+
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n, size=size, replace=False))
+
+def stratified_sample_indices(labels, size: int = None, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """
+    Returns the sorted positions of a sample of `size` rows stratified by label.
+    Every label keeps its share of the rows and at least one row.
+    """
+    labels = np.asarray(labels)
+    n = len(labels)
+    if size is None or size >= n:
+        return np.arange(n)
+
+    _, codes, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    quotas = size * counts / n
+    allocation = np.minimum(np.maximum(np.floor(quotas).astype(int), 1), counts)
+
+    # Hand out the rows left by the rounding to the largest remainders
+    remaining = size - allocation.sum()
+    if remaining > 0:
+        for label in np.argsort(allocation - quotas):
+            if remaining == 0:
+                break
+            if allocation[label] < counts[label]:
+                allocation[label] += 1
+                remaining -= 1
+
+    rng = np.random.default_rng(seed)
+    order = np.argsort(codes, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    selected = [
+        order[start + rng.choice(count, size=quota, replace=False)]
+        for start, count, quota in zip(starts, counts, allocation)
+    ]
+
+    return np.sort(np.concatenate(selected))
+
+def reservoir_sample(data: pd.DataFrame | pd.Series, size: int = None, seed: int = DEFAULT_SEED) -> pd.DataFrame | pd.Series:
+    """
+    Returns a uniform sample of `size` rows of the data, keeping the original row order.
+    """
+    if size is None or size >= len(data):
+        return data
+
+    return data.iloc[sample_indices(len(data), size, seed)]
+
+def get_sampling_info(rows: int, size: int = None, seed: int = DEFAULT_SEED) -> dict:
+    """
+    Returns a JSON representation of the sample drawn for plotting from `rows` rows.
+    """
+    return {
+        "sample_size": rows if size is None else min(size, rows),
+        "requested_size": size,
+        "seed": seed,
+        "rows": rows
+    }
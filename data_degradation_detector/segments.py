@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+from . import backends
+from . import univariate as uv
+from .distinct import estimate_count, hash_values, register_ranks
+from .histograms import Histogram
+from .profiling import profiled, span
+
+# Below this many rows per segment on average, the segments are sorted at once instead of one by one
+_LOOP_SEGMENT_ROWS = 256
+
+def _group_rows(df: pd.DataFrame, segment_column: str) -> tuple[pd.DataFrame, np.ndarray, list[str], np.ndarray, np.ndarray]:
+    """
+    Returns the other columns of the rows with a segment, their segment codes, the segment names (as strings),
+    the order that sorts the rows by segment and the bounds of every segment in that order.
+    """
+    if backends.is_native(df):
+        df = backends.to_pandas(df)
+
+    codes, segments = pd.factorize(df[segment_column], sort=True)
+    X = df.drop(columns=[segment_column])
+    # Rows without a segment are left out
+    if (codes < 0).any():
+        X, codes = X[codes >= 0], codes[codes >= 0]
+
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(segments)))])
+
+    return X, codes, [str(segment) for segment in segments], order, bounds
+
+def _numeric_columns(X: pd.DataFrame) -> list[str]:
+    """
+    Returns the columns of X described by DistributionDescriptors.
+    """
+    return [column for column in X.columns if not uv.is_categorical(X[column])]
+
+def _extreme_values(values: pd.Series) -> list:
+    """
+    Returns the minimum or maximum of every segment as Python numbers, NaN for segments without values.
+    """
+    return [float('nan') if pd.isna(value) else value for value in values.tolist()]
+
+def _segment_counters(values: np.ndarray, codes: np.ndarray, segments: int, precision: int = 12) -> dict[str, np.ndarray]:
+    """
+    Returns the number of missing values, infinities, zeros and distinct finite values of every (segment, column),
+    as arrays of shape (segments, columns). The distinct values are counted by one HyperLogLog per segment,
+    updated for all the segments of a column at once.
+    """
+    counters = {counter: np.zeros((segments, values.shape[1]), dtype=np.int64) for counter in ["null_count", "inf_count", "zero_count", "distinct_count"]}
+    for j in range(values.shape[1]):
+        column = values[:, j]
+        finite = np.isfinite(column)
+        counters["null_count"][:, j] = np.bincount(codes, weights=np.isnan(column), minlength=segments)
+        counters["inf_count"][:, j] = np.bincount(codes, weights=np.isinf(column), minlength=segments)
+        counters["zero_count"][:, j] = np.bincount(codes, weights=column == 0, minlength=segments)
+
+        registers = np.zeros((segments, 2 ** precision), dtype=np.uint8)
+        positions, ranks = register_ranks(hash_values(column[finite]), precision)
+        np.maximum.at(registers, (codes[finite], positions), ranks)
+        counters["distinct_count"][:, j] = [estimate_count(segment_registers) for segment_registers in registers]
+
+    return counters
+
+@profiled("segments.get_segment_descriptors")
+def get_segment_descriptors(df: pd.DataFrame, segment_column: str, max_categories: int = 50) -> dict[str, dict]:
+    """
+    Returns the descriptors of every column for every segment of `segment_column`, as
+    {segment: {column: DistributionDescriptors or CategoricalDescriptors}}.
+
+    The moments of every (segment, column) come from one grouped aggregation over all the numeric columns and
+    the quartiles from one sort of the rows of every segment, so the cost grows with the rows, not the segments.
+    Polars DataFrames and Arrow tables are converted to pandas first.
+    """
+    X, codes, segments, order, bounds = _group_rows(df, segment_column)
+    numeric = _numeric_columns(X)
+    result = {segment: dict() for segment in segments}
+
+    if numeric:
+        values = X[numeric].to_numpy(dtype=float, na_value=np.nan)
+        with span("segments.counters"):
+            counters = _segment_counters(values, codes, len(segments))
+        frame = X[numeric]
+        # The descriptors are computed on the finite values
+        if counters["inf_count"].any():
+            frame = frame.replace([np.inf, -np.inf], np.nan)
+            values = np.where(np.isinf(values), np.nan, values)
+
+        grouped = frame.groupby(codes)
+        with span("segments.reduce"):
+            mean, std = grouped.mean().to_numpy(dtype=float).tolist(), grouped.std().to_numpy(dtype=float).tolist()
+            # Minimum and maximum keep the type of their column, as in DistributionDescriptors
+            minimum = {column: _extreme_values(values) for column, values in grouped.min().items()}
+            maximum = {column: _extreme_values(values) for column, values in grouped.max().items()}
+            quartiles = _segment_quantiles(values[order], codes[order], bounds, [0.25, 0.5, 0.75]).tolist()
+
+        rows = np.diff(bounds).tolist()
+        for i, segment in enumerate(segments):
+            for j, column in enumerate(numeric):
+                q1, q2, q3 = quartiles[i][j]
+                result[segment][column] = uv.DistributionDescriptors(json_data={
+                    "mean": mean[i][j],
+                    "std": std[i][j],
+                    "min_val": minimum[column][i],
+                    "max_val": maximum[column][i],
+                    "q1": q1,
+                    "q2": q2,
+                    "q3": q3,
+                    "count": rows[i],
+                    **{counter: int(counts[i, j]) for counter, counts in counters.items()}
+                })
+
+    for column in X.columns:
+        if column in numeric:
+            continue
+        with span("segments.frequencies"):
+            counts = X[column].groupby(codes).value_counts()
+        tables = {code: segment_counts.droplevel(0) for code, segment_counts in counts.groupby(level=0)}
+        for code, segment in enumerate(segments):
+            segment_counts = tables.get(code, pd.Series(dtype=np.int64))
+            result[segment][column] = uv.CategoricalDescriptors(json_data=uv.get_frequency_table(segment_counts, max_categories))
+
+    # Keep the order of the columns of the DataFrame
+    return {segment: {column: columns[column] for column in X.columns} for segment, columns in result.items()}
+
+@profiled("segments.get_segment_histograms")
+def get_segment_histograms(df: pd.DataFrame, segment_column: str, bins: int = 20, edges: dict[str, dict[str, np.ndarray]] = None) -> dict[str, dict[str, Histogram]]:
+    """
+    Returns the histograms of the numeric columns for every segment, as {segment: {column: Histogram}}, over the
+    given {segment: {column: edges}} or `bins` equal-width bins of the range of the column in the segment.
+    With edges only the segments and columns they have are binned. Every column is binned for all the segments
+    at once, so the cost does not grow with the number of segments.
+    """
+    X, codes, segments, order, bounds = _group_rows(df, segment_column)
+    numeric = _numeric_columns(X)
+    group = codes[order]
+
+    result = {segment: dict() for segment in segments if edges is None or segment in edges}
+    for column in numeric:
+        values = X[column].to_numpy(dtype=float, na_value=np.nan)[order]
+        if edges is None:
+            column_edges = list(_segment_edges(values, bounds, bins))
+        else:
+            column_edges = [edges[segment].get(column) if segment in edges else None for segment in segments]
+
+        for segment, segment_edges, counts in zip(segments, column_edges, _segment_bin_counts(values, group, column_edges)):
+            if counts is not None:
+                result[segment][column] = Histogram(json_data={"edges": segment_edges, "counts": counts})
+
+    return result
+
+def _segment_quantiles(values: np.ndarray, group: np.ndarray, bounds: np.ndarray, quantiles: list[float]) -> np.ndarray:
+    """
+    Returns the quantiles of _batch_quantiles for rows sorted by segment. A few large segments are sorted one by one,
+    many small ones at once, by value and then stably by segment, which costs the same for any number of segments.
+    """
+    segments = len(bounds) - 1
+    if segments == 0 or len(values) >= segments * _LOOP_SEGMENT_ROWS:
+        return uv._batch_quantiles(values, bounds, quantiles)
+
+    result = np.empty((segments, values.shape[1], len(quantiles)))
+    starts = bounds[:-1]
+    for j in range(values.shape[1]):
+        # NaNs are sorted last within every segment
+        column_order = np.argsort(values[:, j])
+        column = values[column_order[np.argsort(group[column_order], kind='stable')], j]
+        counts = np.bincount(group, weights=~np.isnan(column), minlength=segments).astype(np.int64)
+        last = np.maximum(counts - 1, 0)
+        for i, q in enumerate(quantiles):
+            position = q * last
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, last)
+            fraction = position - low
+            result[:, j, i] = np.where(counts > 0, column[starts + low] * (1 - fraction) + column[starts + high] * fraction, np.nan)
+
+    return result
+
+def _segment_edges(values: np.ndarray, bounds: np.ndarray, bins: int) -> np.ndarray:
+    """
+    Returns the edges of get_edges for every segment of rows sorted by segment, as a (segments x bins + 1) array.
+    """
+    if len(bounds) == 1:
+        return np.empty((0, bins + 1))
+
+    low, high = np.fmin.reduceat(values, bounds[:-1]), np.fmax.reduceat(values, bounds[:-1])
+    # Segments without values get [0, 1] and constant ones a unit range, as in get_edges
+    empty = np.isnan(low)
+    low, high = np.where(empty, 0.0, low), np.where(empty, 1.0, high)
+    constant = low == high
+    low, high = np.where(constant, low - 0.5, low), np.where(constant, high + 0.5, high)
+
+    return np.linspace(low, high, bins + 1, axis=1)
+
+def _segment_bin_counts(values: np.ndarray, group: np.ndarray, edges: list[np.ndarray]) -> list[np.ndarray]:
+    """
+    Returns the counts of bin_counts for every segment of rows sorted by segment over the edges of that segment,
+    None for segments without edges. The edges of all the segments are searched at once as complex numbers,
+    which NumPy orders by segment (real part) and then by value (imaginary part).
+    """
+    segments = len(edges)
+    has_edges = np.array([segment_edges is not None for segment_edges in edges], dtype=bool)
+    edges = [np.asarray(segment_edges, dtype=float) if segment_edges is not None else np.empty(0) for segment_edges in edges]
+    sizes = np.array([len(segment_edges) for segment_edges in edges], dtype=np.int64)
+    edge_offsets = np.concatenate([[0], np.cumsum(sizes)])
+    count_offsets = np.concatenate([[0], np.cumsum(np.where(has_edges, sizes + 1, 0))])
+    last_edges = np.array([segment_edges[-1] if len(segment_edges) else np.nan for segment_edges in edges])
+
+    keys = np.empty(edge_offsets[-1], dtype=complex)
+    keys.real = np.repeat(np.arange(segments), sizes)
+    keys.imag = np.concatenate(edges) if segments else []
+
+    keep = ~np.isnan(values) & has_edges[group]
+    segment, value = group[keep], values[keep]
+    queries = np.empty(len(value), dtype=complex)
+    queries.real = segment
+    queries.imag = value
+
+    positions = np.searchsorted(keys, queries, side='right') - edge_offsets[segment]
+    # The maximum of the original values belongs to the last bin, not to the overflow
+    at_last = value == last_edges[segment]
+    positions[at_last] = sizes[segment[at_last]] - 1
+    counts = np.bincount(count_offsets[segment] + positions, minlength=count_offsets[-1]).astype(np.int64)
+
+    return [counts[count_offsets[i]:count_offsets[i + 1]] if has_edges[i] else None for i in range(segments)]
+
+class SegmentBaseline:
+    """
+    A class to represent the descriptors and histograms of every segment of the original data,
+    which later batches are compared against segment by segment.
+    """
+
+    def __init__(self, df: pd.DataFrame = None, segment_column: str = None, bins: int = 20, json_data: dict = None):
+        """
+        Initializes the SegmentBaseline from the original data and its segment column, or from a JSON representation.
+        """
+        if df is not None:
+            if segment_column is None:
+                raise ValueError("A segment column must be given with the original data.")
+            self.segment_column = segment_column
+            self.descriptors = get_segment_descriptors(df, segment_column)
+            self.histograms = get_segment_histograms(df, segment_column, bins=bins)
+        elif json_data is not None:
+            self.segment_column = json_data['segment_column']
+            self.descriptors = {segment: uv.get_distribution_descriptors_from_json(columns) for segment, columns in json_data['descriptors'].items()}
+            self.histograms = {segment: uv.get_histograms_from_json(columns) for segment, columns in json_data['histograms'].items()}
+        else:
+            raise ValueError("Either a DataFrame or JSON data must be provided to initialize SegmentBaseline.")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the SegmentBaseline.
+        """
+        return f"SegmentBaseline(segment_column={self.segment_column}, segments={len(self.descriptors)})"
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the SegmentBaseline.
+        """
+        return {
+            "segment_column": self.segment_column,
+            "descriptors": {segment: {column: d.get_json() for column, d in columns.items()} for segment, columns in self.descriptors.items()},
+            "histograms": {segment: {column: h.get_json() for column, h in columns.items()} for segment, columns in self.histograms.items()}
+        }
+
+    @profiled("segments.compare")
+    def compare(self, new_data: pd.DataFrame, sigma: float = 1.0, delta: float = 0.1) -> dict:
+        """
+        Compares every segment of the new data against the same segment of the original data, binning it over the
+        stored edges of that segment.
+        Returns the changes of every column keyed by segment, the segments that drifted with their drifted columns,
+        and the segments only present in the new data or only in the original data.
+        """
+        new_descriptors = get_segment_descriptors(new_data, self.segment_column)
+        new_histograms = get_segment_histograms(new_data, self.segment_column, edges={
+            segment: {column: histogram.edges for column, histogram in columns.items()} for segment, columns in self.histograms.items()
+        })
+
+        segments = dict()
+        drifted = dict()
+        for segment, original_columns in self.descriptors.items():
+            if segment not in new_descriptors:
+                continue
+            segments[segment] = {
+                column: uv.get_distribution_changes(
+                    original, new_descriptors[segment][column], sigma=sigma, delta=delta,
+                    original_histogram=self.histograms.get(segment, {}).get(column),
+                    new_histogram=new_histograms.get(segment, {}).get(column)
+                ).get_json()
+                for column, original in original_columns.items() if column in new_descriptors[segment]
+            }
+            drifted_columns = [
+                column for column, changes in segments[segment].items()
+                if changes.get("changed") or changes.get("drift_tests", {}).get("drifted")
+            ]
+            if drifted_columns:
+                drifted[segment] = drifted_columns
+
+        return {
+            "segment_column": self.segment_column,
+            "segments": segments,
+            "drifted_segments": drifted,
+            "new_segments": [segment for segment in new_descriptors if segment not in self.descriptors],
+            "missing_segments": [segment for segment in self.descriptors if segment not in new_descriptors]
+        }
+
+def compare_segments(original: pd.DataFrame, new_data: pd.DataFrame, segment_column: str, sigma: float = 1.0, delta: float = 0.1, bins: int = 20) -> dict:
+    """
+    Compares every segment of two DataFrames, see SegmentBaseline.compare.
+    """
+    return SegmentBaseline(original, segment_column, bins=bins).compare(new_data, sigma=sigma, delta=delta)
@@ -0,0 +1,169 @@
+from multiprocessing import shared_memory
+import os
+import weakref
+import numpy as np
+import pandas as pd
+
+# Offsets of the arrays in a block are aligned for vectorized reads
+_ALIGNMENT = 64
+# Kinds of the numpy dtypes whose values are stored in the buffer itself:
+# booleans, integers, floats, complex numbers, timedeltas, datetimes and fixed-width strings
+_SHAREABLE_KINDS = "biufcmMSU"
+
+class _SharedMemory(shared_memory.SharedMemory):
+    """
+    SharedMemory that stays mapped, instead of raising, while arrays still read from it when it is closed.
+    """
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            pass
+
+def _unlink(memory: shared_memory.SharedMemory, pid: int):
+    memory.close()
+    # Forked workers inherit the SharedArrays of their parent but must never destroy its block
+    if os.getpid() != pid:
+        return
+    try:
+        memory.unlink()
+    except FileNotFoundError:
+        pass
+
+class SharedArrays:
+    """
+    A class to pack named numpy arrays in a single shared memory block. Pickling it only sends the name of the block
+    and the layout of the arrays, so the processes that receive it attach to the block and read the arrays zero-copy.
+    The process that created the block owns it: the block is unlinked by unlink, at the end of a with block, when the
+    SharedArrays is garbage collected or at exit, and by the resource tracker of multiprocessing when the process crashes.
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray] = None, json_data: dict = None):
+        """
+        Copies the arrays to a new shared memory block, or attaches to the block described by `json_data`.
+        """
+        if json_data is not None:
+            self.name = json_data["name"]
+            self.layout = json_data["layout"]
+            self.owner = False
+            self._memory = _SharedMemory(name=self.name)
+            self._finalizer = weakref.finalize(self, self._memory.close)
+            return
+
+        arrays = {key: np.asarray(array) for key, array in arrays.items()}
+        self.layout = []
+        size = 0
+        for key, array in arrays.items():
+            if array.dtype.kind not in _SHAREABLE_KINDS:
+                raise ValueError(f"The array {key} of dtype {array.dtype} cannot be shared.")
+            size = -(-size // _ALIGNMENT) * _ALIGNMENT
+            self.layout.append([key, array.dtype.str, list(array.shape), size])
+            size += array.nbytes
+
+        # A block of size 0 cannot be created
+        self._memory = _SharedMemory(create=True, size=max(size, 1))
+        self.name = self._memory.name
+        self.owner = True
+        self._finalizer = weakref.finalize(self, _unlink, self._memory, os.getpid())
+        for (key, dtype, shape, offset) in self.layout:
+            np.ndarray(shape, dtype=dtype, buffer=self._memory.buf, offset=offset)[...] = arrays[key]
+
+    def __repr__(self):
+        """
+        Returns a string representation of the SharedArrays.
+        """
+        return f"SharedArrays(name={self.name}, arrays={[key for key, *_ in self.layout]}, size={self._memory.size}, owner={self.owner})"
+
+    def __reduce__(self):
+        return (SharedArrays, (None, self.get_json()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()
+
+    def get_json(self) -> dict:
+        """
+        Returns the name of the block and the layout of its arrays, which attach to it from any process.
+        """
+        return {"name": self.name, "layout": self.layout}
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """
+        Returns read-only views of the arrays in the block, valid as long as the block is mapped.
+        """
+        views = dict()
+        for key, dtype, shape, offset in self.layout:
+            view = np.ndarray(shape, dtype=dtype, buffer=self._memory.buf, offset=offset)
+            view.flags.writeable = False
+            views[key] = view
+        return views
+
+    def close(self):
+        """
+        Detaches from the block, which stays mapped until the last view of its arrays is released.
+        """
+        self._memory.close()
+
+    def unlink(self):
+        """
+        Detaches from the block and, in the process that created it, destroys it once every process detached.
+        """
+        self._finalizer()
+
+class SharedFrame:
+    """
+    A class to send a pandas DataFrame to other processes with its numeric, boolean and datetime columns in a
+    SharedArrays block. The other columns and the index are pickled with it.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Copies the shareable columns of df to a new shared memory block.
+        """
+        shared = [i for i, dtype in enumerate(df.dtypes) if isinstance(dtype, np.dtype) and dtype.kind in _SHAREABLE_KINDS]
+        self.columns = df.columns
+        self.index = df.index
+        self.shared = set(shared)
+        self.others = df.iloc[:, [i for i in range(df.shape[1]) if i not in self.shared]]
+        self.arrays = SharedArrays({str(i): df.iloc[:, i].to_numpy() for i in shared})
+
+    def __repr__(self):
+        """
+        Returns a string representation of the SharedFrame.
+        """
+        return f"SharedFrame(rows={len(self.index)}, columns={len(self.columns)}, shared={len(self.shared)}, arrays={self.arrays.name})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.unlink()
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Returns the DataFrame, reading its shared columns zero-copy.
+        """
+        views = self.arrays.arrays()
+        others = iter(range(self.others.shape[1]))
+        data = {
+            i: views[str(i)] if i in self.shared else self.others.iloc[:, next(others)].array
+            for i in range(len(self.columns))
+        }
+        df = pd.DataFrame(data, index=self.index, copy=False)
+        df.columns = self.columns
+        return df
+
+    def close(self):
+        """
+        Detaches from the shared columns.
+        """
+        self.arrays.close()
+
+    def unlink(self):
+        """
+        Detaches from the shared columns and, in the process that created them, destroys their block.
+        """
+        self.arrays.unlink()
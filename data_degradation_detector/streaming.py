@@ -0,0 +1,324 @@
+import numpy as np
+import pandas as pd
+from . import univariate as uv
+from .distinct import HyperLogLog
+from .histograms import Histogram, bin_counts
+from .sampling import DEFAULT_SEED, Reservoir
+
+class ColumnMoments:
+    """
+    A class to accumulate the count, mean, variance, minimum and maximum of a numeric variable over chunks.
+    Two accumulators can be merged, so chunks can be processed in any order or in different processes.
+    """
+
+    def __init__(self, json_data: dict=None):
+        """
+        Initializes an empty ColumnMoments or restores it from a JSON representation.
+        """
+        if json_data is not None:
+            self.count = json_data['count']
+            self.mean = json_data['mean']
+            self.m2 = json_data['m2']
+            self.min_val = json_data['min_val']
+            self.max_val = json_data['max_val']
+        else:
+            self.count = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+            self.min_val = float('inf')
+            self.max_val = float('-inf')
+
+    def __repr__(self):
+        """
+        Returns a string representation of the ColumnMoments.
+        """
+        return (f"ColumnMoments(count={self.count}, mean={self.mean}, std={self.std}, "
+                f"min_val={self.min_val}, max_val={self.max_val})")
+
+    @property
+    def std(self) -> float:
+        """
+        Sample standard deviation of the accumulated values.
+        """
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan')
+
+    def update(self, values: np.ndarray):
+        """
+        Adds an array of non-missing values.
+        """
+        if len(values) == 0:
+            return self
+
+        other = ColumnMoments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min_val = values.min().item()
+        other.max_val = values.max().item()
+
+        return self.merge(other)
+
+    def merge(self, other: "ColumnMoments"):
+        """
+        Adds the values accumulated by another ColumnMoments (parallel algorithm of Chan et al.).
+        """
+        if other.count == 0:
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min_val = min(self.min_val, other.min_val)
+        self.max_val = max(self.max_val, other.max_val)
+
+        return self
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the ColumnMoments.
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min_val": self.min_val,
+            "max_val": self.max_val
+        }
+
+class QualityCounters:
+    """
+    A class to accumulate the data quality counters of a numeric variable over chunks: its number of rows, of
+    missing values, of infinities and of zeros, and a HyperLogLog of its distinct finite values. Two accumulators can be merged.
+    """
+
+    def __init__(self, json_data: dict=None):
+        """
+        Initializes empty QualityCounters or restores them from a JSON representation.
+        """
+        if json_data is not None:
+            self.count = json_data['count']
+            self.null_count = json_data['null_count']
+            self.inf_count = json_data['inf_count']
+            self.zero_count = json_data['zero_count']
+            self.distinct = HyperLogLog(json_data=json_data['distinct'])
+        else:
+            self.count = self.null_count = self.inf_count = self.zero_count = 0
+            self.distinct = HyperLogLog()
+
+    def __repr__(self):
+        """
+        Returns a string representation of the QualityCounters.
+        """
+        return f"QualityCounters({', '.join(f'{name}={value}' for name, value in self.get_counts().items())})"
+
+    def update(self, values: np.ndarray, count: int, null_count: int, inf_count: int):
+        """
+        Adds the finite values of `count` rows, of which `null_count` were missing and `inf_count` infinite.
+        """
+        self.count += count
+        self.null_count += null_count
+        self.inf_count += inf_count
+        self.zero_count += int(np.count_nonzero(values == 0))
+        self.distinct.update(values)
+
+        return self
+
+    def merge(self, other: "QualityCounters"):
+        """
+        Adds the rows counted by other QualityCounters.
+        """
+        self.count += other.count
+        self.null_count += other.null_count
+        self.inf_count += other.inf_count
+        self.zero_count += other.zero_count
+        self.distinct.merge(other.distinct)
+
+        return self
+
+    def get_counts(self) -> dict:
+        """
+        Returns the counters of the DistributionDescriptors.
+        """
+        return {
+            "count": self.count,
+            "null_count": self.null_count,
+            "inf_count": self.inf_count,
+            "zero_count": self.zero_count,
+            "distinct_count": self.distinct.estimate()
+        }
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the QualityCounters.
+        """
+        return {
+            "count": self.count,
+            "null_count": self.null_count,
+            "inf_count": self.inf_count,
+            "zero_count": self.zero_count,
+            "distinct": self.distinct.get_json()
+        }
+
+class QuantileSketch:
+    """
+    A class to summarize the values of a numeric variable in at most `size` weighted points, for approximate quantiles.
+    Two sketches are merged by pooling their points and compressing them back into `size` points of about equal weight,
+    so the rank error of a quantile stays in the order of 1 / `size` of the count whatever the order of the merges.
+    """
+
+    def __init__(self, size: int = 128, json_data: dict=None):
+        """
+        Initializes an empty QuantileSketch or restores it from a JSON representation.
+        """
+        if json_data is not None:
+            self.size = json_data['size']
+            self.points = np.asarray(json_data['points'], dtype=float)
+            self.weights = np.asarray(json_data['weights'], dtype=float)
+        else:
+            if size <= 0:
+                raise ValueError("The sketch size must be a positive integer.")
+            self.size = size
+            self.points = np.empty(0)
+            self.weights = np.empty(0)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the QuantileSketch.
+        """
+        return f"QuantileSketch(size={self.size}, points={len(self.points)}, count={int(self.count)})"
+
+    @property
+    def count(self) -> float:
+        """
+        Number of summarized values.
+        """
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray):
+        """
+        Adds an array of non-missing values.
+        """
+        if len(values) == 0:
+            return self
+
+        self.points = np.concatenate([self.points, np.asarray(values, dtype=float)])
+        self.weights = np.concatenate([self.weights, np.ones(len(values))])
+        self._compress()
+
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        """
+        Adds the values summarized by another QuantileSketch.
+        """
+        if len(other.points) == 0:
+            return self
+
+        self.points = np.concatenate([self.points, other.points])
+        self.weights = np.concatenate([self.weights, other.weights])
+        self._compress()
+
+        return self
+
+    def _compress(self):
+        """
+        Sorts the points and, beyond `size` of them, replaces every run of about count / `size` of the weight by its weighted mean.
+        """
+        order = np.argsort(self.points, kind='stable')
+        self.points, self.weights = self.points[order], self.weights[order]
+        if len(self.points) <= self.size:
+            return
+
+        # Bucket of the middle of the weight of every point
+        cumulative = np.cumsum(self.weights)
+        buckets = np.minimum(((cumulative - self.weights / 2) * self.size / cumulative[-1]).astype(np.int64), self.size - 1)
+        weights = np.bincount(buckets, weights=self.weights, minlength=self.size)
+        sums = np.bincount(buckets, weights=self.points * self.weights, minlength=self.size)
+        kept = weights > 0
+        self.points, self.weights = sums[kept] / weights[kept], weights[kept]
+
+    def quantile(self, quantiles) -> np.ndarray:
+        """
+        Returns the approximate quantiles, interpolated between the middles of the weights of the points.
+        Below `size` values they are the exact linear-interpolation quantiles of NumPy.
+        """
+        if len(self.points) == 0:
+            return np.full(np.shape(quantiles), np.nan)
+
+        middles = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(np.asarray(quantiles) * (self.count - 1) + 0.5, middles, self.points)
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the QuantileSketch.
+        """
+        return {
+            "size": self.size,
+            "points": self.points.tolist(),
+            "weights": self.weights.tolist()
+        }
+
+def describe_chunks(chunks, sample_size: int = 100_000, seed: int = DEFAULT_SEED, max_categories: int = 50) -> tuple[dict, pd.DataFrame]:
+    """
+    Computes the descriptors of every column over an iterable of DataFrame chunks in a single pass.
+
+    The count, mean, standard deviation, minimum, maximum and category frequencies are exact. The quartiles
+    are computed on a reservoir sample of `sample_size` rows, which is also returned for the steps that need
+    the rows themselves, such as clustering.
+    """
+    moments = dict()
+    quality = dict()
+    frequencies = dict()
+    reservoir = Reservoir(sample_size, seed)
+
+    for chunk in chunks:
+        reservoir.update(chunk)
+        for column_name in chunk.columns:
+            column = chunk[column_name]
+            if uv.is_categorical(column):
+                counts = column.value_counts(dropna=True)
+                frequencies[column_name] = counts if column_name not in frequencies else frequencies[column_name].add(counts, fill_value=0)
+            else:
+                values, null_count, inf_count = uv._finite_values(column)
+                moments.setdefault(column_name, ColumnMoments()).update(values)
+                quality.setdefault(column_name, QualityCounters()).update(values, len(column), null_count, inf_count)
+
+    sample = reservoir.get_sample()
+    descriptors = dict()
+    for column_name in sample.columns:
+        if column_name in frequencies:
+            descriptors[column_name] = uv.CategoricalDescriptors(json_data=uv.get_frequency_table(frequencies[column_name], max_categories))
+            continue
+
+        column_moments = moments[column_name]
+        values = uv._numeric_values(sample[column_name])
+        q1, q2, q3 = np.quantile(values, [0.25, 0.5, 0.75]) if len(values) else (float('nan'),) * 3
+        descriptors[column_name] = uv.DistributionDescriptors(json_data={
+            "mean": column_moments.mean,
+            "std": column_moments.std,
+            "min_val": column_moments.min_val,
+            "max_val": column_moments.max_val,
+            "q1": float(q1),
+            "q2": float(q2),
+            "q3": float(q3),
+            **quality[column_name].get_counts()
+        })
+
+    return descriptors, sample
+
+def histogram_chunks(chunks, edges: dict[str, np.ndarray]) -> dict:
+    """
+    Computes the exact histograms of the given columns over an iterable of DataFrame chunks,
+    binning every chunk over the fixed edges of each column.
+    """
+    counts = {column_name: np.zeros(len(column_edges) + 1, dtype=np.int64) for column_name, column_edges in edges.items()}
+    for chunk in chunks:
+        for column_name, column_edges in edges.items():
+            counts[column_name] += bin_counts(uv._numeric_values(chunk[column_name]), column_edges)
+
+    return {
+        column_name: Histogram(json_data={"edges": edges[column_name], "counts": counts[column_name]})
+        for column_name in edges
+    }
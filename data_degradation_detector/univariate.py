@@ -2,11 +2,23 @@ import json
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-import os
+from . import backends
+from .artifacts import save_figure, save_table
+from .sampling import DEFAULT_SEED, reservoir_sample
+from .profiling import profiled, span
+from .histograms import Histogram, HistogramDrift, population_stability_index
+from .distinct import HyperLogLog
+
+# Data quality counters of the numeric descriptors, NaN when unknown such as in older baselines
+QUALITY_COUNTERS = ["count", "null_count", "inf_count", "zero_count", "distinct_count"]
+# Largest ratio of distinct to finite values of the columns whose number of distinct values is compared
+DISCRETE_RATIO = 0.5
 
 class DistributionDescriptors:
     """
     A class to represent the distribution descriptors of a single variable.
+    Besides the moments and quartiles of its finite values it counts the rows, the missing values,
+    the infinities and the zeros, and estimates the number of distinct finite values with a HyperLogLog.
     """
 
     def __init__(self, column: pd.Series=None, json_data: dict=None):
@@ -14,13 +26,25 @@ class DistributionDescriptors:
         Initializes the DistributionDescriptors from a pandas Series or a JSON representation.
         """
         if column is not None:
-            self.mean = column.mean()
-            self.std = column.std()
-            self.min_val = column.min()
-            self.max_val = column.max()
-            self.q1 = column.quantile(0.25)
-            self.q2 = column.quantile(0.5)
-            self.q3 = column.quantile(0.75)
+            # Computed on the native width of the column (float32, ints...) without upcasting copies
+            values, null_count, inf_count = _finite_values(column)
+            self.count = len(column)
+            self.null_count = null_count
+            self.inf_count = inf_count
+            self.zero_count = int(np.count_nonzero(values == 0))
+            self.distinct_count = HyperLogLog().update(values).estimate()
+            if len(values) == 0:
+                self.mean = self.std = self.min_val = self.max_val = float('nan')
+                self.q1 = self.q2 = self.q3 = float('nan')
+            else:
+                q1, q2, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+                self.mean = float(values.mean())
+                self.std = float(values.std(ddof=1)) if len(values) > 1 else float('nan')
+                self.min_val = values.min().item()
+                self.max_val = values.max().item()
+                self.q1 = float(q1)
+                self.q2 = float(q2)
+                self.q3 = float(q3)
         elif json_data is not None:
             self.mean = json_data['mean']
             self.std = json_data['std']
@@ -29,6 +53,8 @@ class DistributionDescriptors:
             self.q1 = json_data['q1']
             self.q2 = json_data['q2']
             self.q3 = json_data['q3']
+            for counter in QUALITY_COUNTERS:
+                setattr(self, counter, json_data.get(counter, float('nan')))
         else:
             raise ValueError("Either a pandas Series or JSON data must be provided to initialize DistributionDescriptors.")        
 
@@ -38,7 +64,9 @@ class DistributionDescriptors:
         """
         return (f"DistributionDescriptors(mean={self.mean}, std={self.std}, "
                 f"min_val={self.min_val}, max_val={self.max_val}, "
-                f"q1={self.q1}, q2={self.q2}, q3={self.q3})")
+                f"q1={self.q1}, q2={self.q2}, q3={self.q3}, "
+                f"count={self.count}, null_count={self.null_count}, inf_count={self.inf_count}, "
+                f"zero_count={self.zero_count}, distinct_count={self.distinct_count})")
     
     def get_json(self) -> dict:
         """
@@ -51,7 +79,12 @@ class DistributionDescriptors:
             "max_val": self.max_val,
             "q1": self.q1,
             "q2": self.q2,
-            "q3": self.q3
+            "q3": self.q3,
+            "count": self.count,
+            "null_count": self.null_count,
+            "inf_count": self.inf_count,
+            "zero_count": self.zero_count,
+            "distinct_count": self.distinct_count
         }
     
     def __eq__(self, value):
@@ -64,21 +97,101 @@ class DistributionDescriptors:
                 self.max_val == value.max_val and
                 self.q1 == value.q1 and
                 self.q2 == value.q2 and
-                self.q3 == value.q3)
+                self.q3 == value.q3 and
+                all(getattr(self, counter) == getattr(value, counter) for counter in QUALITY_COUNTERS))
+
+    def get_rates(self) -> dict[str, float]:
+        """
+        Returns the fractions of the rows that are missing, infinite or zero, NaN when the counts are unknown.
+        """
+        return {
+            f"{counter[:-len('_count')]}_rate": getattr(self, counter) / self.count if self.count else float('nan')
+            for counter in ["null_count", "inf_count", "zero_count"]
+        }
+
+class CategoricalDescriptors:
+    """
+    A class to represent the frequency table of a single categorical variable.
+    """
+
+    OTHER = "__other__"
+
+    def __init__(self, column: pd.Series=None, json_data: dict=None, max_categories: int = 50):
+        """
+        Initializes the CategoricalDescriptors from a pandas Series or a JSON representation.
+        Only the `max_categories` most frequent categories are kept, the rest are counted together as "__other__".
+        """
+        if column is not None:
+            json_data = get_frequency_table(column.value_counts(dropna=True), max_categories)
+
+        if json_data is not None:
+            self.count = json_data['count']
+            self.num_categories = json_data['num_categories']
+            self.frequencies = json_data['frequencies']
+        else:
+            raise ValueError("Either a pandas Series or JSON data must be provided to initialize CategoricalDescriptors.")
+
+    def __repr__(self):
+        """
+        Returns a string representation of the CategoricalDescriptors.
+        """
+        return (f"CategoricalDescriptors(count={self.count}, num_categories={self.num_categories}, "
+                f"frequencies={self.frequencies})")
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the CategoricalDescriptors.
+        """
+        return {
+            "type": "categorical",
+            "count": self.count,
+            "num_categories": self.num_categories,
+            "frequencies": self.frequencies
+        }
+
+    def __eq__(self, value):
+        if not isinstance(value, CategoricalDescriptors):
+            return NotImplemented
+
+        return (self.count == value.count and
+                self.num_categories == value.num_categories and
+                self.frequencies == value.frequencies)
+
+def get_frequency_table(counts: pd.Series, max_categories: int = 50) -> dict:
+    """
+    Returns the JSON representation of the CategoricalDescriptors of the given category counts.
+    """
+    counts = counts[counts > 0].sort_values(ascending=False, kind='stable')
+    frequencies = {str(k): int(v) for k, v in counts.iloc[:max_categories].items()}
+    if len(counts) > max_categories:
+        frequencies[CategoricalDescriptors.OTHER] = int(counts.iloc[max_categories:].sum())
+
+    return {
+        "type": "categorical",
+        "count": int(counts.sum()),
+        "num_categories": len(counts),
+        "frequencies": frequencies
+    }
 
 class DistributionChanges:
     """
     A class to represent the changes in distribution between two variables.
     """
 
-    def __init__(self, original: DistributionDescriptors, new_data: DistributionDescriptors, sigma: float = 1.0, delta: float = 0.1):
+    def __init__(self, original: DistributionDescriptors, new_data: DistributionDescriptors, sigma: float = 1.0, delta: float = 0.1, histogram_drift: HistogramDrift = None, thresholds: dict = None):
         """
         Initializes the DistributionChanges with descriptors from two distributions.
+        The shape drift tests computed on the histograms of both distributions can be attached with `histogram_drift`.
+        The fractions of missing, infinite and zero values change when they move by more than `delta`, and the number
+        of distinct values of a discrete column when it grows by more than `delta` of the original one.
+        Calibrated `thresholds` per metric, such as those of calibration.calibrate_thresholds, replace the sigma and delta ones.
         """
         self.original = original
         self.new_data = new_data
         self.sigma = sigma
         self.delta = delta
+        self.histogram_drift = histogram_drift
+        self.thresholds = thresholds
 
         self.changed = dict()
         self.unchanged = dict()
@@ -90,9 +203,21 @@ class DistributionChanges:
             ("q2", original.q2, new_data.q2, delta * original.q2),
             ("q3", original.q3, new_data.q3, delta * original.q3),
         ]
+        # The fractions of missing, infinite and zero values change when they move by more than delta
+        original_rates, new_rates = original.get_rates(), new_data.get_rates()
+        metrics += [(name, original_rates[name], new_rates[name], delta) for name in original_rates]
+        # Only discrete columns, whose original values repeat, have a number of distinct values that does not grow with the rows.
+        # A batch smaller than the original has fewer of them, only new values are a change.
+        if original.distinct_count <= DISCRETE_RATIO * (original.count - original.null_count - original.inf_count):
+            metrics.append(("distinct_count", original.distinct_count, max(new_data.distinct_count, original.distinct_count), delta * original.distinct_count))
+        if thresholds:
+            metrics = [(name, orig_val, new_val, thresholds.get(name, threshold)) for name, orig_val, new_val, threshold in metrics]
 
         for name, orig_val, new_val, threshold in metrics:
             diff = abs(orig_val - new_val)
+            # Metrics undefined on either side, such as the std of a single value, are left out
+            if np.isnan(diff) or np.isnan(threshold):
+                continue
             # Avoid division by zero
             if threshold == 0:
                 percentage_diff = 0
@@ -109,41 +234,260 @@ class DistributionChanges:
         """
         change_str = ', '.join([f"{k}: {v}%" for k, v in self.changed.items()])
         unchanged_str = ', '.join([f"{k}: {v}%" for k, v in self.unchanged.items()])
+        drift_str = f", Drift tests: {self.histogram_drift}" if self.histogram_drift is not None else ""
 
-        return f"Changes: {change_str}, Unchanged: {unchanged_str}, Sigma: {self.sigma}, Delta: {self.delta}"
+        return f"Changes: {change_str}, Unchanged: {unchanged_str}, Sigma: {self.sigma}, Delta: {self.delta}{drift_str}"
     
     def get_json(self) -> dict:
         """
         Returns a JSON representation of the DistributionChanges.
         """
-        return {
+        json_data = {
             "changed": self.changed,
             "unchanged": self.unchanged,
             "sigma": self.sigma,
             "delta": self.delta,
         }
+        if self.thresholds:
+            json_data["thresholds"] = self.thresholds
+        if self.histogram_drift is not None:
+            json_data["drift_tests"] = self.histogram_drift.get_json()
+
+        return json_data
+
+class CategoricalChanges:
+    """
+    A class to represent the changes in the frequency table of a categorical variable,
+    measured with the population stability index (PSI) and a chi-square test.
+    """
+
+    def __init__(self, original: CategoricalDescriptors, new_data: CategoricalDescriptors, psi_threshold: float = 0.2, alpha: float = 0.05):
+        """
+        Initializes the CategoricalChanges with the frequency tables of two distributions.
+        Categories unseen in the original table, and the "__other__" bucket of a truncated new table, are counted as "__other__".
+        """
+        self.original = original
+        self.new_data = new_data
+        self.psi_threshold = psi_threshold
+        self.alpha = alpha
+
+        self.changed = dict()
+        self.unchanged = dict()
+
+        categories = list(original.frequencies)
+        self.new_categories = [c for c in new_data.frequencies if c not in original.frequencies and c != CategoricalDescriptors.OTHER]
+        # A new table truncated to max_categories keeps its unseen categories in its own "__other__" bucket
+        has_other = self.new_categories or CategoricalDescriptors.OTHER in new_data.frequencies
+        if has_other and CategoricalDescriptors.OTHER not in original.frequencies:
+            categories.append(CategoricalDescriptors.OTHER)
+
+        position = {category: i for i, category in enumerate(categories)}
+        other = position.get(CategoricalDescriptors.OTHER)
+        expected = np.array([original.frequencies.get(c, 0) for c in categories], dtype=float)
+        observed = np.zeros(len(categories))
+        for category, count in new_data.frequencies.items():
+            observed[position.get(category, other)] += count
+
+        self.psi = population_stability_index(expected, observed)
+        self.chi_square, self.p_value, critical_value = _chi_square_test(expected, observed, alpha)
+
+        for name, value, threshold in [("psi", self.psi, psi_threshold), ("chi_square", self.chi_square, critical_value)]:
+            if threshold == 0 or not np.isfinite(threshold):
+                continue
+            percentage_diff = value / threshold
+            if value > threshold:
+                self.changed[name] = int(percentage_diff * 100)
+            else:
+                self.unchanged[name] = int(percentage_diff * 100)
+
+    def __repr__(self):
+        """
+        Returns a string representation of the CategoricalChanges.
+        """
+        change_str = ', '.join([f"{k}: {v}%" for k, v in self.changed.items()])
+        unchanged_str = ', '.join([f"{k}: {v}%" for k, v in self.unchanged.items()])
+
+        return (f"Changes: {change_str}, Unchanged: {unchanged_str}, PSI: {self.psi:.4f}, "
+                f"p-value: {self.p_value:.4f}, New categories: {self.new_categories}")
+
+    def get_json(self) -> dict:
+        """
+        Returns a JSON representation of the CategoricalChanges.
+        """
+        return {
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "psi": self.psi,
+            "chi_square": self.chi_square,
+            "p_value": self.p_value,
+            "new_categories": self.new_categories,
+            "psi_threshold": self.psi_threshold,
+            "alpha": self.alpha,
+        }
+
+def _chi_square_test(expected, observed, alpha: float):
+    """
+    Returns the chi-square statistic of the observed counts against the expected proportions,
+    its p-value and the critical value at significance `alpha`.
+    """
+    from scipy.stats import chi2
+
+    expected = np.asarray(expected, dtype=float)
+    observed = np.asarray(observed, dtype=float)
+    n = observed.sum()
+    if expected.sum() == 0 or n == 0:
+        return 0.0, 1.0, float('inf')
+
+    mask = expected > 0
+    freedom = max(int(mask.sum()) - 1, 1)
+    expected_counts = expected[mask] / expected.sum() * n
+    # Observations in categories the original never had make the statistic infinite, they are reported as new categories instead
+    statistic = float(np.sum((observed[mask] - expected_counts) ** 2 / expected_counts))
+
+    return statistic, float(chi2.sf(statistic, freedom)), float(chi2.isf(alpha, freedom))
+
+def _finite_values(column: pd.Series) -> tuple[np.ndarray, int, int]:
+    """
+    Returns the finite values of a numeric column as a NumPy array of its native dtype, without copying when
+    the column has no missing or infinite values, along with its number of missing values and of infinities.
+    """
+    null_count = 0
+    if isinstance(column.dtype, np.dtype):
+        values = column.to_numpy(copy=False)
+    else:
+        # Nullable extension dtypes (Int64, Float32...) keep their missing values in a mask
+        null_count = int(column.isna().sum())
+        values = column.dropna().to_numpy(dtype=column.dtype.numpy_dtype)
+
+    inf_count = 0
+    if values.dtype.kind == 'f':
+        finite = np.isfinite(values)
+        if not finite.all():
+            nan_count = int(np.isnan(values).sum())
+            null_count += nan_count
+            inf_count = len(values) - int(finite.sum()) - nan_count
+            values = values[finite]
+
+    return values, null_count, inf_count
+
+def _numeric_values(column: pd.Series) -> np.ndarray:
+    """
+    Returns the finite values of a numeric column as a NumPy array of its native dtype,
+    without copying when the column has no missing or infinite values.
+    """
+    return _finite_values(column)[0]
 
+def is_categorical(column: pd.Series) -> bool:
+    """
+    Returns whether the column is described by a frequency table instead of numeric descriptors.
+    """
+    return pd.api.types.is_bool_dtype(column.dtype) or not pd.api.types.is_numeric_dtype(column.dtype)
+
+def get_distribution_changes(original, new_data, sigma: float = 1.0, delta: float = 0.1, original_histogram: Histogram = None, new_histogram: Histogram = None, thresholds: dict = None):
+    """
+    Returns the DistributionChanges or CategoricalChanges between two descriptors of the same type.
+    When the histograms of both numeric distributions are given their drift tests are attached.
+    Calibrated `thresholds` per metric (mean, std, q1, q2, q3, psi, ks, wasserstein, and the alpha of the chi-square test) replace the default ones.
+    """
+    thresholds = thresholds or {}
+    if isinstance(original, CategoricalDescriptors):
+        return CategoricalChanges(original, new_data, psi_threshold=thresholds.get("psi", 0.2), alpha=thresholds.get("alpha", 0.05))
+
+    histogram_drift = None
+    if original_histogram is not None and new_histogram is not None:
+        histogram_drift = HistogramDrift(original_histogram, new_histogram, psi_threshold=thresholds.get("psi", 0.2), ks_threshold=thresholds.get("ks", 0.1),
+                                         wasserstein_threshold=thresholds.get("wasserstein", sigma * original.std))
+
+    return DistributionChanges(original, new_data, sigma=sigma, delta=delta, histogram_drift=histogram_drift, thresholds=thresholds)
+
+@profiled("univariate.get_distribution_descriptors")
 def get_distribution_descriptors(column: pd.Series) -> DistributionDescriptors:
     """
     Returns the distribution descriptors of a given column in a pandas DataFrame.
 
     Parameters:
     column (pd.Series): The column for which to calculate the distribution descriptors.
+    Categorical, string and boolean columns get CategoricalDescriptors instead.
     """
+    if is_categorical(column):
+        return CategoricalDescriptors(column)
     return DistributionDescriptors(column)
 
 def get_distribution_descriptors_from_json(json_data: dict) -> DistributionDescriptors:
     """
     Returns the distribution descriptors from a JSON representation.
     """
-    return {column: DistributionDescriptors(json_data=column_data) for column, column_data in json_data.items()}
+    return {
+        column: CategoricalDescriptors(json_data=column_data) if column_data.get("type") == "categorical" else DistributionDescriptors(json_data=column_data)
+        for column, column_data in json_data.items()
+    }
 
+@profiled("univariate.get_distribution_descriptors_all_columns")
 def get_distribution_descriptors_all_columns(df: pd.DataFrame) -> dict[str, DistributionDescriptors]:
     """
     Returns the distribution descriptors for all columns in a pandas DataFrame.
+    Polars DataFrames and Arrow tables are described by their own aggregations, without converting them.
     """
+    if backends.is_native(df):
+        return backends.describe(df)
     return {col: get_distribution_descriptors(df[col]) for col in df.columns}
 
+def get_histogram(column: pd.Series, edges: np.ndarray = None, bins: int = 20) -> Histogram:
+    """
+    Returns the fixed-edge histogram of a numeric column, over the given edges or
+    `bins` equal-width bins between its minimum and maximum.
+    """
+    return Histogram(_numeric_values(column), edges=edges, bins=bins)
+
+@profiled("univariate.get_histograms_all_columns")
+def get_histograms_all_columns(df: pd.DataFrame, bins: int = 20) -> dict[str, Histogram]:
+    """
+    Returns the histograms of all numeric columns in a pandas DataFrame, a Polars DataFrame or an Arrow table.
+    """
+    if backends.is_native(df):
+        return backends.histograms(df, bins=bins)
+    return {col: get_histogram(df[col], bins=bins) for col in df.columns if not is_categorical(df[col])}
+
+def get_histograms_from_json(json_data: dict) -> dict[str, Histogram]:
+    """
+    Returns the histograms from a JSON representation.
+    """
+    return {column: Histogram(json_data=column_data) for column, column_data in json_data.items()}
+
+@profiled("univariate.compare_to_baseline")
+def compare_to_baseline(descriptors: dict, histograms: dict[str, Histogram], new_data: pd.DataFrame, sigma: float = 1.0, delta: float = 0.1, thresholds: dict = None) -> dict:
+    """
+    Compares all columns of a DataFrame against the stored descriptors and histograms of the original data.
+    The new data is binned once over the stored edges and nothing is plotted, so the original data is not needed.
+    The calibrated `thresholds` of a column, when given, replace its sigma and delta thresholds.
+    The new data can also be a Polars DataFrame or an Arrow table, described and binned by its own backend.
+    """
+    thresholds = thresholds or {}
+    numeric_histograms = {
+        column_name: histogram for column_name, histogram in histograms.items()
+        if column_name in descriptors and not isinstance(descriptors[column_name], CategoricalDescriptors)
+    }
+    if backends.is_native(new_data):
+        new_data = backends.select_columns(new_data, list(descriptors))
+        new_descriptors = backends.describe(new_data)
+        new_histograms = backends.histograms(new_data, edges={column_name: histogram.edges for column_name, histogram in numeric_histograms.items()})
+    else:
+        new_descriptors = {column_name: get_distribution_descriptors(new_data[column_name]) for column_name in descriptors}
+        new_histograms = {column_name: get_histogram(new_data[column_name], edges=histogram.edges) for column_name, histogram in numeric_histograms.items()}
+
+    result = {}
+    for column_name, original in descriptors.items():
+        original_histogram = numeric_histograms.get(column_name)
+        new_histogram = new_histograms.get(column_name)
+
+        changes = get_distribution_changes(original, new_descriptors[column_name], sigma=sigma, delta=delta,
+                                           original_histogram=original_histogram, new_histogram=new_histogram,
+                                           thresholds=thresholds.get(column_name))
+        result[column_name] = changes.get_json()
+
+    return result
+
+@profiled("univariate.generate_distribution")
 def _generate_distribution(column: pd.Series):
     """
     Generates a distribution of the data in the column using little balls.
@@ -162,14 +506,27 @@ def _generate_distribution(column: pd.Series):
 
     return y_pos
 
-def plot_distribution_descriptors(column: pd.Series, ax: plt.Axes = None, path: str = None, show: bool = True):
+@profiled("univariate.plot_distribution_descriptors")
+def plot_distribution_descriptors(column: pd.Series, ax: plt.Axes = None, path: str = None, show: bool = True, sample_size: int = None, seed: int = DEFAULT_SEED, descriptors: DistributionDescriptors = None):
     """
     Plots the distribution descriptors using matplotlib and returns the figure.
+    The descriptors are always computed on the full column; when `sample_size` is given
+    only a deterministic sample of that many rows is drawn.
+    Descriptors computed elsewhere, such as on the full table a sampled column comes from, can be given instead.
     """
-    descriptors = get_distribution_descriptors(column)
+    descriptors = descriptors if descriptors is not None else get_distribution_descriptors(column)
     if ax is None:
         ax = plt.subplots(figsize=(8, 4))[1]
-    y_pos = _generate_distribution(column)
+
+    if isinstance(descriptors, CategoricalDescriptors):
+        _plot_frequencies(descriptors, ax)
+        ax.set_title(f'Distribution of {column.name}')
+        if show:
+            plt.show()
+        return
+
+    sample = reservoir_sample(column, sample_size, seed)
+    y_pos = _generate_distribution(sample)
 
     ax.axvline(descriptors.mean, color='red', linestyle='-', linewidth=2, label=f'Mean: {descriptors.mean:.2f}')
     ax.axvline(descriptors.q1, color='green', linestyle='-', linewidth=2, label=f'Q1: {descriptors.q1:.2f}')
@@ -179,7 +536,7 @@ def plot_distribution_descriptors(column: pd.Series, ax: plt.Axes = None, path:
     ax.axvline(descriptors.max_val, color='pink', linestyle='-', linewidth=2, label=f'Max: {descriptors.max_val:.2f}')
     ax.legend()
 
-    ax.scatter(column, y_pos, s=30, color='blue', alpha=0.6, edgecolors='black')
+    ax.scatter(sample, y_pos, s=30, color='blue', alpha=0.6, edgecolors='black')
     ax.set_title(f'Distribution of {column.name}')
     ax.set_xlabel('Value')
     ax.set_ylabel('Frequency (balls)')
@@ -187,109 +544,294 @@ def plot_distribution_descriptors(column: pd.Series, ax: plt.Axes = None, path:
     if show:
         plt.show()
     
-def plot_distribution_descriptors_all_columns(df: pd.DataFrame, path: str = None):
+def _plot_frequencies(descriptors: CategoricalDescriptors, ax: plt.Axes):
+    """
+    Plots the frequency table of a categorical column as bars.
+    """
+    categories = list(descriptors.frequencies)
+    ax.bar(categories, list(descriptors.frequencies.values()), color='blue', alpha=0.6, edgecolor='black')
+    ax.tick_params(axis='x', labelrotation=45)
+    ax.set_xlabel('Category')
+    ax.set_ylabel('Frequency')
+
+@profiled("univariate.plot_distribution_descriptors_all_columns")
+def plot_distribution_descriptors_all_columns(df: pd.DataFrame, path: str = None, sample_size: int = None, seed: int = DEFAULT_SEED):
     """
     Plots the distribution descriptors for all columns in a pandas DataFrame.
+    The descriptors of a Polars DataFrame or an Arrow table are computed natively and only the drawn rows are converted.
     """
+    descriptors = dict()
+    if backends.is_native(df):
+        descriptors = backends.describe(df)
+        df, sample_size = backends.to_pandas(df, sample_size, seed), None
 
     fig, axes = plt.subplots(nrows=len(df.columns), ncols=1, figsize=(10, 5 * len(df.columns)))
     for i, col in enumerate(df.columns):
-        plot_distribution_descriptors(df[col], ax=axes[i], show=False)
+        plot_distribution_descriptors(df[col], ax=axes[i], show=False, sample_size=sample_size, seed=seed, descriptors=descriptors.get(col))
         axes[i].set_title(f'Distribution of {col}')
 
     plt.tight_layout()
 
     if path:
-        os.makedirs(path, exist_ok=True)
-        plt.savefig(f"{path}/distribution_descriptors_all_columns.png")
-        plt.close()
+        with span("univariate.savefig"):
+            save_figure(f"{path}/distribution_descriptors_all_columns.png")
     else:
         plt.show()
 
-def compare_distributions(original: pd.Series, new_data: pd.Series, sigma: float = 1.0, delta: float = 0.1, name: str = None, path: str = None) -> DistributionChanges:
+@profiled("univariate.compare_distributions")
+def compare_distributions(original: pd.Series, new_data: pd.Series, sigma: float = 1.0, delta: float = 0.1, name: str = None, path: str = None, sample_size: int = None, seed: int = DEFAULT_SEED, bins: int = 20, plot: bool = True) -> DistributionChanges:
     """
-    Compares the distributions of two columns in a pandas series.
+    Compares the distributions of two columns in a pandas series, without drawing them when `plot` is False.
+    Numeric columns also get the drift tests of their histograms over `bins` bins of the original range,
+    categorical columns are compared with CategoricalChanges.
     """
-    changes = DistributionChanges(
-        original=get_distribution_descriptors(original),
-        new_data=get_distribution_descriptors(new_data),
+    original_histogram = new_histogram = None
+    if not is_categorical(original):
+        original_histogram = get_histogram(original, bins=bins)
+        new_histogram = get_histogram(new_data, edges=original_histogram.edges)
+
+    changes = get_distribution_changes(
+        get_distribution_descriptors(original),
+        get_distribution_descriptors(new_data),
         sigma=sigma,
-        delta=delta
+        delta=delta,
+        original_histogram=original_histogram,
+        new_histogram=new_histogram
     )
 
+    if plot:
+        _plot_comparison(original, new_data, name=name, path=path, sample_size=sample_size, seed=seed)
+
+    return changes
+
+def _plot_comparison(original: pd.Series, new_data: pd.Series, name: str = None, path: str = None, sample_size: int = None, seed: int = DEFAULT_SEED, descriptors: tuple = (None, None)):
+    """
+    Draws the distributions of two columns side by side, with the given descriptors of both when they were computed elsewhere.
+    """
     fig, axes = plt.subplots(1, 2, figsize=(16, 4))
     fig.suptitle(f"Distribution Comparison: {name if name else 'Unnamed'}")
     if path:
-        plot_distribution_descriptors(original, axes[0], show=False)
+        plot_distribution_descriptors(original, axes[0], show=False, sample_size=sample_size, seed=seed, descriptors=descriptors[0])
     axes[0].set_title('Original Distribution')
 
     if path:
-        plot_distribution_descriptors(new_data, axes[1], show=False)
+        plot_distribution_descriptors(new_data, axes[1], show=False, sample_size=sample_size, seed=seed, descriptors=descriptors[1])
     axes[1].set_title('New Data Distribution')
 
     plt.tight_layout()
     
     if path:
-        os.makedirs(path, exist_ok=True)
-        plt.savefig(f"{path}/distribution_comparison_{name if name else 'unnamed'}.png")
-        plt.close()
+        with span("univariate.savefig"):
+            save_figure(f"{path}/distribution_comparison_{name if name else 'unnamed'}.png")
     else:
         plt.show()
 
-    return changes 
-
-def compare_distribbutions_all_columns(original: pd.DataFrame, new_data: pd.DataFrame, sigma: float = 1.0, delta: float = 0.1, path: str = None):
+@profiled("univariate.compare_distribbutions_all_columns")
+def compare_distribbutions_all_columns(original: pd.DataFrame, new_data: pd.DataFrame, sigma: float = 1.0, delta: float = 0.1, path: str = None, sample_size: int = None, seed: int = DEFAULT_SEED, plot: bool = True):
     """
-    Compares the distributions of all columns in two pandas DataFrames.
+    Compares the distributions of all columns in two pandas DataFrames, without drawing them when `plot` is False.
+    Polars DataFrames and Arrow tables are compared on their native descriptors and histograms,
+    and only the rows drawn by the plots are converted to pandas.
     """
+    if backends.is_native(original):
+        return _compare_native(original, new_data, sigma=sigma, delta=delta, path=path, sample_size=sample_size, seed=seed, plot=plot)
+
     result = {}
     for column_name in original.columns:
         original_series = original[column_name]
         new_data_series = new_data[column_name]
-        changes = compare_distributions(original_series, new_data_series, sigma=sigma, delta=delta, name=column_name, path=path)
-        if path is None:
+        changes = compare_distributions(original_series, new_data_series, sigma=sigma, delta=delta, name=column_name, path=path, sample_size=sample_size, seed=seed, plot=plot)
+        if path is None and plot:
             print(f"Changes in column '{column_name}': {changes}")
         result[column_name] = changes.get_json()
 
     return result
 
-def descriptor_evolution(dfs: list[pd.Series], name: str = None, path: str = None):
+def _compare_native(original, new_data, sigma: float = 1.0, delta: float = 0.1, path: str = None, sample_size: int = None, seed: int = DEFAULT_SEED, plot: bool = True, bins: int = 20):
     """
-    Compares the evolution of descriptors across different DataFrames.
+    compare_distribbutions_all_columns for a Polars DataFrame or an Arrow table.
     """
+    original_descriptors = backends.describe(original)
+    original_histograms = backends.histograms(original, bins=bins)
+    new_data = backends.select_columns(new_data, list(original_descriptors))
+    new_descriptors = backends.describe(new_data)
+    new_histograms = backends.histograms(new_data, edges={column_name: histogram.edges for column_name, histogram in original_histograms.items()})
+    if plot:
+        original_sample, new_sample = backends.to_pandas(original, sample_size, seed), backends.to_pandas(new_data, sample_size, seed)
 
-    descriptors = [get_distribution_descriptors(df) for df in dfs]
+    result = {}
+    for column_name, original_column in original_descriptors.items():
+        changes = get_distribution_changes(original_column, new_descriptors[column_name], sigma=sigma, delta=delta,
+                                           original_histogram=original_histograms.get(column_name), new_histogram=new_histograms.get(column_name))
+        if plot:
+            _plot_comparison(original_sample[column_name], new_sample[column_name], name=column_name, path=path, seed=seed,
+                             descriptors=(original_column, new_descriptors[column_name]))
+            if path is None:
+                print(f"Changes in column '{column_name}': {changes}")
+        result[column_name] = changes.get_json()
+
+    return result
+
+EVOLUTION_STATS = ["count", "mean", "std", "min_val", "max_val", "q1", "q2", "q3"]
+
+@profiled("univariate.get_descriptor_evolution")
+def get_descriptor_evolution(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Computes the descriptors of every numeric column of every DataFrame in one stacked computation:
+    the DataFrames are concatenated under a batch key, the moments are groupby reductions over all
+    the columns at once and the quartiles come from a single sort of every batch. Returns a long table
+    with one row per batch and column and one column per statistic of EVOLUTION_STATS.
+    Polars DataFrames and Arrow tables are reduced batch by batch by their own aggregations instead.
+    """
+    if backends.is_native(dfs[0]):
+        columns = [column for column in backends.column_names(dfs[0]) if not backends.is_categorical(dfs[0], column)]
+        statistics = [backends.numeric_statistics(df, columns) for df in dfs]
+        table = pd.DataFrame([
+            {"batch": batch, "column": column, **{stat: batch_statistics[column][stat] for stat in EVOLUTION_STATS}}
+            for batch, batch_statistics in enumerate(statistics) for column in columns
+        ], columns=["batch", "column"] + EVOLUTION_STATS)
+        table["count"] = table["count"].astype(np.int64)
+        return table
+
+    columns = [column for column in dfs[0].columns if not is_categorical(dfs[0][column])]
+    stacked = pd.concat([df[columns] for df in dfs], keys=range(len(dfs)), names=["batch", None])
+    grouped = stacked.groupby(level="batch")
+
+    with span("univariate.evolution_reduce"):
+        reductions = [grouped.count(), grouped.mean(), grouped.std(), grouped.min(), grouped.max()]
+        values = np.stack([reduction.to_numpy(dtype=float) for reduction in reductions], axis=-1)
+        bounds = np.cumsum([0] + [len(df) for df in dfs])
+        quartiles = _batch_quantiles(stacked.to_numpy(dtype=float), bounds, [0.25, 0.5, 0.75])
+        # (batches x columns x stats)
+        values = np.concatenate([values, quartiles], axis=-1)
+
+    index = pd.MultiIndex.from_product([range(len(dfs)), columns], names=["batch", "column"])
+    table = pd.DataFrame(values.reshape(-1, len(EVOLUTION_STATS)), index=index, columns=EVOLUTION_STATS).reset_index()
+    table["count"] = table["count"].astype(np.int64)
+
+    return table
+
+def _batch_quantiles(values: np.ndarray, bounds: np.ndarray, quantiles: list[float]) -> np.ndarray:
+    """
+    Returns the (batches x columns x quantiles) linear-interpolation quantiles of the non-missing values of every
+    column of every block of rows between consecutive `bounds`, sorting each block once for all its columns.
+    """
+    result = np.full((len(bounds) - 1, values.shape[1], len(quantiles)), np.nan)
+    columns = np.arange(values.shape[1])
+    for batch, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        if start == end:
+            continue
+        # NaNs are sorted last, so the first `counts` values of every column are the non-missing ones
+        block = np.sort(values[start:end], axis=0)
+        counts = np.count_nonzero(~np.isnan(block), axis=0)
+        valid = counts > 0
+        for i, q in enumerate(quantiles):
+            position = q * np.maximum(counts - 1, 0)
+            low = np.floor(position).astype(np.int64)
+            high = np.minimum(low + 1, np.maximum(counts - 1, 0))
+            fraction = position - low
+            quantile = block[low, columns] * (1 - fraction) + block[high, columns] * fraction
+            result[batch, :, i] = np.where(valid, quantile, np.nan)
+
+    return result
+
+def write_descriptor_evolution(table: pd.DataFrame, path: str, file_format: str = "csv") -> str:
+    """
+    Writes the table of get_descriptor_evolution to `{path}/descriptor_evolution.csv` or `.parquet` and returns its file name.
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unknown file format: {file_format}")
+
+    file_name = f"{path}/descriptor_evolution.{file_format}"
+    save_table(file_name, table)
+    return file_name
+
+def plot_descriptor_evolution(table: pd.DataFrame, name: str, path: str = None):
+    """
+    Plots the evolution of the descriptors of one column from the table of get_descriptor_evolution.
+    """
+    column_table = table[table["column"] == name].sort_values("batch")
 
     plt.figure(figsize=(10, 6))
     plt.suptitle(f"Evolution of {name}")
 
-    for i, (title, values, ylabel) in enumerate([
-        ('Mean Evolution', [d.mean for d in descriptors], 'Mean'),
-        ('Standard Deviation Evolution', [d.std for d in descriptors], 'Standard Deviation'),
-        ('Q1 Evolution', [d.q1 for d in descriptors], 'Q1'),
-        ('Q2 Evolution', [d.q2 for d in descriptors], 'Q2'),
-        ('Q3 Evolution', [d.q3 for d in descriptors], 'Q3')
+    for i, (title, stat, ylabel) in enumerate([
+        ('Mean Evolution', 'mean', 'Mean'),
+        ('Standard Deviation Evolution', 'std', 'Standard Deviation'),
+        ('Q1 Evolution', 'q1', 'Q1'),
+        ('Q2 Evolution', 'q2', 'Q2'),
+        ('Q3 Evolution', 'q3', 'Q3')
     ], 1):
         plt.subplot(2, 3, i)
-        plt.plot(values, marker='o', linestyle='-', label=title)
+        plt.plot(column_table[stat].to_numpy(), marker='o', linestyle='-', label=title)
         plt.title(title)
         plt.xlabel('Index')
         plt.ylabel(ylabel)
         plt.grid(True)
         plt.tight_layout(pad=2.0)
 
+    _save_evolution_figure(name, path)
+
+def _save_evolution_figure(name: str, path: str):
+    """
+    Saves the current evolution figure of a column under `path`, or shows it.
+    """
     if path:
-        os.makedirs(path, exist_ok=True)
-        plt.savefig(f"{path}/descriptor_evolution_{name if name else 'unnamed'}.png")
-        plt.close()
+        with span("univariate.savefig"):
+            save_figure(f"{path}/descriptor_evolution_{name if name else 'unnamed'}.png")
     else:
         plt.show()
 
-def descriptor_evolution_all_columns(dfs: list[pd.DataFrame], path: str = None):
+@profiled("univariate.descriptor_evolution")
+def descriptor_evolution(dfs: list[pd.Series], name: str = None, path: str = None):
+    """
+    Compares the evolution of descriptors across different DataFrames.
+    """
+    if not is_categorical(dfs[0]):
+        table = get_descriptor_evolution([df.to_frame(name) for df in dfs])
+        plot_descriptor_evolution(table, name, path=path)
+        return
+
+    descriptors = [get_distribution_descriptors(df) for df in dfs]
+
+    plt.figure(figsize=(10, 6))
+    plt.suptitle(f"Evolution of {name}")
+
+    # Share of each of the original categories across the DataFrames
+    for category in descriptors[0].frequencies:
+        shares = [d.frequencies.get(category, 0) / d.count if d.count else 0 for d in descriptors]
+        plt.plot(shares, marker='o', linestyle='-', label=category)
+    plt.title('Category Share Evolution')
+    plt.xlabel('Index')
+    plt.ylabel('Share')
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout(pad=2.0)
+
+    _save_evolution_figure(name, path)
+
+@profiled("univariate.descriptor_evolution_all_columns")
+def descriptor_evolution_all_columns(dfs: list[pd.DataFrame], path: str = None, plot: bool = True, file_format: str = "csv") -> pd.DataFrame:
     """
     Compares the evolution of descriptors across different DataFrames.
+    The descriptors of the numeric columns are computed at once by get_descriptor_evolution and,
+    when a path is given, written to descriptor_evolution.csv (or .parquet). The figures are views
+    over that table, drawn only when `plot` is True. Returns the table.
     """
-    for column_name in dfs[0].columns:
-        series_list = [df[column_name] for df in dfs]
-        descriptor_evolution(series_list, name=column_name, path=path)
+    table = get_descriptor_evolution(dfs)
+    if path:
+        write_descriptor_evolution(table, path, file_format)
+
+    if plot:
+        numeric_columns = set(table["column"])
+        for column_name in backends.column_names(dfs[0]):
+            if column_name in numeric_columns:
+                plot_descriptor_evolution(table, column_name, path=path)
+            elif backends.is_native(dfs[0]):
+                # Only the frequency tables are needed, a column of categories is small next to the table
+                descriptor_evolution([backends.to_pandas(backends.select_columns(df, [column_name]))[column_name] for df in dfs], name=column_name, path=path)
+            else:
+                descriptor_evolution([df[column_name] for df in dfs], name=column_name, path=path)
+
+    return table
     
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+from data_degradation_detector import artifacts
+
+
+class TestArtifacts(unittest.TestCase):
+    """Unit tests for the background writer of the report artifacts."""
+
+    def _write_artifacts(self, path: str, output_format: str):
+        with artifacts.writing(artifacts.ArtifactWriter(path, output_format)) as writer:
+            artifacts.save_json(f"{path}/degraded_0/distribution_comparison_0.json", {"a": {"changed": {}}})
+            plt.plot([0, 1], [1, 0])
+            artifacts.save_figure(f"{path}/evolution/descriptor_evolution_a.png")
+            artifacts.save_table(f"{path}/evolution/descriptor_evolution.csv", pd.DataFrame({"batch": [0, 1], "mean": [0.5, 1.5]}))
+        self.assertEqual(writer.written, 3)
+
+    def test_files(self):
+        """Test that the files format keeps one file per artifact."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._write_artifacts(temp_dir, "files")
+            with open(f"{temp_dir}/degraded_0/distribution_comparison_0.json") as f:
+                self.assertEqual(json.load(f), {"a": {"changed": {}}})
+            self.assertTrue(os.path.getsize(f"{temp_dir}/evolution/descriptor_evolution_a.png") > 0)
+            self.assertEqual(pd.read_csv(f"{temp_dir}/evolution/descriptor_evolution.csv")["mean"].tolist(), [0.5, 1.5])
+
+    def test_archives(self):
+        """Test that the archive formats write the results to report.jsonl and the figures to a single file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._write_artifacts(temp_dir, "jsonl")
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["figures.zip", "report.jsonl"])
+            results = artifacts.read_results(temp_dir)
+            self.assertEqual(results["degraded_0/distribution_comparison_0.json"], {"a": {"changed": {}}})
+            self.assertEqual(results["evolution/descriptor_evolution.csv"], [{"batch": 0, "mean": 0.5}, {"batch": 1, "mean": 1.5}])
+            self.assertEqual(zipfile.ZipFile(f"{temp_dir}/figures.zip").namelist(), ["evolution/descriptor_evolution_a.png"])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self._write_artifacts(temp_dir, "html")
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["report.html", "report.jsonl"])
+            with open(f"{temp_dir}/report.html") as f:
+                content = f.read()
+            self.assertIn("data:image/png;base64,", content)
+            self.assertTrue(content.endswith("</html>\n"))
+
+    def test_errors(self):
+        """Test that an error of the background thread is raised in the caller."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(TypeError):
+                with artifacts.writing(artifacts.ArtifactWriter(temp_dir, "jsonl")):
+                    artifacts.save_json(f"{temp_dir}/invalid.json", {"value": object()})
+
+        # The error of the report is kept over that of the writer, which is only logged
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(KeyError), self.assertLogs("data_degradation_detector.artifacts"):
+                with artifacts.writing(artifacts.ArtifactWriter(temp_dir, "jsonl")):
+                    artifacts.save_json(f"{temp_dir}/invalid.json", {"value": object()})
+                    raise KeyError("report")
+
+        with self.assertRaises(ValueError):
+            artifacts.ArtifactWriter(".", "xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import importlib.util
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import backends
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector import univariate as uv
+
+
+class TestBackends(unittest.TestCase):
+    """Unit tests for the statistics computed natively on Polars DataFrames and Arrow tables."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        rows = 2000
+        self.original = pd.DataFrame({
+            "normal": rng.normal(0, 1, rows),
+            "counts": rng.integers(0, 10, rows),
+            "color": rng.choice(["red", "green", "blue"], rows),
+            "flag": rng.random(rows) > 0.3
+        })
+        self.original.loc[::7, "normal"] = np.nan
+        self.new_data = self.original.assign(normal=self.original["normal"] + 0.5)
+
+    def _check_backend(self, convert):
+        original, new_data = convert(self.original), convert(self.new_data)
+        self.assertTrue(backends.is_native(original))
+
+        descriptors = uv.get_distribution_descriptors_all_columns(original)
+        expected = uv.get_distribution_descriptors_all_columns(self.original)
+        self.assertEqual(set(descriptors), set(expected))
+        for column, column_descriptors in expected.items():
+            for name, value in column_descriptors.get_json().items():
+                if isinstance(value, float):
+                    self.assertAlmostEqual(descriptors[column].get_json()[name], value, places=9)
+                else:
+                    self.assertEqual(descriptors[column].get_json()[name], value)
+
+        histograms = uv.get_histograms_all_columns(original)
+        self.assertEqual(histograms, uv.get_histograms_all_columns(self.original))
+
+        changes = uv.compare_to_baseline(descriptors, histograms, new_data)
+        expected_changes = uv.compare_to_baseline(expected, histograms, self.new_data)
+        self.assertEqual({column: list(c["changed"]) for column, c in changes.items()}, {column: list(c["changed"]) for column, c in expected_changes.items()})
+        self.assertEqual(changes["normal"]["drift_tests"]["drifted"], expected_changes["normal"]["drift_tests"]["drifted"])
+
+        pd.testing.assert_frame_equal(mv.correlation_matrix(original, plot=False), mv.correlation_matrix(self.original, plot=False))
+        pd.testing.assert_frame_equal(mv.select_numeric_columns(original), mv.select_numeric_columns(self.original).astype(float))
+
+    @unittest.skipUnless(importlib.util.find_spec("polars"), "polars is not installed")
+    def test_polars(self):
+        """Test the statistics of a Polars DataFrame against those of pandas."""
+        import polars as pl
+        self._check_backend(pl.from_pandas)
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_arrow(self):
+        """Test the statistics of an Arrow table against those of pandas."""
+        import pyarrow as pa
+        self._check_backend(lambda df: pa.Table.from_pandas(df, preserve_index=False))
+
+    def test_pandas(self):
+        """Test that pandas DataFrames keep the pandas computations."""
+        self.assertEqual(backends.backend_of(self.original), "pandas")
+        self.assertFalse(backends.is_native(self.original))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import batch
+
+
+class TestBatch(unittest.TestCase):
+    """Unit tests for the driver running the report jobs of a manifest."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = self.temp_dir.name
+        rng = np.random.default_rng(0)
+        centers = np.repeat([[0, 0], [5, 5]], 150, axis=0)
+        df = pd.DataFrame(centers + rng.normal(0, 1, centers.shape), columns=["a", "b"])
+        df["target"] = rng.integers(0, 2, len(df))
+        df["id"] = range(len(df))
+        shifted = df.copy()
+        shifted["a"] = shifted["a"] + 10
+
+        df.to_csv(f"{self.path}/dataset.csv", index=False)
+        df.sample(200, random_state=1).to_csv(f"{self.path}/batch_0.csv", index=False)
+        shifted.to_csv(f"{self.path}/batch_1.csv", index=False)
+        self.job = {
+            "name": "blobs",
+            "dataset": f"{self.path}/dataset.csv",
+            "target": "target",
+            "batches": [f"{self.path}/batch_0.csv", f"{self.path}/batch_1.csv"],
+            "base_metrics": {"accuracy": 0.9},
+            "new_metrics": [{"accuracy": 0.9}, {"accuracy": 0.6}],
+            "number_of_output_classes": 2,
+            "drop_columns": ["id"]
+        }
+
+    def tearDown(self):
+        """Remove the files of the jobs."""
+        self.temp_dir.cleanup()
+
+    def _write_manifest(self, manifest) -> str:
+        with open(f"{self.path}/manifest.json", 'w') as f:
+            json.dump(manifest, f)
+        return f"{self.path}/manifest.json"
+
+    def test_load_manifest(self):
+        """Test that the jobs are read from a list or a "jobs" object and that invalid manifests are rejected."""
+        self.assertEqual(batch.load_manifest(self._write_manifest({"jobs": [self.job]})), [self.job])
+        self.assertEqual(batch.load_manifest(self._write_manifest([self.job])), [self.job])
+
+        with self.assertRaises(ValueError):
+            batch.load_manifest(self._write_manifest([self.job, self.job]))
+        with self.assertRaises(ValueError):
+            batch.load_manifest(self._write_manifest([{**self.job, "base_metrics": {}}]))
+        with self.assertRaises(ValueError):
+            batch.load_manifest(self._write_manifest([{**self.job, "new_metrics": [{"accuracy": 0.9}]}]))
+
+    def test_run_job(self):
+        """Test that a job creates its baseline and report and returns the drift verdict of its batches."""
+        result = batch.run_job(self.job, f"{self.path}/output", plot_sample_size=100)
+        self.assertEqual(result["baseline"], f"{self.path}/output/blobs/baseline")
+        self.assertTrue(os.path.exists(f"{result['baseline']}/kmeans_clusters.json"))
+        self.assertTrue(os.path.exists(f"{result['report']}/metrics_evolution.png"))
+        self.assertEqual(len(result["verdict"]["batches"]), 2)
+        self.assertIn("a", result["verdict"]["batches"][1]["drifted_columns"])
+
+        # A job without base metrics still runs, without the metrics evolution
+        job = {**self.job, "name": "no_metrics", "base_metrics": {}}
+        result = batch.run_job(job, f"{self.path}/output")
+        self.assertFalse(os.path.exists(f"{result['report']}/metrics_evolution.png"))
+
+    def test_run_manifest(self):
+        """Test that a failing job is recorded in index.json without stopping the others."""
+        failing = {**self.job, "name": "missing", "dataset": f"{self.path}/missing.csv"}
+        results = batch.run_manifest([self.job, failing], f"{self.path}/output", max_workers=2)
+        self.assertEqual([result["status"] for result in results], ["ok", "failed"])
+        self.assertIn("FileNotFoundError", results[1]["error"])
+
+        with open(f"{self.path}/output/index.json", 'r') as f:
+            index = json.load(f)
+        self.assertEqual((index["jobs"], index["failed"], index["drifted"]), (2, 1, 1))
+        self.assertEqual([result["name"] for result in index["results"]], ["blobs", "missing"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import calibration as cal
+from data_degradation_detector import univariate as uv
+
+
+class TestCalibration(unittest.TestCase):
+    """Unit tests for the bootstrap calibration of the drift thresholds."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.rng = np.random.default_rng(0)
+        self.original = self._batch(50000)
+        self.descriptors = uv.get_distribution_descriptors_all_columns(self.original)
+        self.histograms = uv.get_histograms_all_columns(self.original)
+        self.thresholds = cal.calibrate_thresholds(self.original, self.descriptors, self.histograms, false_alarm_rate=0.05, batch_size=1000)
+
+    def _batch(self, rows: int, shift: float = 0.0) -> pd.DataFrame:
+        return pd.DataFrame({
+            "normal": self.rng.normal(shift, 1, rows),
+            "zeros": self.rng.poisson(0.2 + shift, rows).astype(float),
+            "color": self.rng.choice(["red", "green", "blue"], rows, p=[0.5 - shift / 2, 0.3, 0.2 + shift / 2])
+        })
+
+    def _drifted(self, batch: pd.DataFrame) -> dict:
+        result = uv.compare_to_baseline(self.descriptors, self.histograms, batch, thresholds=self.thresholds)
+        return {column: bool(changes["changed"] or changes.get("drift_tests", {}).get("drifted")) for column, changes in result.items()}
+
+    def test_thresholds(self):
+        """Test the metrics calibrated for every type of column."""
+        self.assertEqual(set(self.thresholds["normal"]), set(cal.DESCRIPTOR_METRICS + cal.HISTOGRAM_METRICS))
+        self.assertEqual(set(self.thresholds["color"]), {"psi", "alpha"})
+        # The mean of 1000 standard normal values moves by about 1 / sqrt(1000)
+        self.assertAlmostEqual(self.thresholds["normal"]["mean"], 2.7 / np.sqrt(1000), delta=0.02)
+        # Quartiles that are always zero get a tiny threshold instead of a zero one
+        self.assertGreater(self.thresholds["zeros"]["q1"], 0)
+        self.assertLess(self.thresholds["zeros"]["q1"], 1e-9)
+
+    def test_false_alarm_rate(self):
+        """Test that batches of the original distribution rarely drift and shifted ones do."""
+        false_alarms = np.mean([list(self._drifted(self._batch(1000)).values()) for _ in range(100)], axis=0)
+        self.assertTrue((false_alarms <= 0.12).all(), false_alarms)
+
+        self.assertEqual(self._drifted(self._batch(1000, shift=0.2)), {"normal": True, "zeros": True, "color": True})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
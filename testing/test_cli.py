@@ -0,0 +1,154 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import cli
+from data_degradation_detector import report
+from data_degradation_detector import univariate as uv
+from data_degradation_detector.histograms import get_edges
+from data_degradation_detector.streaming import describe_chunks, histogram_chunks
+
+
+class TestCli(unittest.TestCase):
+    """Unit tests for the subcommands of the command-line interface and the chunked baseline."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = self.temp_dir.name
+        rng = np.random.default_rng(0)
+        centers = np.repeat([[0, 0, 10], [5, 5, 20]], 200, axis=0)
+        self.df = pd.DataFrame(centers + rng.normal(0, 1, centers.shape), columns=["a", "b", "c"])
+        self.df["color"] = rng.choice(["red", "green"], len(self.df))
+        self.df["target"] = rng.integers(0, 2, len(self.df))
+        self.df["Id"] = range(len(self.df))
+        shifted = self.df.copy()
+        shifted["a"] = shifted["a"] + 10
+
+        self.df.to_csv(f"{self.path}/data.csv", index=False)
+        self.df.to_csv(f"{self.path}/batch_0.csv", index=False)
+        shifted.to_csv(f"{self.path}/batch_1.csv", index=False)
+        self.batches = [f"{self.path}/batch_0.csv", f"{self.path}/batch_1.csv"]
+
+    def tearDown(self):
+        """Remove the files of the subcommands."""
+        self.temp_dir.cleanup()
+
+    def _run(self, *argv) -> tuple[int, list[dict]]:
+        """Run a subcommand with --jsonl and return its exit status and records."""
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            status = cli.main([*argv, "--jsonl"])
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def _baseline(self, *options) -> str:
+        output = f"{self.path}/baseline"
+        status, _ = self._run("baseline", f"{self.path}/data.csv", "--target", "target", "--drop", "Id", "--output", output,
+                              "--classes", "2", "--no-plot", *options)
+        self.assertEqual(status, 0)
+        return output
+
+    def test_baseline_and_compare(self):
+        """Test the baseline and compare subcommands, serially and with workers, and the exit status on drift."""
+        baseline = self._baseline("--segment", "color")
+        self.assertTrue(os.path.exists(f"{baseline}/segments.json"))
+        self.assertFalse(os.path.exists(f"{baseline}/multivariate_drift.json"))
+
+        compare = ["compare", baseline, *self.batches, "--target", "target", "--drop", "Id"]
+        status, records = self._run(*compare)
+        self.assertEqual(status, 0)
+        self.assertEqual([record["drifted_columns"] for record in records], [[], ["a"]])
+        self.assertIn("drifted_segments", records[1])
+        self.assertNotIn("multivariate_drift", records[1])
+
+        status, parallel = self._run(*compare, "--workers", "2", "--fail-on-drift")
+        self.assertEqual(status, 2)
+        self.assertEqual(parallel, records)
+
+        status, chunks = self._run(*compare, "--chunksize", "200")
+        self.assertEqual([record["batch"] for record in chunks], [f"{path}#{i}" for path in self.batches for i in range(2)])
+
+    def test_binary_baseline(self):
+        """Test that the baseline reloaded from baseline.npz matches the one reloaded from the JSON files."""
+        baseline = self._baseline("--binary", "--segment", "color", "--multivariate-drift")
+        from_npz = report.load_baseline(baseline)
+        json_only = f"{self.path}/json_only"
+        shutil.copytree(baseline, json_only, ignore=shutil.ignore_patterns("baseline.npz"))
+        from_json = report.load_baseline(json_only)
+
+        self.assertEqual(from_npz["base_metrics"], from_json["base_metrics"])
+        self.assertEqual(from_npz["thresholds"], from_json["thresholds"])
+        self.assertEqual(list(from_npz["descriptors"]), list(from_json["descriptors"]))
+        for column, descriptors in from_json["descriptors"].items():
+            np.testing.assert_equal(from_npz["descriptors"][column].get_json(), descriptors.get_json())
+        for column, histogram in from_json["histograms"].items():
+            np.testing.assert_array_equal(from_npz["histograms"][column].edges, histogram.edges)
+            np.testing.assert_array_equal(from_npz["histograms"][column].counts, histogram.counts)
+        np.testing.assert_equal(from_npz["clusters"].get_json(), from_json["clusters"].get_json())
+        pd.testing.assert_frame_equal(from_npz["correlation"], from_json["correlation"])
+        np.testing.assert_equal(from_npz["segments"].get_json(), from_json["segments"].get_json())
+        np.testing.assert_equal(from_npz["multivariate_drift"].get_json(), from_json["multivariate_drift"].get_json())
+
+        # The segment and multivariate baselines are numeric arrays, restored without refitting the precision matrix
+        with np.load(f"{baseline}/baseline.npz", allow_pickle=False) as data:
+            self.assertNotIn("segments", data)
+            self.assertNotIn("multivariate_drift", data)
+            self.assertEqual(data["segment_descriptors"].dtype, float)
+            self.assertEqual(data["multivariate_reference"].dtype, float)
+            np.testing.assert_array_equal(from_npz["multivariate_drift"]._precision, data["multivariate_precision"])
+
+    def test_chunked_baseline(self):
+        """Test that the chunked descriptors and histograms match those of the whole data."""
+        X = self.df.drop(columns=["target", "Id"])
+        chunks = [X.iloc[i:i + 150] for i in range(0, len(X), 150)]
+        descriptors, sample = describe_chunks(chunks, sample_size=len(X))
+        self.assertEqual(len(sample), len(X))
+
+        expected = uv.get_distribution_descriptors_all_columns(X)
+        self.assertEqual(descriptors["color"].get_json(), expected["color"].get_json())
+        for column in ["a", "b", "c"]:
+            for name, value in expected[column].get_json().items():
+                self.assertAlmostEqual(getattr(descriptors[column], name), value, places=6)
+
+        edges = {column: get_edges(X[column].to_numpy(), 10) for column in ["a", "b", "c"]}
+        histograms = histogram_chunks(chunks, edges)
+        for column, column_edges in edges.items():
+            np.testing.assert_array_equal(histograms[column].counts, uv.get_histogram(X[column], edges=column_edges).counts)
+
+        baseline = self._baseline("--chunksize", "150")
+        self.assertEqual(report.load_baseline(baseline)["clusters"].num_clusters, 2)
+
+    def test_report_rollup_and_batch(self):
+        """Test the report, rollup and batch subcommands on the tiny CSV files."""
+        baseline = self._baseline()
+        status, records = self._run("report", baseline, f"{self.path}/data.csv", *self.batches, "--target", "target", "--drop", "Id",
+                                    "--output", f"{self.path}/report", "--no-plot", "--multivariate-drift")
+        self.assertEqual(status, 0)
+        self.assertEqual([record["batch"] for record in records], self.batches)
+        self.assertIn("multivariate_drift", records[1])
+        self.assertTrue(os.path.exists(f"{self.path}/report/clusters/cluster_comparison_1.json"))
+        self.assertTrue(os.path.exists(f"{self.path}/report/clusters/multivariate_drift_1.json"))
+
+        status, records = self._run("rollup", f"{self.path}/store", *self.batches, "--timestamps", "2024-05-01 13:00", "2024-05-01 14:00",
+                                    "--baseline", baseline, "--drop", "Id", "--target", "target", "--evolution", "day",
+                                    "--output", f"{self.path}/evolution", "--no-plot")
+        self.assertEqual(status, 0)
+        self.assertEqual(len(records), 2)
+        self.assertTrue(os.path.exists(f"{self.path}/store/rollups.json"))
+        self.assertTrue(os.path.exists(f"{self.path}/evolution/descriptor_evolution.csv"))
+
+        with open(f"{self.path}/manifest.json", 'w') as f:
+            json.dump([{"name": "tiny", "dataset": f"{self.path}/data.csv", "target": "target", "batches": self.batches,
+                        "number_of_output_classes": 2, "drop_columns": ["Id"]}], f)
+        status, records = self._run("batch", f"{self.path}/manifest.json", "--output", f"{self.path}/jobs", "--workers", "1")
+        self.assertEqual(status, 0)
+        self.assertEqual([record["status"] for record in records], ["ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()
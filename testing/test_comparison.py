@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector import report
+from data_degradation_detector import univariate as uv
+
+
+class TestComparison(unittest.TestCase):
+    """Unit tests for the lazy comparison of batches against a baseline."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        centers = np.repeat([[10, 10, 10], [20, 10, 20], [10, 20, 30]], 2000, axis=0)
+        self.df = pd.DataFrame(centers + rng.normal(0, 1, centers.shape), columns=["a", "b", "c"])
+        self.df["color"] = pd.Categorical(rng.choice(["red", "green"], len(self.df)))
+        numeric = self.df[["a", "b", "c"]]
+        self.baseline = {
+            "descriptors": uv.get_distribution_descriptors_all_columns(self.df),
+            "histograms": uv.get_histograms_all_columns(self.df),
+            "clusters": mv.get_cluster_defined_number(numeric, 3, plot=False),
+            "thresholds": {}
+        }
+        shifted = self.df.sample(3000, random_state=2)
+        shifted["b"] = shifted["b"] + 10
+        self.batches = [self.df.sample(3000, random_state=1), shifted, self.df.sample(3000, random_state=3)]
+
+    def test_short_circuit(self):
+        """Test that the drift queries stop at the first drift found and that the results are memoized."""
+        comparison = report.compare_batches(self.baseline, self.batches)
+        self.assertEqual(comparison.first_drifting_batch(), 1)
+        self.assertNotIn(2, comparison._comparisons)
+
+        batch = comparison[1]
+        self.assertEqual(batch.first_drifting_column(), "b")
+        self.assertEqual(set(batch._columns), {"a", "b"})
+        self.assertNotIn("clusters", batch._cache)
+        self.assertIs(batch.column("b"), comparison[1].column("b"))
+        self.assertIs(comparison[-2], batch)
+
+        with self.assertRaises(ValueError):
+            batch.column("missing")
+        with self.assertRaises(ValueError):
+            comparison.evolution("color")
+
+    def test_full_results(self):
+        """Test that the lazy results agree with the eager comparison and the drift verdict."""
+        comparison = report.compare_batches(self.baseline, self.batches)
+        for i, batch in enumerate(self.batches):
+            self.assertEqual(comparison[i].distribution_comparison(),
+                             uv.compare_to_baseline(self.baseline["descriptors"], self.baseline["histograms"], batch))
+
+        verdict = comparison.get_verdict()
+        self.assertEqual([batch["drifted_columns"] for batch in verdict["batches"]], [[], ["b"], []])
+        self.assertEqual([batch["drifted"] for batch in verdict["batches"]], [comparison[i].drifted for i in range(3)])
+        self.assertTrue(verdict["drifted"])
+        self.assertEqual(comparison[1].get_json()["cluster_comparison"], comparison[1].clusters().get_json())
+
+        evolution = comparison.evolution("b")
+        self.assertEqual(list(evolution.columns), uv.EVOLUTION_STATS)
+        np.testing.assert_allclose(evolution["mean"], [batch["b"].mean() for batch in self.batches])
+        np.testing.assert_array_equal(evolution["count"], [3000] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
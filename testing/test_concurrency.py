@@ -0,0 +1,49 @@
+import os
+import unittest
+import numpy as np
+from threadpoolctl import threadpool_info
+from data_degradation_detector import concurrency
+from data_degradation_detector import multivariate as mv
+
+
+def _worker_threads() -> tuple[list[int], str]:
+    return [pool["num_threads"] for pool in threadpool_info()], os.environ["OMP_NUM_THREADS"]
+
+
+class TestConcurrency(unittest.TestCase):
+    """Unit tests for the coordination of the native threads with the process pools."""
+
+    def tearDown(self):
+        """Restore the default number of threads per worker."""
+        concurrency.set_threads_per_worker(None)
+
+    def test_threads_per_worker(self):
+        """Test that the cores are divided among the workers unless the threads are set, and that the workers are limited."""
+        cpu_count = concurrency.get_cpu_count()
+        self.assertEqual(concurrency.get_threads_per_worker(1), cpu_count)
+        self.assertEqual(concurrency.get_threads_per_worker(2 * cpu_count), 1)
+        self.assertEqual(concurrency.get_threads_per_worker(), 1)
+
+        concurrency.set_threads_per_worker(3)
+        self.assertEqual(concurrency.get_threads_per_worker(2), 3)
+        with concurrency.process_pool(2) as executor:
+            threads, variable = executor.submit(_worker_threads).result()
+        self.assertEqual(set(threads), {3})
+        self.assertEqual(variable, "3")
+
+        with self.assertRaises(ValueError):
+            concurrency.set_threads_per_worker(0)
+
+    def test_parallel_sweep(self):
+        """Test that the cluster counts fitted in parallel find the same clustering as the serial sweep."""
+        rng = np.random.default_rng(0)
+        X = np.vstack([rng.normal(center, 0.5, (200, 3)) for center in [0, 5, 10]])
+        serial = mv.get_best_clusters(X, plot=False)
+        parallel = mv.get_best_clusters(X, plot=False, max_workers=2)
+        self.assertEqual(serial.num_clusters, 3)
+        self.assertEqual(parallel.num_clusters, serial.num_clusters)
+        self.assertAlmostEqual(parallel.silhouette_score, serial.silhouette_score)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from sklearn.cluster import KMeans
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector.coreset import Coreset
+
+
+class TestCoreset(unittest.TestCase):
+    """Unit tests for the coreset the clustering of massive reference datasets is fitted on."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        centers = 10 * np.eye(4, 3)
+        self.X = rng.permutation(np.vstack([rng.normal(center, 1, (25_000, 3)) for center in centers]))
+
+    def test_coreset_cost(self):
+        """Test that the weighted cost of centroids on the coreset is close to their cost on every row."""
+        coreset = Coreset(self.X, 2000, chunk_size=10_000)
+        self.assertEqual((coreset.size, coreset.rows), (2000, 100_000))
+        self.assertAlmostEqual(coreset.weights.sum() / len(self.X), 1, delta=0.05)
+
+        for num_clusters in [2, 4, 8]:
+            centroids = KMeans(num_clusters, random_state=0, n_init=1).fit(self.X[:5000]).cluster_centers_
+            cost = ((self.X - centroids[mv.nearest_centroids(self.X, centroids)[0]]) ** 2).sum()
+            coreset_cost = ((coreset.points - centroids[mv.nearest_centroids(coreset.points, centroids)[0]]) ** 2).sum(axis=1) @ coreset.weights
+            self.assertAlmostEqual(coreset_cost / cost, 1, delta=0.1)
+
+        restored = Coreset(json_data=coreset.get_json())
+        np.testing.assert_array_equal(restored.weights, coreset.weights)
+        self.assertEqual(Coreset(self.X[:100], 2000).epsilon(4), 0)
+        with self.assertRaises(ValueError):
+            Coreset(self.X, 0)
+
+    def test_coreset_clustering(self):
+        """Test that the cluster sweep on the coreset finds the clusters of the data and stores the guarantee of the coreset."""
+        cluster_info = mv.get_best_clusters(self.X, plot=False, coreset_size=2000)
+        self.assertEqual(cluster_info.num_clusters, 4)
+        np.testing.assert_allclose(cluster_info.labels_percentages, [25] * 4, atol=3)
+        self.assertEqual(cluster_info.coreset["size"], 2000)
+        self.assertEqual(cluster_info.coreset["rows"], 100_000)
+        self.assertGreater(cluster_info.coreset["epsilon"], 0)
+
+        restored = mv.get_cluster_info_from_json(cluster_info.get_json())
+        self.assertEqual(restored.coreset, cluster_info.coreset)
+
+    def test_coreset_radius(self):
+        """Test that the radius of a coreset baseline covers every row, so a batch of the same distribution is not flagged."""
+        cluster_info = mv.get_cluster_defined_number(self.X, 4, plot=False, coreset_size=2000, silhouette_sample_size=2000)
+        labels, distances = mv.nearest_centroids(self.X, cluster_info.centroids)
+        for label in range(4):
+            self.assertAlmostEqual(cluster_info.radius[label], distances[labels == label].max())
+
+        rng = np.random.default_rng(1)
+        batch = np.vstack([rng.normal(center, 1, (25_000, 3)) for center in 10 * np.eye(4, 3)])
+        changes = mv.compare_clusters(cluster_info, mv.get_cluster_defined_number(batch, 4, plot=False, silhouette_sample_size=2000))
+        self.assertFalse([name for name in changes.changed if name.startswith("radius")])
+
+
+if __name__ == '__main__':
+    unittest.main()
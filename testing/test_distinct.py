@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector import univariate as uv
+from data_degradation_detector.distinct import HyperLogLog
+from data_degradation_detector.rollups import get_column_states, merge_states
+from data_degradation_detector.streaming import describe_chunks
+
+
+class TestDistinct(unittest.TestCase):
+    """Unit tests for the distinct counts, the data quality counters and the handling of missing values in the clustering."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            "value": rng.normal(0, 1, 10_000),
+            "level": rng.integers(0, 20, 10_000).astype(float)
+        })
+
+    def test_hyperloglog(self):
+        """Test that the estimate is close to the distinct count, and that merged and restored sketches estimate all the values."""
+        values = np.arange(100_000, dtype=float)
+        sketch = HyperLogLog().update(values)
+        self.assertLess(abs(sketch.estimate() - 100_000) / 100_000, 0.05)
+        self.assertEqual(HyperLogLog().update(np.array([1, 2, 2, 3], dtype=np.int32)).estimate(), 3)
+        self.assertEqual(HyperLogLog().update(np.array([0.0, -0.0])).estimate(), 1)
+
+        merged = HyperLogLog().update(values[:60_000]).merge(HyperLogLog().update(values[40_000:]))
+        np.testing.assert_array_equal(merged.registers, sketch.registers)
+        restored = HyperLogLog(json_data=sketch.get_json())
+        self.assertEqual(restored.estimate(), sketch.estimate())
+
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=20)
+        with self.assertRaises(ValueError):
+            sketch.merge(HyperLogLog(precision=10))
+
+    def test_quality_counters(self):
+        """Test that the counters agree over the in-memory, chunked and rolled-up passes, and that a batch of missing values is flagged."""
+        df = self.df.copy()
+        df.loc[:99, "value"] = np.nan
+        df.loc[100:109, "value"] = np.inf
+        df.loc[110:119, "value"] = 0.0
+
+        descriptors = uv.DistributionDescriptors(df["value"])
+        self.assertEqual((descriptors.count, descriptors.null_count, descriptors.inf_count, descriptors.zero_count), (10_000, 100, 10, 10))
+        self.assertTrue(np.isfinite(descriptors.max_val))
+        self.assertEqual(uv.DistributionDescriptors(df["level"]).distinct_count, 20)
+
+        chunked, _ = describe_chunks([df.iloc[i:i + 3000] for i in range(0, len(df), 3000)])
+        edges = {"value": np.linspace(-5, 5, 21), "level": np.linspace(0, 20, 21)}
+        states = merge_states([get_column_states(df.iloc[i:i + 3000], edges=edges) for i in range(0, len(df), 3000)])
+        for other in [chunked["value"], states["value"].get_descriptors()]:
+            for counter in uv.QUALITY_COUNTERS:
+                self.assertEqual(getattr(other, counter), getattr(descriptors, counter))
+
+        batch = self.df.iloc[:1000].copy()
+        batch.loc[batch.index[:600], "value"] = np.nan
+        original = uv.DistributionDescriptors(self.df["value"])
+        changes = uv.DistributionChanges(original, uv.DistributionDescriptors(batch["value"]))
+        self.assertIn("null_rate", changes.changed)
+        self.assertNotIn("distinct_count", changes.changed)
+
+        # Older baselines without the counters compare on the moments alone
+        older = uv.DistributionDescriptors(json_data={stat: getattr(original, stat) for stat in ["mean", "std", "min_val", "max_val", "q1", "q2", "q3"]})
+        changes = uv.DistributionChanges(older, uv.DistributionDescriptors(batch["value"]))
+        self.assertNotIn("null_rate", {**changes.changed, **changes.unchanged})
+
+    def test_nan_policy(self):
+        """Test that the rows with missing values are dropped or imputed before the clustering, or raise an error."""
+        X = self.df.copy()
+        X.loc[:49, "value"] = np.nan
+
+        dropped = mv.get_cluster_defined_number(X, 3, plot=False)
+        imputed = mv.get_cluster_defined_number(X, 3, plot=False, nan_policy="impute")
+        self.assertTrue(np.isfinite(np.array(dropped.centroids)).all())
+        self.assertTrue(np.isfinite(np.array(imputed.centroids)).all())
+        self.assertEqual(len(mv._handle_missing(X)), len(X) - 50)
+        pd.testing.assert_index_equal(mv._handle_missing(X).index, X.index[50:])
+        pd.testing.assert_index_equal(mv._handle_missing(X, "impute").index, X.index)
+        self.assertIs(mv._handle_missing(self.df), self.df)
+        self.assertAlmostEqual(mv._handle_missing(X, "impute")["value"].iloc[0], X["value"].mean())
+
+        with self.assertRaises(ValueError):
+            mv.get_cluster_defined_number(X, 3, plot=False, nan_policy="raise")
+        with self.assertRaises(ValueError):
+            mv._handle_missing(X, "ignore")
+
+
+if __name__ == '__main__':
+    unittest.main()
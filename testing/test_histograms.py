@@ -0,0 +1,51 @@
+import unittest
+import numpy as np
+import pandas as pd
+from scipy import stats
+from data_degradation_detector import histograms as hist
+from data_degradation_detector import univariate as uv
+
+
+class TestHistograms(unittest.TestCase):
+    """Unit tests for the histograms module and the drift tests built on it."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        self.original = rng.normal(0, 1, 20000)
+        self.shifted = rng.normal(0.5, 1.5, 10000)
+
+    def test_bin_counts(self):
+        """Test the underflow, regular and overflow bins."""
+        histogram = hist.Histogram(np.array([0.0, 0.5, 1.0, 1.0]), bins=2)
+        self.assertEqual(histogram.counts.tolist(), [0, 1, 3, 0], "The maximum should fall in the last bin")
+
+        other = histogram.bin(np.array([-1.0, 0.2, 2.0, np.nan]))
+        self.assertEqual(other.counts.tolist(), [1, 1, 0, 1], "Out of range values should fall in the outer bins")
+        self.assertEqual(hist.Histogram(json_data=other.get_json()), other)
+
+    def test_statistics_match_exact_values(self):
+        """Test that the binned statistics approximate the exact ones on raw data."""
+        original = hist.Histogram(self.original, bins=200)
+        drift = hist.HistogramDrift(original, original.bin(self.shifted))
+
+        exact_ks = stats.ks_2samp(self.original, self.shifted).statistic
+        exact_wasserstein = stats.wasserstein_distance(self.original, self.shifted)
+        self.assertAlmostEqual(drift.ks, exact_ks, delta=0.01)
+        self.assertAlmostEqual(drift.wasserstein, exact_wasserstein, delta=0.05)
+        self.assertEqual(drift.drifted, ["psi", "ks"])
+
+    def test_compare_to_baseline(self):
+        """Test the comparison against stored descriptors and histograms."""
+        original = pd.DataFrame({"value": self.original})
+        descriptors = uv.get_distribution_descriptors_all_columns(original)
+        histograms = uv.get_histograms_from_json({k: v.get_json() for k, v in uv.get_histograms_all_columns(original).items()})
+
+        same = uv.compare_to_baseline(descriptors, histograms, original.sample(5000, random_state=1))
+        changed = uv.compare_to_baseline(descriptors, histograms, pd.DataFrame({"value": self.shifted + 1.0}))
+        self.assertEqual(same["value"]["drift_tests"]["drifted"], [])
+        self.assertIn("wasserstein", changed["value"]["drift_tests"]["drifted"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,76 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from sklearn import metrics as sk
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector import report
+from data_degradation_detector import univariate as uv
+from data_degradation_detector.histograms import Histogram
+from data_degradation_detector.metrics import ClassificationMetrics, RegressionMetrics, get_metrics, merge_metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for the model metrics accumulated over chunks of predictions."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.rng = np.random.default_rng(0)
+
+    def test_regression_metrics(self):
+        """Test that the metrics of chunks merged across workers match those of sklearn on all the predictions."""
+        y_true = self.rng.normal(10, 3, 10_000)
+        y_pred = y_true + self.rng.normal(0.5, 1, 10_000)
+        workers = [RegressionMetrics().update(y_true[i:i + 1500], y_pred[i:i + 1500]) for i in range(0, 10_000, 1500)]
+        merged = merge_metrics(pickle.loads(pickle.dumps(workers)))
+
+        metrics = merged.get_metrics()
+        self.assertAlmostEqual(metrics["mse"], sk.mean_squared_error(y_true, y_pred))
+        self.assertAlmostEqual(metrics["rmse"], np.sqrt(sk.mean_squared_error(y_true, y_pred)))
+        self.assertAlmostEqual(metrics["mae"], sk.mean_absolute_error(y_true, y_pred))
+        self.assertAlmostEqual(metrics["r2"], sk.r2_score(y_true, y_pred))
+        self.assertEqual(RegressionMetrics(json_data=json.loads(json.dumps(merged.get_json()))).get_metrics(), metrics)
+
+        with self.assertRaises(ValueError):
+            RegressionMetrics().update(y_true, y_pred[:10])
+
+    def test_classification_metrics(self):
+        """Test that confusion matrices over chunks with different labels merge into the metrics of sklearn."""
+        y_true = self.rng.choice(["a", "b", "c", "d"], 5000)
+        y_pred = np.where(self.rng.random(5000) < 0.7, y_true, self.rng.choice(["a", "b", "c", "e"], 5000))
+        first = ClassificationMetrics().update(y_true[:2000], y_pred[:2000])
+        second = ClassificationMetrics(labels=["e"]).update(y_true[2000:], y_pred[2000:])
+        merged = merge_metrics([first, second])
+
+        metrics = merged.get_metrics()
+        self.assertEqual(merged.count, 5000)
+        self.assertAlmostEqual(metrics["accuracy"], sk.accuracy_score(y_true, y_pred))
+        self.assertAlmostEqual(metrics["precision"], sk.precision_score(y_true, y_pred, average="macro", zero_division=0))
+        self.assertAlmostEqual(metrics["recall"], sk.recall_score(y_true, y_pred, average="macro", zero_division=0))
+        self.assertAlmostEqual(metrics["f1"], sk.f1_score(y_true, y_pred, average="macro", zero_division=0))
+        restored = ClassificationMetrics(json_data=json.loads(json.dumps(merged.get_json())))
+        self.assertEqual(restored.get_metrics(), metrics)
+
+    def test_metrics_evolution(self):
+        """Test that accumulators are stored as the metrics of base_metrics.json and plotted in the metrics evolution."""
+        base = RegressionMetrics().update([1.0, 2.0, 3.0], [1.5, 2.0, 2.5])
+        batches = [RegressionMetrics().update([1.0, 2.0], [1.0, 3.0 + i]) for i in range(3)]
+        self.assertEqual(get_metrics({"rmse": 1.0}), {"rmse": 1.0})
+
+        df = pd.DataFrame({"x": self.rng.normal(0, 1, 200), "y": self.rng.normal(0, 1, 200)})
+        histograms = {column: Histogram(df[column].to_numpy()) for column in df.columns}
+        cluster_info = mv.get_cluster_defined_number(df, 2, plot=False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report.save_baseline(temp_dir, base, uv.get_distribution_descriptors_all_columns(df), histograms, cluster_info, df.corr())
+            self.assertEqual(report.load_baseline(temp_dir)["base_metrics"], base.get_metrics())
+
+            batch_dfs = [df + i for i in range(3)]
+            report.create_report(df, cluster_info, batch_dfs, base, f"{temp_dir}/report", new_metrics=batches, plot=True)
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, "report", "metrics_evolution.png")))
+
+
+if __name__ == '__main__':
+    unittest.main()
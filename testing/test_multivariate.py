@@ -0,0 +1,147 @@
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector import univariate as uv
+
+
+class TestMultivariate(unittest.TestCase):
+    """Unit tests for the multivariate module."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        self.X = pd.DataFrame(np.vstack([
+            rng.normal(0, 1, (500, 3)),
+            rng.normal(10, 1, (500, 3))
+        ]), columns=["a", "b", "c"])
+        self.cluster_info = mv.get_cluster_defined_number(self.X, 2, plot=False)
+
+    def test_radius(self):
+        """Test that the radius is the largest distance of a row to its own centroid."""
+        labels, distances = mv.nearest_centroids(self.X, self.cluster_info.centroids)
+        for label in range(2):
+            self.assertAlmostEqual(self.cluster_info.radius[label], distances[labels == label].max())
+
+    def test_legacy_radius(self):
+        """Test that baselines without a radius definition keep their radius and compare against batches measured the same way."""
+        X = self.X.to_numpy()
+        centroids = np.asarray(self.cluster_info.centroids)
+        labels, _ = mv.nearest_centroids(X, centroids)
+        json_data = self.cluster_info.get_json()
+        del json_data["radius_definition"]
+        # The radius stored by the baselines written before the fix
+        json_data["radius"] = [max(np.linalg.norm(x - centroids) for x in X[labels == label]) for label in range(2)]
+
+        legacy = mv.get_cluster_info_from_json(json_data)
+        self.assertEqual(legacy.radius_definition, "legacy")
+        batch = mv.get_cluster_defined_number(self.X.sample(frac=1, random_state=1), 2, plot=False, radius_definition="legacy")
+        np.testing.assert_allclose(sorted(batch.radius), sorted(json_data["radius"]))
+        changes = mv.compare_clusters(legacy, batch)
+        self.assertFalse([name for name in changes.changed if name.startswith("radius")])
+
+        with self.assertRaises(ValueError):
+            mv.compare_clusters(legacy, self.cluster_info)
+
+    def test_nearest_centroids(self):
+        """Test the chunked assignment against the distances to every centroid."""
+        X = self.X.to_numpy()
+        labels, distances = mv.nearest_centroids(X, self.cluster_info.centroids, chunk_size=64)
+
+        all_distances = np.linalg.norm(X[:, None, :] - np.asarray(self.cluster_info.centroids)[None, :, :], axis=2)
+        np.testing.assert_array_equal(labels, all_distances.argmin(axis=1))
+        np.testing.assert_allclose(distances, all_distances.min(axis=1))
+
+    def test_attribute_rows(self):
+        """Test that only the rows outside the baseline clusters are flagged."""
+        batch = pd.concat([self.X.iloc[:100], pd.DataFrame([[5.0, 5.0, 5.0], [30.0, 30.0, 30.0]], columns=self.X.columns)], ignore_index=True)
+        attribution = mv.attribute_rows(batch, self.cluster_info)
+
+        self.assertEqual(attribution.outliers.sum(), 2)
+        self.assertEqual(attribution.top_rows(2).tolist(), [101, 100])
+        self.assertEqual(attribution.cluster_counts.sum(), len(batch))
+
+        json_data = attribution.get_json(top=2)
+        self.assertEqual(json_data["outliers"], 2)
+        self.assertEqual(sum(json_data["outlier_counts"]), 2)
+        self.assertEqual([row["row"] for row in json_data["top_rows"]], [101, 100])
+
+    def test_projection(self):
+        """Test that the clustering, radius and row attribution run in the projected space."""
+        rng = np.random.default_rng(1)
+        wide = pd.DataFrame(rng.normal(0, 0.1, (1000, 50)))
+        wide.iloc[500:, :] += 5
+        cluster_info = mv.get_cluster_defined_number(wide, 2, plot=False, n_components=3, projection_method="randomized")
+
+        self.assertEqual(len(cluster_info.centroids[0]), 3)
+        self.assertGreater(sum(cluster_info.projection.explained_variance_ratio), 0.9)
+        self.assertGreater(cluster_info.projection.explained_variance(wide), 0.9)
+
+        restored = mv.get_cluster_info_from_json(cluster_info.get_json())
+        np.testing.assert_allclose(restored.projection.transform(wide), cluster_info.projection.transform(wide))
+
+        attribution = mv.attribute_rows(wide, restored)
+        self.assertEqual(attribution.cluster_counts.tolist(), [500, 500])
+        self.assertEqual(attribution.outliers.sum(), 0)
+
+    def test_scaler(self):
+        """Test the scalers and that clustering, radius and row attribution run on the scaled columns."""
+        rng = np.random.default_rng(2)
+        X = pd.DataFrame({"small": rng.normal(0, 1, 1000), "large": rng.normal(0, 1000, 1000), "constant": np.ones(1000)})
+
+        standard = mv.Scaler(X, method="standard").transform(X)
+        np.testing.assert_allclose(standard.std(ddof=1)[["small", "large"]], [1, 1])
+        self.assertTrue((standard["constant"] == 0).all())
+
+        robust = mv.Scaler(X, method="robust").transform(X)
+        np.testing.assert_allclose(robust.quantile(0.75) - robust.quantile(0.25), [1, 1, 0], atol=1e-9)
+
+        descriptors = uv.get_distribution_descriptors_all_columns(X)
+        from_descriptors = mv.get_scaler_from_descriptors(descriptors, X.columns, "standard")
+        np.testing.assert_allclose(from_descriptors.transform(X), standard)
+
+        cluster_info = mv.get_cluster_defined_number(X, 2, plot=False, scaler=from_descriptors)
+        restored = mv.get_cluster_info_from_json(cluster_info.get_json())
+        self.assertLess(max(restored.radius), 10)
+        self.assertEqual(mv.attribute_rows(X, restored).outliers.sum(), 0)
+
+    def test_memory_mapped_input(self):
+        """Test clustering a memory-mapped array without copying it."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            np.save(f"{temp_dir}/X.npy", self.X.to_numpy())
+            X = mv.load_array(f"{temp_dir}/X.npy")
+            self.assertTrue(np.shares_memory(mv._as_array(X), X))
+
+            cluster_info = mv.get_cluster_defined_number(X, 2, plot=False, fit_sample_size=200)
+            labels, distances = mv.nearest_centroids(X, cluster_info.centroids)
+            for label in range(2):
+                self.assertAlmostEqual(cluster_info.radius[label], distances[labels == label].max())
+            self.assertEqual(sorted(cluster_info.labels_percentages), [50.0, 50.0])
+
+            del X
+
+    def test_cluster_stability(self):
+        """Test that the stability intervals flag a moved cluster but not a resample of the same data."""
+        stability = mv.cluster_stability(self.X, self.cluster_info, n_bootstrap=20, max_workers=2)
+        self.assertEqual(stability, mv.cluster_stability(self.X, self.cluster_info, n_bootstrap=20))
+        for (low, high), radius in zip(stability["radius"], self.cluster_info.radius):
+            self.assertLessEqual(low, radius)
+            self.assertLessEqual(radius, high)
+
+        self.cluster_info.stability = stability
+        restored = mv.get_cluster_info_from_json(self.cluster_info.get_json())
+        self.assertEqual(restored.stability, stability)
+
+        resample = self.X.sample(frac=1, replace=True, random_state=1)
+        changes = mv.compare_clusters(restored, mv.get_cluster_defined_number(resample, 2, plot=False))
+        self.assertFalse([name for name in changes.changed if name.startswith("centroid")])
+
+        moved = self.X.copy()
+        moved.iloc[500:] += 1
+        changes = mv.compare_clusters(restored, mv.get_cluster_defined_number(moved, 2, plot=False))
+        self.assertTrue([name for name in changes.changed if name.startswith("centroid")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import multivariate_drift as md
+
+
+class TestMultivariateDrift(unittest.TestCase):
+    """Unit tests for the Mahalanobis and random-feature MMD drift score."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.rng = np.random.default_rng(0)
+        self.covariance = [[1.0, 0.9], [0.9, 1.0]]
+        self.original = self._sample([0, 0], self.covariance, 20000)
+        self.original["color"] = self.rng.choice(["red", "green"], len(self.original))
+        self.baseline = md.MultivariateBaseline(self.original)
+
+    def _sample(self, mean, covariance, rows):
+        return pd.DataFrame(self.rng.multivariate_normal(mean, covariance, rows), columns=["a", "b"])
+
+    def test_feature_map(self):
+        """Test that the random features approximate the Gaussian kernel of the standardized rows."""
+        feature_map = md.FeatureMap(self.original[["a", "b"]], n_features=4096, bandwidth=1.0)
+        values = self.original[["a", "b"]].to_numpy()[:50]
+        features = feature_map.transform(values)
+        scaled = (values - feature_map.mean) / feature_map.scale
+        kernel = np.exp(-np.sum((scaled[:, None] - scaled[None]) ** 2, axis=2) / 2)
+        np.testing.assert_allclose(features @ features.T, kernel, atol=0.1)
+
+    def test_compare(self):
+        """Test that only the moved mean and the flipped correlation drift, and that the baseline round-trips through JSON."""
+        restored = md.MultivariateBaseline(json_data=self.baseline.get_json())
+        self.assertEqual(restored.columns, ["a", "b"])
+
+        same = restored.compare(self._sample([0, 0], self.covariance, 5000))
+        self.assertEqual(same.drifted, [])
+
+        # Same marginals, only the dependence between the columns changed
+        flipped = restored.compare(self._sample([0, 0], [[1.0, -0.9], [-0.9, 1.0]], 5000), max_workers=2)
+        self.assertIn("mmd", flipped.drifted)
+        self.assertGreater(flipped.mmd, 100 * same.mmd)
+
+        shifted = restored.compare(self._sample([0.2, -0.2], self.covariance, 5000))
+        self.assertIn("mahalanobis", shifted.drifted)
+
+        missing = restored.compare(pd.DataFrame({"a": [np.nan], "b": [1.0]}))
+        self.assertEqual(missing.drifted, [])
+
+    def test_infinite_values(self):
+        """Test that rows with infinite values are left out of the baseline and of the batch, like missing values."""
+        original = self.original.copy()
+        original.loc[:50, "a"] = np.inf
+        baseline = md.MultivariateBaseline(original)
+        self.assertTrue(np.isfinite(baseline.mean).all())
+        self.assertTrue(np.isfinite(baseline.covariance).all())
+        self.assertEqual(baseline.count, len(original) - 51)
+
+        batch = self._sample([0, 0], self.covariance, 2000)
+        batch.loc[:50, "a"] = np.inf
+        batch.loc[51:60, "b"] = -np.inf
+        drift = self.baseline.compare(batch)
+        self.assertTrue(np.isfinite([drift.mahalanobis, drift.mahalanobis_p_value, drift.mmd]).all())
+        self.assertEqual(drift.drifted, [])
+
+        shifted = self._sample([0.2, -0.2], self.covariance, 2000)
+        shifted.loc[:50, "a"] = np.inf
+        self.assertIn("mahalanobis", self.baseline.compare(shifted).drifted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import pandas as pd
+from data_degradation_detector import profiling as prof
+from data_degradation_detector import univariate as uv
+
+
+class ListCollector(prof.Collector):
+    """Collector keeping every span it receives."""
+
+    def __init__(self):
+        self.spans = []
+
+    def record(self, name, seconds, peak_rss_mb=None, peak_rss_growth_mb=None):
+        self.spans.append((name, seconds))
+
+
+class TestProfiling(unittest.TestCase):
+    """Unit tests for the profiling module."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.df = pd.read_csv("data/WineQT.csv").drop(columns=["quality", "Id"])
+
+    def test_disabled_by_default(self):
+        """Test that no collector is active unless requested."""
+        self.assertIsNone(prof.get_collector(), "Profiling should be disabled by default")
+        self.assertIs(prof.span("a"), prof.span("b"), "Disabled spans should share one no-op object")
+
+    def test_timing_collector(self):
+        """Test that the timing collector counts the calls of every stage."""
+        with prof.profiling() as collector:
+            uv.get_distribution_descriptors_all_columns(self.df)
+        self.assertIsNone(prof.get_collector(), "The collector should be removed after the block")
+
+        stages = collector.get_json()["stages"]
+        self.assertEqual(stages["univariate.get_distribution_descriptors_all_columns"]["calls"], 1)
+        self.assertEqual(stages["univariate.get_distribution_descriptors"]["calls"], len(self.df.columns))
+
+        merged = prof.TimingCollector()
+        merged.merge(collector.get_json())
+        merged.merge(collector.get_json())
+        self.assertEqual(merged.stages["univariate.get_distribution_descriptors_all_columns"]["calls"], 2)
+
+    def test_custom_collector(self):
+        """Test that a custom collector receives the spans."""
+        collector = ListCollector()
+        with prof.profiling(collector):
+            with prof.span("custom"):
+                pass
+        self.assertEqual([name for name, _ in collector.spans], ["custom"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
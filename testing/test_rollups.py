@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import rollups as ru
+from data_degradation_detector import univariate as uv
+from data_degradation_detector.streaming import QuantileSketch
+
+
+class TestRollups(unittest.TestCase):
+    """Unit tests for the mergeable column states and their rollups over time windows."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        self.hours = pd.date_range("2024-01-29", periods=24 * 7, freq="h")
+        self.batches = [
+            pd.DataFrame({
+                "normal": rng.normal(i / 100, 1, 200),
+                "skewed": rng.exponential(1, 200),
+                "color": rng.choice(["red", "green"], 200)
+            })
+            for i in range(len(self.hours))
+        ]
+
+    def test_quantile_sketch(self):
+        """Test that the sketch is exact below its size and close to the exact quantiles once merged."""
+        values = np.random.default_rng(1).normal(0, 1, 50)
+        np.testing.assert_allclose(QuantileSketch(size=64).update(values).quantile([0.1, 0.5, 0.9]), np.quantile(values, [0.1, 0.5, 0.9]))
+
+        values = np.random.default_rng(2).exponential(1, 100_000)
+        sketch = QuantileSketch(size=128)
+        for chunk in np.array_split(values, 100):
+            sketch.merge(QuantileSketch(size=128).update(chunk))
+        self.assertEqual(sketch.count, len(values))
+        np.testing.assert_allclose(sketch.quantile([0.25, 0.5, 0.75]), np.quantile(values, [0.25, 0.5, 0.75]), rtol=0.02)
+
+    def test_roll_up(self):
+        """Test that the coarser windows are merged exactly from the hourly states, and kept up to date."""
+        store = ru.RollupStore("hour", bins=10)
+        for hour, batch in zip(self.hours[:-1], self.batches[:-1]):
+            store.add(batch, hour)
+        # Rolled up before the last batch, which must still reach it
+        store.roll_up("month")
+        store.add(self.batches[-1], self.hours[-1])
+
+        months = store.get_descriptor_evolution("month")
+        self.assertEqual(months["window"].unique().tolist(), ["2024-01", "2024-02"])
+        self.assertEqual(set(months["column"]), {"normal", "skewed"})
+
+        february = pd.concat([batch for hour, batch in zip(self.hours, self.batches) if hour.month == 2])
+        expected = uv.get_distribution_descriptors_all_columns(february)
+        states = store.roll_up("month")["2024-02"]
+        for column in ["normal", "skewed"]:
+            descriptors = states[column].get_descriptors()
+            for stat in ["mean", "std", "min_val", "max_val"]:
+                self.assertAlmostEqual(getattr(descriptors, stat), getattr(expected[column], stat))
+            np.testing.assert_allclose([descriptors.q1, descriptors.q2, descriptors.q3], [expected[column].q1, expected[column].q2, expected[column].q3], atol=0.02)
+            self.assertEqual(states[column].histogram.counts.sum(), len(february))
+
+        weeks = store.get_descriptor_evolution("week")
+        self.assertEqual(weeks["count"].sum(), 2 * 200 * len(self.hours))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            ru.save_rollups(store, temp_dir)
+            pd.testing.assert_frame_equal(ru.load_rollups(temp_dir).get_descriptor_evolution("month"), months)
+
+        with self.assertRaises(ValueError):
+            ru.RollupStore("day").roll_up("hour")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import sampling
+
+
+class TestSampling(unittest.TestCase):
+    """Unit tests for the sampling module."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.df = pd.read_csv("data/WineQT.csv")
+
+    def test_reservoir_sample_is_deterministic(self):
+        """Test that the same seed always draws the same rows."""
+        first = sampling.reservoir_sample(self.df, 100, seed=7)
+        second = sampling.reservoir_sample(self.df, 100, seed=7)
+
+        self.assertEqual(len(first), 100, "Sample should have the requested size")
+        self.assertTrue(first.index.equals(second.index), "Same seed should draw the same rows")
+        self.assertIs(sampling.reservoir_sample(self.df, len(self.df) + 1), self.df,
+                      "Small data should not be sampled")
+
+    def test_stratified_sample_keeps_every_label(self):
+        """Test that every label is represented proportionally in the stratified sample."""
+        labels = np.array([0] * 900 + [1] * 90 + [2] * 10)
+        idx = sampling.stratified_sample_indices(labels, 100, seed=1)
+
+        self.assertEqual(len(idx), 100, "Sample should have the requested size")
+        self.assertEqual(len(np.unique(idx)), 100, "Rows should not be repeated")
+        counts = np.bincount(labels[idx])
+        self.assertEqual(counts.tolist(), [90, 9, 1], "Labels should keep their share of the rows")
+
+    def test_streaming_reservoir(self):
+        """Test the reservoir fed chunk by chunk."""
+        reservoir = sampling.Reservoir(50, seed=3)
+        for start in range(0, len(self.df), 97):
+            reservoir.update(self.df.iloc[start:start + 97])
+
+        sample = reservoir.get_sample()
+        self.assertEqual(len(sample), 50, "Reservoir should hold the requested number of rows")
+        self.assertFalse(sample.index.duplicated().any(), "Reservoir rows should be distinct")
+        self.assertEqual(reservoir.get_json()["rows"], len(self.df), "Reservoir should count every row")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
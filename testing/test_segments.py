@@ -0,0 +1,65 @@
+import json
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import segments as sg
+from data_degradation_detector import univariate as uv
+
+
+class TestSegments(unittest.TestCase):
+    """Unit tests for the statistics and comparisons of every segment of a column."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        rows = 3000
+        self.df = pd.DataFrame({
+            "region": rng.choice(["north", "south", "east"], rows),
+            "value": rng.normal(5, 1, rows),
+            "counts": rng.integers(0, 10, rows),
+            "color": rng.choice(["red", "green"], rows)
+        })
+        self.df.loc[::11, "value"] = np.nan
+
+    def test_parity_with_slicing(self):
+        """Test the grouped statistics against those of every segment sliced on its own."""
+        descriptors = sg.get_segment_descriptors(self.df, "region")
+        histograms = sg.get_segment_histograms(self.df, "region", bins=10)
+        self.assertEqual(set(descriptors), {"east", "north", "south"})
+
+        for segment, columns in descriptors.items():
+            sliced = self.df[self.df["region"] == segment].drop(columns="region")
+            expected = uv.get_distribution_descriptors_all_columns(sliced)
+            self.assertEqual(set(columns), set(expected))
+            for column, column_descriptors in expected.items():
+                for name, value in column_descriptors.get_json().items():
+                    if isinstance(value, float):
+                        self.assertAlmostEqual(columns[column].get_json()[name], value, places=6)
+                    else:
+                        self.assertEqual(columns[column].get_json()[name], value)
+
+            expected_histograms = uv.get_histograms_all_columns(sliced, bins=10)
+            for column, histogram in expected_histograms.items():
+                np.testing.assert_array_equal(histograms[segment][column].counts, histogram.counts)
+                np.testing.assert_allclose(histograms[segment][column].edges, histogram.edges)
+
+    def test_compare(self):
+        """Test that only the shifted segment drifts and that new and missing segments are listed."""
+        baseline = sg.SegmentBaseline(self.df, "region", bins=10)
+        restored = sg.SegmentBaseline(json_data=json.loads(json.dumps(baseline.get_json())))
+
+        new_data = self.df.sample(frac=1, random_state=1)
+        new_data = new_data[new_data["region"] != "east"].copy()
+        new_data.loc[new_data["region"] == "north", "value"] += 3
+        new_data.loc[new_data.index[:50], "region"] = "west"
+
+        comparison = restored.compare(new_data)
+        self.assertEqual(list(comparison["drifted_segments"]), ["north"])
+        self.assertIn("value", comparison["drifted_segments"]["north"])
+        self.assertEqual(comparison["new_segments"], ["west"])
+        self.assertEqual(comparison["missing_segments"], ["east"])
+        self.assertEqual(comparison, sg.compare_segments(self.df, new_data, "region", bins=10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import pickle
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data_degradation_detector import cli
+from data_degradation_detector import multivariate as mv
+from data_degradation_detector import report
+from data_degradation_detector import univariate as uv
+from data_degradation_detector.histograms import Histogram
+from data_degradation_detector.shared import SharedArrays, SharedFrame
+
+
+def _column_sum(frame: SharedFrame) -> float:
+    df = frame.to_pandas()
+    total = float(df["value"].sum())
+    del df
+    frame.close()
+    return total
+
+
+class TestShared(unittest.TestCase):
+    """Unit tests for the arrays and DataFrames sent to worker processes in shared memory."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            "value": rng.normal(0, 1, 1000),
+            "count": rng.integers(0, 10, 1000),
+            "color": pd.Categorical(rng.choice(["red", "green"], 1000)),
+            "name": rng.choice(["a", "b"], 1000).astype(object)
+        }, index=np.arange(1000, 2000))
+
+    def test_shared_frame(self):
+        """Test that a DataFrame round-trips through pickle, reading its numeric columns from the block."""
+        with SharedFrame(self.df) as frame:
+            self.assertEqual(frame.shared, {0, 1})
+            attached = pickle.loads(pickle.dumps(frame))
+            df = attached.to_pandas()
+            pd.testing.assert_frame_equal(df, self.df)
+            self.assertTrue(np.shares_memory(df["value"].to_numpy(), attached.arrays.arrays()["0"]))
+            del df
+            attached.close()
+            name = frame.arrays.name
+
+        with self.assertRaises(FileNotFoundError):
+            SharedArrays(json_data={"name": name, "layout": []})
+        with self.assertRaises(ValueError):
+            SharedArrays({"names": np.array(["a"], dtype=object)})
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            frames = [SharedFrame(self.df.iloc[i::4]) for i in range(4)]
+            sums = list(executor.map(_column_sum, frames))
+            for frame in frames:
+                frame.unlink()
+        self.assertAlmostEqual(sum(sums), self.df["value"].sum())
+
+    def test_shared_baseline(self):
+        """Test that the workers attached to the shared baseline compare batches like the baseline loaded from disk."""
+        X = self.df[["value", "count", "color"]]
+        numeric = X[["value", "count"]]
+        histograms = {column: Histogram(numeric[column].to_numpy()) for column in numeric.columns}
+        cluster_info = mv.get_cluster_defined_number(numeric, 3, plot=False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report.save_baseline(temp_dir, {"rmse": 1.0}, uv.get_distribution_descriptors_all_columns(X), histograms,
+                                 cluster_info, numeric.corr(), binary=True)
+            baseline = report.load_baseline(temp_dir)
+
+        np.testing.assert_allclose(np.array(baseline["clusters"].centroids), np.array(cluster_info.centroids))
+        batches = [(str(i), X.iloc[i::3]) for i in range(3)]
+        expected = [cli._compare_batch(label, df, 3.0, 0.1, baseline) for label, df in batches]
+
+        with SharedArrays(report.get_baseline_arrays(baseline)) as shared_baseline:
+            with ProcessPoolExecutor(max_workers=2, initializer=cli._initialize_compare_worker, initargs=(shared_baseline,)) as executor:
+                results = list(cli._ordered_results(executor, batches, 3.0, 0.1, max_in_flight=2))
+        self.assertEqual(results, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data_degradation_detector import univariate as uv
+
+
+class TestUnivariate(unittest.TestCase):
+    """Unit tests for the univariate module."""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.df = pd.read_csv("data/WineQT.csv").drop(columns=["quality", "Id"])
+        rng = np.random.default_rng(0)
+        self.colors = pd.Series(rng.choice(["red", "white", "rose"], size=1000, p=[0.5, 0.3, 0.2]), name="color")
+
+    def test_native_width_descriptors(self):
+        """Test that float32 and nullable columns match the pandas descriptors."""
+        column = self.df["alcohol"].astype(np.float32)
+        column.iloc[::10] = np.nan
+        descriptors = uv.get_distribution_descriptors(column)
+
+        self.assertAlmostEqual(descriptors.mean, column.mean(), places=4)
+        self.assertAlmostEqual(descriptors.std, column.std(), places=4)
+        self.assertAlmostEqual(descriptors.q2, column.quantile(0.5), places=4)
+
+        nullable = pd.Series([1, 2, None, 4], dtype="Int64")
+        descriptors = uv.get_distribution_descriptors(nullable)
+        self.assertEqual((descriptors.min_val, descriptors.max_val), (1, 4))
+        self.assertIsInstance(descriptors.max_val, int, "Integer columns should keep integer extremes")
+
+    def test_categorical_descriptors(self):
+        """Test the frequency table of a categorical column and its JSON round trip."""
+        descriptors = uv.get_distribution_descriptors(self.colors)
+        self.assertIsInstance(descriptors, uv.CategoricalDescriptors)
+        self.assertEqual(descriptors.count, 1000)
+        self.assertEqual(descriptors.num_categories, 3)
+
+        json_data = {"color": descriptors.get_json()}
+        self.assertEqual(uv.get_distribution_descriptors_from_json(json_data)["color"], descriptors)
+
+    def test_categorical_changes(self):
+        """Test that PSI and chi-square flag a shift in the category shares."""
+        original = uv.get_distribution_descriptors(self.colors)
+        same = uv.CategoricalChanges(original, uv.get_distribution_descriptors(self.colors.sample(500, random_state=1)))
+        self.assertEqual(same.changed, {}, "A sample of the same data should not change")
+
+        shifted = pd.Series(["rose"] * 600 + ["red"] * 300 + ["blue"] * 100)
+        changes = uv.CategoricalChanges(original, uv.get_distribution_descriptors(shifted))
+        self.assertIn("psi", changes.changed)
+        self.assertIn("chi_square", changes.changed)
+        self.assertEqual(changes.new_categories, ["blue"])
+
+        # The unseen values of a batch truncated to max_categories are only left in its "__other__" bucket
+        original = uv.CategoricalDescriptors(pd.Series(["red", "white", "rose"] * 100))
+        truncated = uv.CategoricalDescriptors(pd.Series(["red", "white", "rose"] * 100 + [f"unseen_{i}" for i in range(200)]), max_categories=3)
+        self.assertIn(uv.CategoricalDescriptors.OTHER, truncated.frequencies)
+        changes = uv.CategoricalChanges(original, truncated)
+        self.assertEqual(changes.new_categories, [])
+        self.assertIn("psi", changes.changed)
+        self.assertIn("chi_square", changes.changed)
+        self.assertLess(changes.p_value, 0.05)
+
+    def test_descriptor_evolution_table(self):
+        """Test that the stacked evolution table matches the descriptors of every batch."""
+        rng = np.random.default_rng(3)
+        dfs = [pd.DataFrame({"a": rng.normal(i, 1, 100 + i), "b": rng.exponential(1, 100 + i), "color": "red"}) for i in range(4)]
+        dfs[1].loc[3, "a"] = np.nan
+        dfs[2]["b"] = np.nan
+
+        table = uv.get_descriptor_evolution(dfs)
+        self.assertEqual(table.columns.tolist(), ["batch", "column"] + uv.EVOLUTION_STATS)
+        self.assertEqual(len(table), 8)
+
+        rows = table.set_index(["batch", "column"])
+        for i, df in enumerate(dfs):
+            for column in ["a", "b"]:
+                if i == 2 and column == "b":
+                    self.assertEqual(rows.loc[(i, column), "count"], 0)
+                    self.assertTrue(np.isnan(rows.loc[(i, column), "q2"]))
+                    continue
+                descriptors = uv.get_distribution_descriptors(df[column])
+                self.assertEqual(rows.loc[(i, column), "count"], df[column].count())
+                for stat in ["mean", "std", "min_val", "max_val", "q1", "q2", "q3"]:
+                    self.assertAlmostEqual(rows.loc[(i, column), stat], getattr(descriptors, stat))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)